@@ -25,6 +25,13 @@ CONFIG = {
     # External tools
     'RMAPI_PATH': os.environ.get('PI_SHARE_RMAPI', '/usr/local/bin/rmapi'),
     'DRAWJ2D_PATH': os.environ.get('PI_SHARE_DRAWJ2D', '/usr/local/bin/drawj2d'),
+    'CONVERT_WORKERS': int(os.environ.get('PI_SHARE_CONVERT_WORKERS', 4)),  # concurrent drawj2d processes per document
+    'CONVERT_CHUNK_PAGES': int(os.environ.get('PI_SHARE_CONVERT_CHUNK_PAGES', 10)),  # 0 = never split
+    'CONVERT_BATCH_WINDOW': float(os.environ.get('PI_SHARE_CONVERT_BATCH_WINDOW', 0)),  # seconds, 0 = no batching
+    'CONVERT_BATCH_MAX_JOBS': int(os.environ.get('PI_SHARE_CONVERT_BATCH_MAX_JOBS', 8)),
+    'CONVERT_CACHE': os.environ.get('PI_SHARE_CONVERT_CACHE', '1').lower() in ('1', 'true', 'yes'),
+    'CONVERT_CACHE_DIR': os.environ.get('PI_SHARE_CONVERT_CACHE_DIR'),  # default: conversion_cache in TEMP_DIR
+    'CONVERT_CACHE_MAX_MB': int(os.environ.get('PI_SHARE_CONVERT_CACHE_MAX_MB', 200)),
 
     # Remarkable settings
     'RM_FOLDER': os.environ.get('PI_SHARE_RM_FOLDER', '/'),
@@ -38,6 +45,48 @@ CONFIG = {
     'HEADING_FONT': os.environ.get('PI_SHARE_HEADING_FONT', 'Liberation Sans'),
     'BODY_FONT': os.environ.get('PI_SHARE_BODY_FONT', 'Liberation Sans'),
     'CODE_FONT': os.environ.get('PI_SHARE_CODE_FONT', 'DejaVu Sans Mono'),
+    'FONT_DIR': os.environ.get('PI_SHARE_FONT_DIR'),  # <font>.ttf/.otf files to measure text with
+    'FONT_SCALE': float(os.environ.get('PI_SHARE_FONT_SCALE', 2.5)),  # drawing units per point of font size
+
+    # HTTP client settings
+    'HTTP_TIMEOUT': float(os.environ.get('PI_SHARE_HTTP_TIMEOUT', 30)),  # seconds
+    'HTTP_CONNECT_TIMEOUT': float(os.environ.get('PI_SHARE_HTTP_CONNECT_TIMEOUT', 10)),  # seconds
+    'HTTP_POOL_SIZE': int(os.environ.get('PI_SHARE_HTTP_POOL_SIZE', 10)),  # keep-alive connections per host
+    'HTTP_MAX_REDIRECTS': int(os.environ.get('PI_SHARE_HTTP_MAX_REDIRECTS', 10)),
+    'HTTP_CACHE': os.environ.get('PI_SHARE_HTTP_CACHE', '1').lower() in ('1', 'true', 'yes'),
+    'HTTP_CACHE_DIR': os.environ.get('PI_SHARE_HTTP_CACHE_DIR'),  # default: http_cache in TEMP_DIR
+    'HTTP_CACHE_MAX_MB': int(os.environ.get('PI_SHARE_HTTP_CACHE_MAX_MB', 100)),
+    'HTTP_HOST_CONCURRENCY': int(os.environ.get('PI_SHARE_HTTP_HOST_CONCURRENCY', 4)),  # requests in flight per host
+    'HTTP_HOST_INTERVAL': float(os.environ.get('PI_SHARE_HTTP_HOST_INTERVAL', 0.1)),  # seconds between requests to a host
+    'HTTP_MAX_RETRY_AFTER': float(os.environ.get('PI_SHARE_HTTP_MAX_RETRY_AFTER', 120)),  # seconds
+    'USER_AGENT': os.environ.get('PI_SHARE_USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'),
+
+    # Scraper settings
+    'STATIC_FIRST': os.environ.get('PI_SHARE_STATIC_FIRST', '1').lower() in ('1', 'true', 'yes'),
+    'SCRAPE_MODE': os.environ.get('PI_SHARE_SCRAPE_MODE', 'sequential'),  # sequential or hedged
+    'HEDGE_DELAY': float(os.environ.get('PI_SHARE_HEDGE_DELAY', 2.0)),  # seconds
+    'QUALITY_THRESHOLD': float(os.environ.get('PI_SHARE_QUALITY_THRESHOLD', 0.5)),
+    'SCRAPER_TIMEOUT': int(os.environ.get('PI_SHARE_SCRAPER_TIMEOUT', 120)),  # seconds
+    'ROUTING_TABLE': os.environ.get('PI_SHARE_ROUTING_TABLE'),  # default: scraper_routes.json in TEMP_DIR
+    'ROUTING_HALF_LIFE_DAYS': float(os.environ.get('PI_SHARE_ROUTING_HALF_LIFE_DAYS', 14)),
+    'SCRAPER_WORKERS': int(os.environ.get('PI_SHARE_SCRAPER_WORKERS', 2)),  # 0 = new process per attempt
+    'SCRAPER_WORKER_MAX_JOBS': int(os.environ.get('PI_SHARE_SCRAPER_WORKER_MAX_JOBS', 50)),
+    'BROWSER_SESSION_MAX_USES': int(os.environ.get('PI_SHARE_BROWSER_SESSION_MAX_USES', 20)),
+    'BROWSER_SESSION_MAX_AGE': float(os.environ.get('PI_SHARE_BROWSER_SESSION_MAX_AGE', 1800)),  # seconds
+    'HTML_PARSER': os.environ.get('PI_SHARE_HTML_PARSER', 'auto'),  # auto, html5-parser, lxml or html.parser
+    'HTML_MAX_MB': float(os.environ.get('PI_SHARE_HTML_MAX_MB', 5)),
+    'HTML_MAX_TEXT_CHARS': int(os.environ.get('PI_SHARE_HTML_MAX_TEXT_CHARS', 500000)),
+    'PAGINATION_MAX_PAGES': int(os.environ.get('PI_SHARE_PAGINATION_MAX_PAGES', 10)),  # 0 = first page only
+    'MERGE_PARAGRAPH_CHARS': int(os.environ.get('PI_SHARE_MERGE_PARAGRAPH_CHARS', 80)),  # 0 = never merge
+
+    # Image settings
+    'IMAGES': os.environ.get('PI_SHARE_IMAGES', '1').lower() in ('1', 'true', 'yes'),
+    'IMAGE_CACHE_DIR': os.environ.get('PI_SHARE_IMAGE_CACHE_DIR'),  # default: image_cache in TEMP_DIR
+    'IMAGE_CACHE_MAX_MB': int(os.environ.get('PI_SHARE_IMAGE_CACHE_MAX_MB', 100)),
+    'IMAGE_WORKERS': int(os.environ.get('PI_SHARE_IMAGE_WORKERS', 4)),
+    'IMAGE_MAX_MB': float(os.environ.get('PI_SHARE_IMAGE_MAX_MB', 5)),
+    'IMAGE_TIMEOUT': float(os.environ.get('PI_SHARE_IMAGE_TIMEOUT', 15)),  # seconds per image
+    'IMAGE_GRAY_LEVELS': int(os.environ.get('PI_SHARE_IMAGE_GRAY_LEVELS', 16)),
 
     # Retry settings
     'MAX_RETRIES': int(os.environ.get('PI_SHARE_MAX_RETRIES', 3)),
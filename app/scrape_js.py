@@ -9,8 +9,10 @@ import json
 import time
 import asyncio
 import os
-from bs4 import BeautifulSoup
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from services.content_extractor import make_soup, extract_blocks, CHROME_TAGS
+from services.main_content import find_main_content
+from services.html_ingest import cap_html
 
 async def scrape_with_playwright(url, output_path):
     """Scrape a webpage using Playwright for JavaScript support."""
@@ -46,8 +48,12 @@ async def scrape_with_playwright(url, output_path):
                     # It's okay if we couldn't find specific content selectors
                     print("Could not find specific content selectors, continuing with page as-is")
                 
-                # Get the final HTML content
-                html_content = await page.content()
+                # Get the final HTML content, keeping no more than the ingestion caps
+                # so an endless feed cannot fill the disk or the parse tree
+                ingested = cap_html(await page.content())
+                html_content = ingested.html
+                if ingested.truncated:
+                    print(f"Rendered page cut to {ingested.bytes_read} bytes ({ingested.truncated} limit)")
                 
                 # Save the HTML for debugging
                 html_debug_path = f"{output_path}.html"
@@ -63,8 +69,8 @@ async def scrape_with_playwright(url, output_path):
                 await page.screenshot(path=screenshot_path)
                 print(f"Saved screenshot to {screenshot_path}")
                 
-                # Parse the HTML with BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
+                # Parse the HTML with the fastest available parser
+                soup = make_soup(html_content)
                 
                 # Start extracting content
                 structured_content = []
@@ -76,88 +82,26 @@ async def scrape_with_playwright(url, output_path):
                         "content": title
                     })
                 
-                # Try to find the main content container
-                main_content = (
-                    soup.find('article') or 
-                    soup.find('main') or 
-                    soup.find('div', class_='content') or 
-                    soup.find('div', id='content') or 
-                    soup.find('div', class_='main') or
-                    soup.find('div', class_='article') or
-                    soup.body
+                # Find the main content container by scoring text and link density
+                main_content = find_main_content(soup) or soup.body
+                
+                # Extract headings, paragraphs, lists, quotes, code and images in one
+                # pass, in reading order, skipping scripts and navigational elements
+                base_url = await page.evaluate("document.baseURI") or url
+                blocks, images = extract_blocks(
+                    main_content,
+                    base_url=base_url,
+                    min_paragraph_length=11,  # Only include substantial paragraphs
+                    skip_tags=CHROME_TAGS
                 )
-                
-                # Remove script, style, and navigational elements
-                if main_content:
-                    for element in main_content(["script", "style", "nav", "footer", "header", "aside"]):
-                        element.extract()
-                
-                # Extract headings
-                for i in range(1, 7):
-                    headings = main_content.find_all(f'h{i}') if main_content else []
-                    for heading in headings:
-                        text = heading.get_text(strip=True)
-                        if text:
-                            structured_content.append({
-                                "type": f"h{i}",
-                                "content": text
-                            })
-                
-                # Extract paragraphs
-                paragraphs = main_content.find_all('p') if main_content else []
-                for p in paragraphs:
-                    text = p.get_text(strip=True)
-                    if text and len(text) > 10:  # Only include substantial paragraphs
-                        structured_content.append({
-                            "type": "paragraph",
-                            "content": text
-                        })
-                
-                # Extract lists
-                lists = main_content.find_all(['ul', 'ol']) if main_content else []
-                for list_elem in lists:
-                    list_type = list_elem.name  # 'ul' or 'ol'
-                    items = []
-                    
-                    for li in list_elem.find_all('li'):
-                        text = li.get_text(strip=True)
-                        if text:
-                            items.append(text)
-                    
-                    if items:
-                        structured_content.append({
-                            "type": "list",
-                            "list_type": list_type,
-                            "items": items
-                        })
-                
-                # Extract blockquotes
-                quotes = main_content.find_all('blockquote') if main_content else []
-                for quote in quotes:
-                    text = quote.get_text(strip=True)
-                    if text:
-                        structured_content.append({
-                            "type": "blockquote",
-                            "content": text
-                        })
-                
-                # Extract pre/code blocks
-                code_blocks = main_content.find_all(['pre', 'code']) if main_content else []
-                for code in code_blocks:
-                    # Skip if inside another code block (to avoid duplicates)
-                    if code.find_parent('pre') or code.find_parent('code'):
-                        continue
-                        
-                    text = code.get_text(strip=True)
-                    if text:
-                        structured_content.append({
-                            "type": "code",
-                            "content": text
-                        })
+                structured_content.extend(blocks)
                 
                 # If we couldn't find structured content, try extracting from the body
                 if not structured_content or len(structured_content) <= 1:
                     # Method: Extract all text and split into paragraphs
+                    if soup.body:
+                        for element in soup.body(["script", "style", "nav", "footer", "header", "aside"]):
+                            element.extract()
                     all_text = soup.body.get_text("\n", strip=True) if soup.body else ""
                     if all_text:
                         paragraphs = [p.strip() for p in all_text.split('\n\n') if p.strip()]
@@ -175,48 +119,24 @@ async def scrape_with_playwright(url, output_path):
                         "content": "No content could be extracted from this page."
                     })
                 
+                if ingested.truncated:
+                    structured_content.append({
+                        "type": "paragraph",
+                        "content": f"This page was cut short after {ingested.bytes_read // 1024} KB; open the source for the rest."
+                    })
+                
                 # For debugging/development, add metadata
                 structured_content.append({
                     "type": "paragraph",
                     "content": f"Scraped at: {time.strftime('%Y-%m-%d %H:%M:%S')} using Playwright"
                 })
                 
-                # Extract images (up to 5 main images)
-                images = []
-                if main_content:
-                    imgs = main_content.find_all('img')
-                    for i, img in enumerate(imgs):
-                        if i >= 5:  # Limit to 5 images
-                            break
-                            
-                        src = img.get('src', '')
-                        if not src:
-                            continue
-                            
-                        # Convert relative URLs to absolute
-                        if not src.startswith(('http://', 'https://')):
-                            # Use page's base URL
-                            base_url = await page.evaluate("document.baseURI")
-                            if base_url:
-                                from urllib.parse import urljoin
-                                src = urljoin(base_url, src)
-                            else:
-                                from urllib.parse import urljoin
-                                src = urljoin(url, src)
-                        
-                        alt = img.get('alt', 'Image')
-                        
-                        images.append({
-                            "id": f"img_{i}",
-                            "src": src,
-                            "alt": alt
-                        })
-                
                 # Create the result object
                 result = {
                     "title": title,
                     "structured_content": structured_content,
-                    "images": images
+                    "images": images,
+                    "ingest": ingested.report()
                 }
                 
                 # Save as JSON
@@ -1,139 +1,159 @@
 import sys
 import json
-import requests
 import time
-from bs4 import BeautifulSoup
+from services.http_client import get_default_client
+from services.html_ingest import fetch_html
+from services.content_extractor import make_soup, extract_blocks, element_texts, CHROME_TAGS
+from services.main_content import find_main_content
+from services.dedup import DedupIndex
+from services.pagination import collect_pages, merge_pages, configured_max_pages
+
+# Characters of a div's text compared against earlier content; only a prefix
+# is read so nested divs do not re-read their whole subtree each
+DIV_TEXT_LIMIT = 1000
+
+# A div whose text is at least this much made of earlier paragraphs only wraps them
+WRAPPER_OVERLAP = 0.9
+
+def extract_content(html, url, soup=None):
+    """Extract title, structured content and images from a page's HTML.
+    
+    Args:
+        html: The page HTML
+        url: The page URL, used to resolve relative image sources
+        soup: The page already parsed, if it was
+        
+    Returns:
+        Dict with title, structured_content and images
+    """
+    if soup is None:
+        soup = make_soup(html)
+    
+    # Get the title
+    title = soup.title.string if soup.title and soup.title.string else "Untitled"
+    
+    # Restrict extraction to the article body when the page has a clear one,
+    # so navigation, sidebars and footers do not reach the document
+    main_content = find_main_content(soup)
+    if main_content is not None:
+        root, skip_tags = main_content, CHROME_TAGS
+    else:
+        root, skip_tags = soup, None
+    
+    # Methods 1-3: headings, paragraphs, lists, quotes and code in one pass, in reading order
+    structured_content, images = extract_blocks(root, base_url=url, skip_tags=skip_tags)
+    
+    # Method 4: Extract all divs with significant text
+    paragraphs_seen = DedupIndex()
+    for block in structured_content:
+        if block["type"] == "paragraph":
+            paragraphs_seen.add(block["content"])
+    for _, text in element_texts(root, 'div', limit=DIV_TEXT_LIMIT):
+        # Only get divs with a decent amount of text
+        if len(text) > 50 and not paragraphs_seen.contains(text, min_overlap=WRAPPER_OVERLAP):
+            paragraphs_seen.add(text[:500])
+            structured_content.append({
+                "type": "paragraph",
+                "content": text[:500]  # Limit very long texts
+            })
+    
+    # Method 5: If we couldn't find much, extract all text
+    if len(structured_content) < 3:
+        all_text = root.get_text(" ", strip=True)
+        if all_text:
+            # Split into paragraphs at double newlines or when line has > 3 words
+            paragraphs = []
+            current = ""
+            
+            for line in all_text.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                    
+                if len(line.split()) > 3:  # Line with more than 3 words
+                    if current:
+                        paragraphs.append(current)
+                        current = ""
+                    paragraphs.append(line)
+                else:
+                    if current:
+                        current += " " + line
+                    else:
+                        current = line
+            
+            if current:
+                paragraphs.append(current)
+            
+            # Add the paragraphs to structured content
+            content_seen = DedupIndex()
+            for block in structured_content:
+                content_seen.add(block.get("content", ""))
+            for p in paragraphs:
+                if len(p) > 20 and not content_seen.contains(p):
+                    content_seen.add(p[:500])
+                    structured_content.append({
+                        "type": "paragraph", 
+                        "content": p[:500]  # Limit length
+                    })
+    
+    # If still no content, add a fallback message
+    if not structured_content:
+        structured_content.append({
+            "type": "paragraph",
+            "content": "No content could be extracted from this page. It may require JavaScript to display content."
+        })
+    
+    return {
+        "title": title,
+        "structured_content": structured_content,
+        "images": images
+    }
 
 def scrape_simple(url, output_path):
     """Simple scraper that makes multiple attempts to extract content."""
     try:
         print(f"Starting simple scraping for {url}")
         
-        # Add user agent to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Get the page
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Stream the page through the shared client (browser User-Agent, pooled
+        # connections), stopping at the size cap or once there is enough text
+        client = get_default_client()
+        ingested, final_url = fetch_html(client, url, timeout=30)
+        html = ingested.html
+        print(f"Read {ingested.bytes_read} bytes, {ingested.text_chars} characters of text")
+        print(f"Charset stats: {client.charset_stats.stats()}")
         
         # Save the HTML for debugging
         with open(f"{output_path}.html", 'w', encoding='utf-8') as f:
-            f.write(response.text)
-        
-        # Get the title
-        title = soup.title.string if soup.title else "Untitled"
-        
-        # Try different methods to extract content
-        structured_content = []
-        
-        # Method 1: Extract all headings
-        for i in range(1, 7):
-            headings = soup.find_all(f'h{i}')
-            for heading in headings:
-                text = heading.get_text(strip=True)
-                if text:
-                    structured_content.append({
-                        "type": f"h{i}",
-                        "content": text
-                    })
+            f.write(html)
         
-        # Method 2: Extract all paragraphs
-        paragraphs = soup.find_all('p')
-        for p in paragraphs:
-            text = p.get_text(strip=True)
-            if text:
-                structured_content.append({
-                    "type": "paragraph",
-                    "content": text
-                })
+        soup = make_soup(html)
+        result = extract_content(html, final_url, soup=soup)
+        result["ingest"] = ingested.report()
         
-        # Method 3: Extract all list items
-        lists = soup.find_all(['ul', 'ol'])
-        for list_elem in lists:
-            list_type = list_elem.name  # 'ul' or 'ol'
-            items = []
-            
-            for li in list_elem.find_all('li'):
-                text = li.get_text(strip=True)
-                if text:
-                    items.append(text)
+        # Articles split over several pages: fetch the rest and merge them in order
+        if not ingested.truncated:
+            def fetch_page(page_url):
+                page, page_final_url = fetch_html(client, page_url, timeout=30)
+                return page.html, page_final_url
             
-            if items:
-                structured_content.append({
-                    "type": "list",
-                    "list_type": list_type,
-                    "items": items
-                })
-        
-        # Method 4: Extract all divs with significant text
-        divs = soup.find_all('div')
-        for div in divs:
-            # Only get divs with a decent amount of text
-            text = div.get_text(strip=True)
-            if len(text) > 50 and not any(text in p.get("content", "") for p in structured_content if p.get("type") == "paragraph"):
-                structured_content.append({
-                    "type": "paragraph",
-                    "content": text[:500]  # Limit very long texts
-                })
-        
-        # Method 5: If we couldn't find much, extract all text
-        if len(structured_content) < 3:
-            all_text = soup.get_text(" ", strip=True)
-            if all_text:
-                # Split into paragraphs at double newlines or when line has > 3 words
-                paragraphs = []
-                current = ""
-                
-                for line in all_text.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    if len(line.split()) > 3:  # Line with more than 3 words
-                        if current:
-                            paragraphs.append(current)
-                            current = ""
-                        paragraphs.append(line)
-                    else:
-                        if current:
-                            current += " " + line
-                        else:
-                            current = line
-                
-                if current:
-                    paragraphs.append(current)
-                
-                # Add the paragraphs to structured content
-                for p in paragraphs:
-                    if len(p) > 20 and not any(p in existing.get("content", "") for existing in structured_content):
-                        structured_content.append({
-                            "type": "paragraph", 
-                            "content": p[:500]  # Limit length
-                        })
-        
-        # If still no content, add a fallback message
-        if not structured_content:
-            structured_content.append({
+            pages = collect_pages(soup, final_url, fetch_page, make_soup, max_pages=configured_max_pages())
+            if pages:
+                contents = [result] + [extract_content(None, page_url, soup=page_soup) for page_url, page_soup in pages]
+                result = merge_pages(contents)
+                print(f"Merged {len(contents)} pages")
+            result["pages"] = [final_url] + [page_url for page_url, _ in pages]
+        if ingested.truncated:
+            result["structured_content"].append({
                 "type": "paragraph",
-                "content": "No content could be extracted from this page. It may require JavaScript to display content."
+                "content": f"This page was cut short after {ingested.bytes_read // 1024} KB; open the source for the rest."
             })
         
         # For debugging/development, add metadata
-        structured_content.append({
+        result["structured_content"].append({
             "type": "paragraph",
             "content": f"Scraped at: {time.strftime('%Y-%m-%d %H:%M:%S')}"
         })
         
-        # Create the result object
-        result = {
-            "title": title,
-            "structured_content": structured_content
-        }
-        
         # Save as JSON
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(result, f, indent=2)
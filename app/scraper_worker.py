@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Long-lived scraper worker for Pi Share Receiver.
+
+Imports the scraper modules once at startup and then runs scrape jobs read
+from stdin, one newline-delimited JSON object per line:
+
+    {"id": 1, "scraper": "simple", "url": "https://...", "output_path": "..."}
+
+Each job is answered with one line on stdout:
+
+    {"id": 1, "exit_code": 0, "content": {...}, "seconds": 1.2}
+
+or {"id": 1, "exit_code": 1, "error": "..."} when the scraper failed before
+producing any content. The worker announces itself with a {"ready": true}
+line. Everything the scrapers print (and anything child processes write to
+the inherited stdout) goes to stderr, so stdout carries only the protocol.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import importlib
+import traceback
+
+# Scraper name -> (module, entry point)
+SCRAPERS = {
+    "simple": ("scrape_simple", "scrape_simple"),
+    "playwright": ("scrape_js", "scrape_with_playwright"),
+    "browser": ("scrape_with_browser", "scrape_with_selenium"),
+    "requests_html": ("scrape_with_requests_html", "scrape_with_requests_html"),
+}
+
+def open_protocol_stream():
+    """Reserve the real stdout for the protocol and send fd 1 to stderr."""
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    return protocol
+
+def preload(names):
+    """Import the scraper modules, returning entry points and import errors."""
+    entry_points = {}
+    errors = {}
+    for name in names:
+        module_name, function_name = SCRAPERS[name]
+        try:
+            entry_points[name] = getattr(importlib.import_module(module_name), function_name)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return entry_points, errors
+
+def run_job(job, entry_points, errors):
+    """Run one scrape job and build its reply."""
+    started = time.time()
+    name = job.get("scraper")
+    reply = {"id": job.get("id")}
+
+    scrape = entry_points.get(name)
+    if scrape is None:
+        reply.update(exit_code=1, error=errors.get(name, f"Unknown scraper: {name}"))
+        return reply
+
+    output_path = job["output_path"]
+    try:
+        exit_code = scrape(job["url"], output_path)
+        if asyncio.iscoroutine(exit_code):
+            exit_code = asyncio.run(exit_code)
+    except Exception:
+        reply.update(exit_code=1, error=traceback.format_exc(limit=5))
+        return reply
+
+    reply["exit_code"] = exit_code or 0
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            reply["content"] = json.load(f)
+    except (OSError, ValueError) as e:
+        reply["error"] = f"Could not read scraper output: {e}"
+    reply["seconds"] = round(time.time() - started, 3)
+    return reply
+
+def main():
+    protocol = open_protocol_stream()
+    names = sys.argv[1:] or list(SCRAPERS)
+    entry_points, errors = preload([name for name in names if name in SCRAPERS])
+    protocol.write(json.dumps({"ready": True, "pid": os.getpid(),
+                               "scrapers": sorted(entry_points), "errors": errors}) + "\n")
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            protocol.write(json.dumps({"id": None, "exit_code": 1, "error": f"Invalid job: {e}"}) + "\n")
+            continue
+        protocol.write(json.dumps(run_job(job, entry_points, errors)) + "\n")
+
+if __name__ == "__main__":
+    main()
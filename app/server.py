@@ -8,7 +8,7 @@ Receives URLs via HTTP POST, processes them, and uploads to Remarkable Pro.
 import os
 import json
 import traceback
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from typing import Dict, Optional, Tuple
 import time
 
@@ -21,10 +21,55 @@ from services.pdf_service import PDFService
 from services.web_scraper_service import WebScraperService
 from services.document_service import DocumentService
 from services.remarkable_service import RemarkableService
+from services.http_client import HttpClient, create_cache_from_config, create_scheduler_from_config
+from services.image_service import ImageService
+from services.worker_pool import ScraperWorkerPool
+from services.scraper_routing import ScraperRoutingTable
+from services.conversion_batcher import ConversionBatcher
+from services.conversion_cache import ConversionCache
 
 # Set up logging
 logger = setup_logging()
 
+# One pooled HTTP client shared by every request handler and service
+http_client = HttpClient(
+    timeout=CONFIG['HTTP_TIMEOUT'],
+    connect_timeout=CONFIG['HTTP_CONNECT_TIMEOUT'],
+    user_agent=CONFIG['USER_AGENT'],
+    max_redirects=CONFIG['HTTP_MAX_REDIRECTS'],
+    pool_maxsize=CONFIG['HTTP_POOL_SIZE'],
+    cache=create_cache_from_config(),
+    scheduler=create_scheduler_from_config()
+)
+
+# Pre-forked scraper processes shared by every request handler
+scraper_pool = ScraperWorkerPool(
+    size=CONFIG['SCRAPER_WORKERS'],
+    max_jobs=CONFIG['SCRAPER_WORKER_MAX_JOBS'],
+    job_timeout=CONFIG['SCRAPER_TIMEOUT']
+) if CONFIG['SCRAPER_WORKERS'] > 0 else None
+
+# One routing table shared by every request handler, so concurrent shares all
+# record into the same table instead of overwriting each other's copies
+routing_table = ScraperRoutingTable(
+    CONFIG['ROUTING_TABLE'] or os.path.join(CONFIG['TEMP_DIR'], 'scraper_routes.json'),
+    half_life_days=CONFIG['ROUTING_HALF_LIFE_DAYS']
+)
+
+# Batches the drawj2d conversions of documents that are ready at the same time
+conversion_batcher = ConversionBatcher(
+    CONFIG['DRAWJ2D_PATH'],
+    os.path.join(CONFIG['TEMP_DIR'], 'batches'),
+    window=CONFIG['CONVERT_BATCH_WINDOW'],
+    max_jobs=CONFIG['CONVERT_BATCH_MAX_JOBS']
+) if CONFIG['CONVERT_BATCH_WINDOW'] > 0 else None
+
+# Converted documents keyed by the digest of their HCL script, shared by every request handler
+conversion_cache = ConversionCache(
+    CONFIG['CONVERT_CACHE_DIR'] or os.path.join(CONFIG['TEMP_DIR'], 'conversion_cache'),
+    max_bytes=CONFIG['CONVERT_CACHE_MAX_MB'] * 1024 * 1024
+) if CONFIG['CONVERT_CACHE'] else None
+
 class URLHandler(BaseHTTPRequestHandler):
     """Handler for URL sharing requests."""
     
@@ -40,9 +85,30 @@ class URLHandler(BaseHTTPRequestHandler):
         """Initialize service instances safely."""
         try:
             self.qr_service = QRCodeService(CONFIG['TEMP_DIR'])
-            self.pdf_service = PDFService(CONFIG['TEMP_DIR'], CONFIG['OUTPUT_DIR'])
-            self.web_scraper = WebScraperService(CONFIG['TEMP_DIR'])
-            self.document_service = DocumentService(CONFIG['TEMP_DIR'], CONFIG['DRAWJ2D_PATH'])
+            self.pdf_service = PDFService(CONFIG['TEMP_DIR'], CONFIG['OUTPUT_DIR'], http_client=http_client)
+            self.web_scraper = WebScraperService(
+                CONFIG['TEMP_DIR'],
+                static_first=CONFIG['STATIC_FIRST'],
+                scrape_mode=CONFIG['SCRAPE_MODE'],
+                hedge_delay=CONFIG['HEDGE_DELAY'],
+                quality_threshold=CONFIG['QUALITY_THRESHOLD'],
+                scraper_timeout=CONFIG['SCRAPER_TIMEOUT'],
+                http_client=http_client,
+                worker_pool=scraper_pool,
+                merge_paragraph_chars=CONFIG['MERGE_PARAGRAPH_CHARS'],
+                routing=routing_table
+            )
+            self.image_service = ImageService(
+                CONFIG['IMAGE_CACHE_DIR'] or os.path.join(CONFIG['TEMP_DIR'], 'image_cache'),
+                http_client=http_client,
+                max_workers=CONFIG['IMAGE_WORKERS'],
+                max_bytes=int(CONFIG['IMAGE_MAX_MB'] * 1024 * 1024),
+                timeout=CONFIG['IMAGE_TIMEOUT'],
+                gray_levels=CONFIG['IMAGE_GRAY_LEVELS'],
+                cache_max_bytes=CONFIG['IMAGE_CACHE_MAX_MB'] * 1024 * 1024
+            )
+            self.document_service = DocumentService(CONFIG['TEMP_DIR'], CONFIG['DRAWJ2D_PATH'],
+                                                    batcher=conversion_batcher, cache=conversion_cache)
             self.remarkable_service = RemarkableService(CONFIG['RMAPI_PATH'], CONFIG['RM_FOLDER'])
         except Exception as e:
             logger.error(f"Error initializing services: {str(e)}")
@@ -155,6 +221,10 @@ class URLHandler(BaseHTTPRequestHandler):
             # Scrape content
             content = self.web_scraper.scrape(url)
             
+            # Download and dither the page's images for inline placement
+            if CONFIG['IMAGES']:
+                self.image_service.process_content_images(content)
+            
             # Create HCL script
             hcl_path = self.document_service.create_hcl(url, qr_path, content)
             if not hcl_path:
@@ -173,6 +243,13 @@ class URLHandler(BaseHTTPRequestHandler):
                 content["title"]
             )
             
+            if http_client.cache is not None:
+                logger.info(f"HTTP cache stats: {http_client.cache.stats()}")
+            if conversion_cache is not None:
+                logger.info(f"Conversion cache stats: {conversion_cache.stats()}")
+            logger.info(f"Charset decoding stats: {http_client.charset_stats.stats()}")
+            logger.info(f"Host scheduling stats: {http_client.scheduler.stats()}")
+            
             if success:
                 self._send_success(f"Webpage uploaded to Remarkable: {content['title']}")
             else:
@@ -216,8 +293,13 @@ def main():
         os.makedirs(CONFIG['TEMP_DIR'], exist_ok=True)
         os.makedirs(CONFIG['OUTPUT_DIR'], exist_ok=True)
         
-        # Create server
-        server = HTTPServer((CONFIG['HOST'], CONFIG['PORT']), URLHandler)
+        # Start the scraper workers so the first share does not wait for imports
+        if scraper_pool:
+            scraper_pool.start()
+        
+        # Create server; with batching, shares are handled concurrently so their conversions can meet
+        server_class = ThreadingHTTPServer if conversion_batcher else HTTPServer
+        server = server_class((CONFIG['HOST'], CONFIG['PORT']), URLHandler)
         logger.info(f"Server started at http://{CONFIG['HOST']}:{CONFIG['PORT']}")
         
         # Serve until interrupted
@@ -230,6 +312,12 @@ def main():
     finally:
         if 'server' in locals():
             server.server_close()
+        if scraper_pool:
+            logger.info(f"Scraper worker stats: {scraper_pool.stats()}")
+            scraper_pool.close()
+        if conversion_batcher:
+            logger.info(f"Conversion batch stats: {conversion_batcher.stats()}")
+            conversion_batcher.close()
         logger.info("Server stopped")
 
 if __name__ == "__main__":
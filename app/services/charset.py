@@ -0,0 +1,162 @@
+"""Byte-level charset handling for Pi Share Receiver.
+
+Decodes fetched HTML without running character-set detection over the whole
+body. The encoding is taken, in order, from a byte order mark, the charset
+in the Content-Type header, or a <meta charset> / http-equiv declaration
+sniffed from the first few KB. Only when none of these is present does
+detection run, and then only on a bounded prefix.
+"""
+
+import re
+import time
+import codecs
+import threading
+import logging
+from email.message import Message
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+try:
+    from charset_normalizer import from_bytes as _detect
+except ImportError:
+    _detect = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bytes searched for a <meta> charset declaration
+META_SNIFF_BYTES = 4096
+
+# Bytes handed to charset detection when nothing is declared
+DETECT_BYTES = 64 * 1024
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# <meta charset="x"> and <meta http-equiv="Content-Type" content="text/html; charset=x">
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_:.\-]+)', re.I)
+
+class DecodedText(NamedTuple):
+    """Result of decode_html."""
+    text: str
+    encoding: str
+    source: str  # bom, http, meta, detected or default
+    seconds: float
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """Return the Python codec name for an encoding label, or None if unknown."""
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip().strip('"\'')).name
+    except LookupError:
+        return None
+    # A <meta> or header claiming UTF-16 on an ASCII-compatible body means UTF-8
+    # (the HTML spec's rule); real UTF-16 pages carry a BOM
+    if name.startswith('utf-16'):
+        return 'utf-8'
+    return name
+
+def header_charset(content_type: Optional[str]) -> Optional[str]:
+    """Return the charset parameter of a Content-Type header, if any."""
+    if not content_type:
+        return None
+    message = Message()
+    message['Content-Type'] = content_type
+    return normalize_encoding(message.get_param('charset'))
+
+def sniff_meta_charset(body: bytes, limit: int = META_SNIFF_BYTES) -> Optional[str]:
+    """Return the charset declared by a <meta> tag within the first limit bytes."""
+    match = META_CHARSET.search(body[:limit])
+    if not match:
+        return None
+    return normalize_encoding(match.group(1).decode('ascii', 'ignore'))
+
+def detect_charset(body: bytes, limit: int = DETECT_BYTES) -> Optional[str]:
+    """Guess the encoding from at most limit bytes of the body."""
+    if _detect is None:
+        return None
+    prefix = body[:limit]
+    # Do not hand the detector a multi-byte sequence cut in half
+    if len(body) > limit:
+        prefix = prefix[:prefix.rfind(b'\n') + 1] or prefix
+    best = _detect(prefix).best()
+    if best is None:
+        return None
+    encoding = normalize_encoding(best.encoding)
+    # A plain-ASCII prefix says nothing about the rest; UTF-8 decodes it the same
+    return 'utf-8' if encoding == 'ascii' else encoding
+
+def choose_encoding(prefix: bytes, content_type: Optional[str] = None) -> Tuple[Optional[str], str, int]:
+    """Pick the encoding of an HTML body from its first bytes and headers.
+
+    Args:
+        prefix: The start of the body (at least META_SNIFF_BYTES when available)
+        content_type: Content-Type header of the response
+
+    Returns:
+        Tuple of (encoding or None, source, length of the BOM to skip)
+    """
+    for bom, bom_encoding in BOMS:
+        if prefix.startswith(bom):
+            return bom_encoding, 'bom', len(bom)
+    encoding = header_charset(content_type)
+    if encoding is not None:
+        return encoding, 'http', 0
+    encoding = sniff_meta_charset(prefix)
+    if encoding is not None:
+        return encoding, 'meta', 0
+    encoding = detect_charset(prefix)
+    if encoding is not None:
+        return encoding, 'detected', 0
+    return None, 'default', 0
+
+def decode_html(body: bytes, content_type: Optional[str] = None, default: str = 'utf-8') -> DecodedText:
+    """Decode an HTML body without scanning all of it for its encoding.
+
+    Args:
+        body: Raw response body
+        content_type: Content-Type header of the response
+        default: Encoding used if nothing is declared and detection fails
+
+    Returns:
+        DecodedText with the text, the encoding used and where it came from
+    """
+    started = time.perf_counter()
+    encoding, source, bom_length = choose_encoding(body, content_type)
+    encoding = encoding or default
+    text = body[bom_length:].decode(encoding, errors='replace')
+    return DecodedText(text, encoding, source, time.perf_counter() - started)
+
+class CharsetStats:
+    """Thread-safe counters of how responses were decoded."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "decodes": 0, "bytes": 0, "seconds": 0.0,
+            "bom": 0, "http": 0, "meta": 0, "detected": 0, "default": 0,
+            "detect_seconds": 0.0,
+            # Extrapolated cost of running detection over whole bodies instead of a prefix
+            "detect_seconds_saved": 0.0
+        }
+
+    def record(self, decoded: DecodedText, body_size: int) -> None:
+        """Count one decode_html result for a body of body_size bytes."""
+        with self._lock:
+            self._stats["decodes"] += 1
+            self._stats["bytes"] += body_size
+            self._stats["seconds"] += decoded.seconds
+            self._stats[decoded.source] += 1
+            if decoded.source == 'detected':
+                self._stats["detect_seconds"] += decoded.seconds
+                if body_size > DETECT_BYTES:
+                    # Detection time grows linearly with the input
+                    self._stats["detect_seconds_saved"] += decoded.seconds * (body_size / DETECT_BYTES - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a copy of the counters."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,361 @@
+"""Single-pass structured content extractor for Pi Share Receiver.
+
+Walks a parsed HTML tree once and emits headings, paragraphs, lists,
+blockquotes and code blocks in document (reading) order, collecting images
+on the way. The HTML parser backend is pluggable: a C-based HTML5 parser
+(html5-parser) or lxml are used when installed, falling back to Python's
+html.parser.
+"""
+
+import logging
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import Comment, Declaration, Doctype, ProcessingInstruction, CData
+from urllib.parse import urljoin
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .document_model import ContentBlock, Heading, Paragraph, ListItem, Code, Quote, Image, to_dicts
+
+# Import configuration with proper relative import
+try:
+    from ..config import CONFIG
+except ImportError:
+    try:
+        # Scraper scripts run with the app directory on sys.path
+        from config import CONFIG
+    except ImportError:
+        # Fallback to defaults if config cannot be imported
+        CONFIG = {}
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+LIST_TAGS = {'ul', 'ol'}
+CODE_TAGS = {'pre', 'code'}
+
+# Elements whose text is never content
+NON_CONTENT_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head', 'iframe', 'object'}
+
+# Page chrome that scrapers working on a main-content container skip as well
+CHROME_TAGS = {'nav', 'footer', 'header', 'aside'}
+
+# Strings that are markup artefacts rather than text
+NON_TEXT_STRINGS = (Comment, Declaration, Doctype, ProcessingInstruction, CData)
+
+def _parse_html5_parser(html: str) -> BeautifulSoup:
+    import html5_parser
+    return html5_parser.parse(html, treebuilder='soup', return_root=False)
+
+def _parse_lxml(html: str) -> BeautifulSoup:
+    import lxml  # noqa: F401 - fail fast so the next backend is tried
+    return BeautifulSoup(html, 'lxml')
+
+def _parse_html_parser(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, 'html.parser')
+
+# Parser backends in order of preference
+PARSER_BACKENDS: Dict[str, Callable[[str], BeautifulSoup]] = {
+    'html5-parser': _parse_html5_parser,
+    'lxml': _parse_lxml,
+    'html.parser': _parse_html_parser,
+}
+
+def available_parsers() -> List[str]:
+    """Return the installed parser backends in order of preference."""
+    available = []
+    for name in PARSER_BACKENDS:
+        try:
+            PARSER_BACKENDS[name]("<p></p>")
+            available.append(name)
+        except ImportError:
+            continue
+    return available
+
+def make_soup(html: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """Parse HTML with the requested or fastest available backend.
+
+    Args:
+        html: HTML to parse
+        parser: Backend name from PARSER_BACKENDS, or None/"auto" to use
+            CONFIG['HTML_PARSER'] and then the first installed backend
+
+    Returns:
+        The parsed document
+    """
+    parser = parser or CONFIG.get('HTML_PARSER', 'auto')
+    if parser != 'auto':
+        if parser not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown HTML parser backend: {parser}")
+        return PARSER_BACKENDS[parser](html)
+
+    for name, parse in PARSER_BACKENDS.items():
+        try:
+            return parse(html)
+        except ImportError:
+            continue
+    return _parse_html_parser(html)
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace into single spaces and strip the ends."""
+    return ' '.join(text.split())
+
+class ContentExtractor:
+    """Extracts structured content blocks from a parsed tree in one pass."""
+
+    def __init__(self, base_url: Optional[str] = None, min_paragraph_length: int = 1,
+                 skip_tags: Optional[set] = None, max_images: int = 5):
+        """Initialize extraction options.
+
+        Args:
+            base_url: URL that relative image sources are resolved against
+            min_paragraph_length: Paragraphs shorter than this are dropped
+            skip_tags: Extra tags whose subtrees are ignored (e.g. CHROME_TAGS)
+            max_images: Maximum number of images collected
+        """
+        self.base_url = base_url
+        self.min_paragraph_length = min_paragraph_length
+        self.skip_tags = NON_CONTENT_TAGS | set(skip_tags or ())
+        self.max_images = max_images
+
+    def extract(self, root: Tag) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Walk root once and return (structured_content, images).
+
+        The blocks are those of extract_model in their JSON form.
+
+        Args:
+            root: Element (or BeautifulSoup document) to extract from
+
+        Returns:
+            Tuple of the structured content blocks and image dicts
+        """
+        blocks, images = self.extract_model(root)
+        return to_dicts(blocks), images
+
+    def extract_model(self, root: Tag) -> Tuple[List[ContentBlock], List[Dict[str, Any]]]:
+        """Walk root once and return (typed blocks, images).
+
+        Block elements are emitted when they are reached and their subtree is
+        consumed by the same walk, so nested markup (a paragraph inside a
+        blockquote, a code inside a pre) is never emitted twice. Each
+        collected image also gets an Image block after the block it appeared
+        in, so it can be laid out in place.
+
+        Args:
+            root: Element (or BeautifulSoup document) to extract from
+
+        Returns:
+            Tuple of the typed blocks (see document_model) and image dicts
+        """
+        blocks: List[ContentBlock] = []
+        images: List[Dict[str, Any]] = []
+        if root is None:
+            return blocks, images
+
+        # Explicit stack of child iterators: deeply nested pages must not hit
+        # the recursion limit
+        stack = [iter(root.children)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+            if not isinstance(node, Tag):
+                continue
+
+            name = node.name
+            if name in self.skip_tags:
+                continue
+            images_before = len(images)
+            if name in HEADING_TAGS:
+                self._add_block(blocks, Heading, self._text(node, images), int(name[1]))
+            elif name == 'p':
+                text = self._text(node, images)
+                if len(text) >= self.min_paragraph_length:
+                    self._add_block(blocks, Paragraph, text)
+            elif name in LIST_TAGS:
+                items = self._list_items(node, images)
+                blocks.extend(ListItem(text, name, position == 0) for position, text in enumerate(items))
+            elif name == 'blockquote':
+                self._add_block(blocks, Quote, self._text(node, images))
+            elif name in CODE_TAGS:
+                self._add_block(blocks, Code, self._code_text(node))
+            elif name == 'img':
+                self._add_image(node, images)
+            else:
+                stack.append(iter(node.children))
+                continue
+
+            for image in images[images_before:]:
+                blocks.append(Image(image["id"]))
+
+        return blocks, images
+
+    def _add_block(self, blocks: List[ContentBlock], block_type: type, text: str, *fields: Any) -> None:
+        if text:
+            blocks.append(block_type(*fields, text))
+
+    def _text(self, node: Tag, images: List[Dict[str, Any]], exclude: set = frozenset()) -> str:
+        """Collect the normalized text of a subtree, picking up images on the way."""
+        parts = []
+        stack = [iter(node.children)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            if isinstance(child, NavigableString):
+                if not isinstance(child, NON_TEXT_STRINGS):
+                    parts.append(str(child))
+            elif child.name in self.skip_tags or child.name in exclude:
+                continue
+            elif child.name == 'img':
+                self._add_image(child, images)
+            else:
+                if child.name == 'br':
+                    parts.append(' ')
+                stack.append(iter(child.children))
+        return normalize_text(''.join(parts))
+
+    def _code_text(self, node: Tag) -> str:
+        """Collect code text keeping its line breaks."""
+        parts = []
+        stack = [iter(node.children)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            if isinstance(child, NavigableString):
+                if not isinstance(child, NON_TEXT_STRINGS):
+                    parts.append(str(child))
+            elif child.name == 'br':
+                parts.append('\n')
+            elif child.name not in self.skip_tags:
+                stack.append(iter(child.children))
+        return ''.join(parts).strip('\n').rstrip()
+
+    def _list_items(self, list_node: Tag, images: List[Dict[str, Any]]) -> List[str]:
+        """Collect list item texts in order; nested list items become items of their own."""
+        items = []
+        stack = [iter(list_node.children)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            if not isinstance(child, Tag) or child.name in self.skip_tags:
+                continue
+            if child.name == 'li':
+                text = self._text(child, images, exclude=LIST_TAGS)
+                if text:
+                    items.append(text)
+            # Descend to reach nested lists, which follow their parent item
+            stack.append(iter(child.children))
+        return items
+
+    def _add_image(self, img: Tag, images: List[Dict[str, Any]]) -> None:
+        """Record an image with an absolute source URL."""
+        if len(images) >= self.max_images:
+            return
+        src = img.get('src') or img.get('data-src') or ''
+        if not src or src.startswith('data:'):
+            return
+        if self.base_url and not src.startswith(('http://', 'https://')):
+            src = urljoin(self.base_url, src)
+        images.append({
+            "id": f"img_{len(images)}",
+            "src": src,
+            "alt": img.get('alt', 'Image')
+        })
+
+def element_text(node: Tag) -> str:
+    """Normalized text of an element, exactly as the extractor would emit it."""
+    return ContentExtractor(max_images=0)._text(node, [])
+
+def element_texts(root: Tag, name: str, limit: int = 1000) -> List[Tuple[Tag, str]]:
+    """Normalized text of every name element under root, in document order.
+
+    Calling element_text on each element re-reads the subtree of every
+    ancestor, which is quadratic on deeply nested pages. This collects the
+    page text once and slices it per element, reading at most about limit
+    characters for each one.
+
+    Args:
+        root: Element or document to search
+        name: Tag name to collect (e.g. "div")
+        limit: Number of characters after which a text may be cut
+
+    Returns:
+        List of (element, text) tuples; each text is element_text(element),
+        possibly cut somewhere after its first limit characters
+    """
+    # Text pieces with whitespace collapsed (keeping a single space at either
+    # end so words still join as they would) and capped in length, each with
+    # its count of visible characters
+    pieces: List[Tuple[str, int]] = []
+    ranges = []
+
+    def add_piece(text: str) -> None:
+        words = text.split()
+        if not words:
+            # Whitespace after whitespace cannot change the normalized text
+            if text and pieces and not pieces[-1][0][-1:].isspace():
+                pieces.append((' ', 0))
+            return
+        piece = ' '.join(words)
+        if text[0].isspace():
+            piece = ' ' + piece
+        if text[-1].isspace():
+            piece += ' '
+        piece = piece[:2 * limit + 2]
+        pieces.append((piece, len(piece) - piece.count(' ')))
+
+    # Stack of (index into ranges or None, child iterator); an element's
+    # range ends when its iterator is exhausted
+    stack = [(None, iter(root.children))]
+    while stack:
+        range_index, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if range_index is not None:
+                ranges[range_index][2] = len(pieces)
+            continue
+        if isinstance(child, NavigableString):
+            if not isinstance(child, NON_TEXT_STRINGS):
+                add_piece(str(child))
+            continue
+        if child.name in NON_CONTENT_TAGS:
+            continue
+        if child.name == 'br':
+            add_piece(' ')
+        child_range = None
+        if child.name == name:
+            child_range = len(ranges)
+            ranges.append([child, len(pieces), len(pieces)])
+        stack.append((child_range, iter(child.children)))
+
+    texts = []
+    for element, start, end in ranges:
+        parts = []
+        visible = 0
+        for i in range(start, end):
+            piece, piece_visible = pieces[i]
+            parts.append(piece)
+            visible += piece_visible
+            if visible >= limit:
+                break
+        texts.append((element, normalize_text(''.join(parts))))
+    return texts
+
+def extract_blocks(root: Tag, base_url: Optional[str] = None, **options: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Extract (structured_content, images) from root in document order.
+
+    Args:
+        root: Element or document to extract from
+        base_url: URL that relative image sources are resolved against
+        options: Further ContentExtractor options
+
+    Returns:
+        Tuple of the structured content blocks and image dicts
+    """
+    return ContentExtractor(base_url=base_url, **options).extract(root)
@@ -0,0 +1,220 @@
+"""Batched drawj2d conversion for Pi Share Receiver.
+
+drawj2d runs on the JVM, and on a Raspberry Pi starting the JVM costs
+seconds before the first page is drawn. The batcher collects the HCL files
+that are ready for conversion within a short window, joins them into one
+script (page after page, the page size set once) and converts that in a
+single drawj2d run. The resulting .rmdoc is then split back into one
+archive per job by the jobs' page counts, so a bulk import pays the JVM
+start once per batch instead of once per article.
+
+If a batched run fails, its jobs are converted one at a time, so one bad
+script cannot fail the others.
+"""
+
+import os
+import time
+import queue
+import threading
+import subprocess
+import logging
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+from .rmdoc import RmdocError, split_rmdoc
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+NEWPAGE = 'puts "newpage"'
+
+# drawj2d flags producing an .rmdoc with v6 pages
+RMDOC_FLAGS = ("-Trmdoc", "-rmv6")
+
+def run_drawj2d(drawj2d_path: str, hcl_path: str, rmdoc_path: str) -> bool:
+    """Convert one HCL file to an .rmdoc; return whether it succeeded."""
+    cmd = [drawj2d_path, *RMDOC_FLAGS, "-o", rmdoc_path, hcl_path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError as e:
+        logger.error(f"Could not run drawj2d on {hcl_path}: {e}")
+        return False
+    if result.returncode != 0 or not os.path.exists(rmdoc_path):
+        logger.error(f"drawj2d failed on {hcl_path}: exit code {result.returncode}: {result.stderr.strip()}")
+        return False
+    return True
+
+class ConversionJob:
+    """One HCL file waiting for conversion."""
+
+    __slots__ = ("hcl_path", "rmdoc_path", "title", "future")
+
+    def __init__(self, hcl_path: str, rmdoc_path: str, title: str):
+        self.hcl_path = hcl_path
+        self.rmdoc_path = rmdoc_path
+        self.title = title
+        self.future: Future = Future()
+
+class ConversionBatcher:
+    """Converts HCL files that arrive close together in one drawj2d run."""
+
+    def __init__(self, drawj2d_path: str, temp_dir: str, window: float = 0.5, max_jobs: int = 8):
+        """Start the batching thread.
+
+        Args:
+            drawj2d_path: Path to drawj2d executable
+            temp_dir: Directory for the joined scripts and their output
+            window: Seconds a batch waits for more jobs after its first one
+            max_jobs: Jobs at most in one batch
+        """
+        self.drawj2d_path = drawj2d_path
+        self.temp_dir = temp_dir
+        self.window = window
+        self.max_jobs = max(1, max_jobs)
+        self.counters = {"jobs": 0, "batches": 0, "drawj2d_runs": 0, "fallbacks": 0}
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._closed = False
+        os.makedirs(temp_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="conversion-batcher")
+        self._thread.start()
+
+    def submit(self, hcl_path: str, rmdoc_path: str, title: str = "") -> Future:
+        """Queue an HCL file for conversion.
+
+        Args:
+            hcl_path: Script to convert
+            rmdoc_path: Archive to write
+            title: Visible name of the document (default: the file name)
+
+        Returns:
+            Future resolving to whether rmdoc_path was written
+        """
+        job = ConversionJob(hcl_path, rmdoc_path, title or os.path.splitext(os.path.basename(hcl_path))[0])
+        if self._closed:
+            job.future.set_result(False)
+            return job.future
+        self._jobs.put(job)
+        return job.future
+
+    def convert(self, hcl_path: str, rmdoc_path: str, title: str = "", timeout: Optional[float] = None) -> bool:
+        """Convert an HCL file as part of the next batch and wait for the result."""
+        return self.submit(hcl_path, rmdoc_path, title).result(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counts of jobs, batches, drawj2d runs and fallbacks to single runs."""
+        with self._lock:
+            return dict(self.counters)
+
+    def close(self) -> None:
+        """Finish the queued jobs and stop the batching thread."""
+        self._closed = True
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def _run(self) -> None:
+        """Collect jobs into batches and convert them until closed."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(batch) < self.max_jobs:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._jobs.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+
+            try:
+                self._convert_batch(batch)
+            except Exception as e:
+                logger.error(f"Batched conversion failed: {e}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_result(False)
+            if stop:
+                return
+
+    def _convert_batch(self, batch: List[ConversionJob]) -> None:
+        """Convert a batch: jobs sharing a page size in one run each, the rest alone."""
+        self._count("jobs", len(batch))
+        self._count("batches")
+
+        groups: Dict[str, List] = {}
+        for job in batch:
+            try:
+                with open(job.hcl_path, 'r', encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+            except OSError as e:
+                logger.error(f"Cannot read {job.hcl_path}: {e}")
+                job.future.set_result(False)
+                continue
+            size = next((line for line in lines if line.startswith('puts "size ')), "")
+            groups.setdefault(size, []).append((job, lines))
+
+        for size, members in groups.items():
+            if len(members) == 1 or not size:
+                for job, _ in members:
+                    self._convert_alone(job)
+            elif not self._convert_joined(size, members):
+                self._count("fallbacks")
+                for job, _ in members:
+                    self._convert_alone(job)
+
+    def _convert_alone(self, job: ConversionJob) -> None:
+        self._count("drawj2d_runs")
+        job.future.set_result(run_drawj2d(self.drawj2d_path, job.hcl_path, job.rmdoc_path))
+
+    def _convert_joined(self, size: str, members: List) -> bool:
+        """Convert scripts of one page size in a single run and split the result.
+
+        Returns:
+            Whether every job's archive was written
+        """
+        stamp = f"{os.getpid()}_{threading.get_ident()}_{time.monotonic_ns()}"
+        joined_path = os.path.join(self.temp_dir, f"batch_{stamp}.hcl")
+        output_path = os.path.join(self.temp_dir, f"batch_{stamp}.rmdoc")
+
+        lines = [size]
+        page_counts = []
+        for position, (_, job_lines) in enumerate(members):
+            if position:
+                lines.append(NEWPAGE)
+            # The page size is set once, at the top of the joined script
+            lines.extend(line for line in job_lines if line != size)
+            page_counts.append(job_lines.count(NEWPAGE) + 1)
+
+        started = time.time()
+        try:
+            with open(joined_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            self._count("drawj2d_runs")
+            if not run_drawj2d(self.drawj2d_path, joined_path, output_path):
+                return False
+            jobs = [job for job, _ in members]
+            split_rmdoc(output_path, page_counts, [job.rmdoc_path for job in jobs], [job.title for job in jobs])
+        except (OSError, RmdocError) as e:
+            logger.error(f"Could not convert batch of {len(members)} jobs: {e}")
+            return False
+        finally:
+            for path in (joined_path, output_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        logger.info(f"Converted {len(members)} documents ({sum(page_counts)} pages) in one drawj2d run "
+                    f"in {time.time() - started:.1f}s")
+        for job in jobs:
+            job.future.set_result(True)
+        return True
@@ -0,0 +1,195 @@
+"""Conversion result cache for Pi Share Receiver.
+
+Converting an HCL script with drawj2d is the slowest step of a share, and
+re-shares, retries and re-uploads convert the same content again. The
+cache keys a converted document by a SHA-256 digest of what determines it:
+
+- the drawj2d flags;
+- every line of the script;
+- for image commands, the digest of the image file instead of its path, so
+  a moved file still hits and a changed file at the same path does not.
+
+Scripts converted through the cache carry nothing that changes from run to
+run: DocumentService leaves the "Generated:" timestamp out of them and
+stamps the generation time into the document metadata instead.
+
+Entries are stored on disk, bounded in size and evicted least recently
+used first. On a hit the cached document is linked (or copied) to the
+requested output path and drawj2d is not run at all.
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import threading
+import logging
+from typing import Any, Dict, Iterable
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# An image command and its quoted path
+IMAGE_LINE = re.compile(r'(puts "image [\d.\s]+ )\\"(.*)\\""')
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents, or of its path if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    except OSError:
+        digest.update(f"unreadable:{path}".encode('utf-8'))
+    return digest.hexdigest()
+
+def hcl_digest(hcl_path: str) -> str:
+    """SHA-256 of an HCL script, with image contents in place of image paths.
+
+    Raises:
+        OSError: If the script cannot be read
+    """
+    digest = hashlib.sha256()
+    images: Dict[str, str] = {}
+    with open(hcl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            match = IMAGE_LINE.fullmatch(line)
+            if match:
+                path = match.group(2)
+                if path not in images:
+                    images[path] = file_digest(path)
+                line = f"{match.group(1)}sha256:{images[path]}"
+            digest.update(line.encode('utf-8'))
+            digest.update(b'\n')
+    return digest.hexdigest()
+
+class ConversionCache:
+    """Size-bounded disk cache of converted documents."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 200 * 1024 * 1024):
+        """Initialize the cache directory.
+
+        Args:
+            cache_dir: Directory for cached documents
+            max_bytes: Total size the store is kept under
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def key(body_digest: str, flags: Iterable[str]) -> str:
+        """Cache key of a script digest (see hcl_digest) converted with the given drawj2d flags."""
+        return hashlib.sha256("\0".join([body_digest, *flags]).encode('utf-8')).hexdigest()
+
+    def fetch(self, key: str, extension: str, out_path: str) -> bool:
+        """Put the cached document for a key at out_path.
+
+        Args:
+            key: Cache key
+            extension: File extension of the document (".rm", ".rmdoc")
+            out_path: Where the document is wanted
+
+        Returns:
+            True on a hit, False if nothing is cached under the key
+        """
+        cached_path = self._path(key, extension)
+        if not os.path.exists(cached_path):
+            return False
+        try:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+            try:
+                os.link(cached_path, out_path)
+            except OSError:
+                shutil.copyfile(cached_path, out_path)
+            # Touch the entry so eviction sees it as recently used
+            os.utime(cached_path)
+        except OSError as e:
+            logger.warning(f"Could not use cached conversion {cached_path}: {e}")
+            return False
+
+        with self._lock:
+            self._stats["hits"] += 1
+        return True
+
+    def record_miss(self) -> None:
+        """Count a conversion that had to run drawj2d."""
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def store(self, key: str, extension: str, path: str) -> bool:
+        """Store a converted document under a key.
+
+        Args:
+            key: Cache key
+            extension: File extension of the document
+            path: The converted document
+
+        Returns:
+            Whether the document was stored
+        """
+        cached_path = self._path(key, extension)
+        tmp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if os.path.getsize(path) > self.max_bytes // 10:
+                return False
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, cached_path)
+        except OSError as e:
+            logger.warning(f"Could not cache conversion {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        with self._lock:
+            self._stats["stores"] += 1
+        self._evict()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the hit rate for this process."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+
+    def _evict(self) -> None:
+        """Remove least recently used documents until the store is under max_bytes."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    if dir_entry.name.endswith('.tmp'):
+                        continue
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                    total += stat.st_size
+        except OSError as e:
+            logger.warning(f"Could not scan conversion cache {self.cache_dir}: {e}")
+            return
+
+        if total <= self.max_bytes:
+            return
+
+        # Evict down to 90% so every store does not trigger another scan-and-evict
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            with self._lock:
+                self._stats["evictions"] += 1
@@ -0,0 +1,85 @@
+"""Text deduplication index for Pi Share Receiver.
+
+Answers "is this text already contained in something extracted before?"
+without scanning every earlier block. Each added text is indexed by the
+hash of its normalized form and by the hashes of its word shingles (runs of
+consecutive words); a query is a duplicate if it matches exactly or if all
+of its shingles are already indexed. Adding and querying cost time linear
+in the text length, so deduplicating n blocks is linear instead of the
+O(n²) substring scans it replaces.
+"""
+
+import logging
+from typing import List
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class DedupIndex:
+    """Index of extracted texts supporting exact and containment lookups."""
+
+    def __init__(self, shingle_size: int = 3):
+        """Initialize an empty index.
+
+        Args:
+            shingle_size: Words per shingle. Texts shorter than this are only
+                matched exactly.
+        """
+        self.shingle_size = shingle_size
+        self._exact = set()
+        self._shingles = set()
+        self._count = 0
+
+    def add(self, text: str) -> None:
+        """Index a text so later lookups can find it and its fragments."""
+        words = text.split()
+        if not words:
+            return
+        self._exact.add(hash(' '.join(words)))
+        self._shingles.update(self._shingle_hashes(words))
+        self._count += 1
+
+    def contains(self, text: str, min_overlap: float = 1.0) -> bool:
+        """Check whether a text equals or is contained in an indexed text.
+
+        Containment is word-based: a fragment that starts or ends inside a
+        word is not recognized, and a text whose shingles are spread over
+        several indexed texts is reported as contained. Both are acceptable
+        for dropping repeated page fragments.
+
+        Args:
+            text: Text to look up
+            min_overlap: Fraction of the text's shingles that must be indexed.
+                Below 1.0, a wrapper whose text runs across several indexed
+                blocks counts as a duplicate despite the shingles spanning
+                the block boundaries.
+
+        Returns:
+            True if the text is a duplicate
+        """
+        words = text.split()
+        if not words:
+            return True
+        if hash(' '.join(words)) in self._exact:
+            return True
+        if len(words) < self.shingle_size:
+            return False
+        shingles = self._shingles
+        total = len(words) - self.shingle_size + 1
+        allowed_missing = int(total * (1.0 - min_overlap))
+        missing = 0
+        for shingle in self._shingle_hashes(words):
+            if shingle not in shingles:
+                missing += 1
+                if missing > allowed_missing:
+                    return False
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _shingle_hashes(self, words: List[str]):
+        """Yield the hash of every run of shingle_size consecutive words."""
+        size = self.shingle_size
+        for i in range(len(words) - size + 1):
+            yield hash(tuple(words[i:i + size]))
@@ -0,0 +1,245 @@
+"""Typed intermediate document model for Pi Share Receiver.
+
+Scrapers exchange content as JSON: a "structured_content" list of dicts
+such as {"type": "h2", "content": ...} or {"type": "list", "items": [...]}.
+This module gives that content a typed form in which every block is a
+small __slots__ object with fixed fields, so layout code reads attributes
+instead of re-checking keys and types:
+
+    Heading(level, text)          h1 … h6 and "heading"
+    Paragraph(text)               paragraphs and any unknown block type
+    ListItem(text, list_type, starts_list)
+                                  one item of a ul/ol list or a legacy bullet
+    Code(text)                    preformatted code
+    Quote(text)                   blockquotes
+    Image(image_id)               an image placed in the text
+
+from_dicts and to_dicts convert to and from the JSON form; a list becomes
+one ListItem per item and is grouped back on the way out. normalize turns
+scraper output into canonical blocks in a single pass.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+HEADING_TYPES = {'heading': 1, 'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+class ContentBlock(ABC):
+    """Base class of the typed blocks.
+
+    Subclasses name their fields in __slots__, in constructor order.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the block in the scrapers' JSON form."""
+
+    def _fields(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class Heading(ContentBlock):
+    """A section heading, level 1 to 6."""
+
+    __slots__ = ("level", "text")
+
+    def __init__(self, level: int, text: str):
+        self.level = level
+        self.text = text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": f"h{self.level}", "content": self.text}
+
+class Paragraph(ContentBlock):
+    """A paragraph of running text."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "paragraph", "content": self.text}
+
+class ListItem(ContentBlock):
+    """One list item; starts_list marks the first item of a list."""
+
+    __slots__ = ("text", "list_type", "starts_list")
+
+    def __init__(self, text: str, list_type: str = "ul", starts_list: bool = True):
+        self.text = text
+        self.list_type = list_type
+        self.starts_list = starts_list
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "list", "list_type": self.list_type, "items": [self.text]}
+
+class Code(ContentBlock):
+    """Preformatted code, line breaks kept."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "code", "content": self.text}
+
+class Quote(ContentBlock):
+    """A blockquote."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "blockquote", "content": self.text}
+
+class Image(ContentBlock):
+    """An image placed in the text, referring to the content's images by id."""
+
+    __slots__ = ("image_id",)
+
+    def __init__(self, image_id: Optional[str]):
+        self.image_id = image_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "image", "image_id": self.image_id}
+
+def _text(value: Any) -> str:
+    """Coerce a scraped value to text."""
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+def from_dict(item: Dict[str, Any]) -> Iterator[ContentBlock]:
+    """Yield the typed blocks of one JSON content item.
+
+    A list yields one ListItem per item; a typed block is passed through.
+    """
+    if isinstance(item, ContentBlock):
+        yield item
+        return
+    if not isinstance(item, dict):
+        yield Paragraph(_text(item))
+        return
+
+    item_type = item.get('type', 'paragraph')
+    if item_type == 'list' and 'items' in item:
+        list_type = item.get('list_type') or 'ul'
+        for position, text in enumerate(item.get('items') or []):
+            yield ListItem(_text(text), list_type, position == 0)
+    elif item_type in HEADING_TYPES:
+        yield Heading(HEADING_TYPES[item_type], _text(item.get('content')))
+    elif item_type == 'image':
+        yield Image(item.get('image_id'))
+    elif item_type == 'code':
+        yield Code(_text(item.get('content')))
+    elif item_type == 'blockquote':
+        yield Quote(_text(item.get('content')))
+    elif item_type in ('bullet', 'list'):
+        yield ListItem(_text(item.get('content')))
+    else:
+        yield Paragraph(_text(item.get('content')))
+
+def from_dicts(items: Iterable[Dict[str, Any]]) -> List[ContentBlock]:
+    """Convert a structured_content list to typed blocks.
+
+    Args:
+        items: JSON content items, typed blocks or a mix of both
+
+    Returns:
+        The typed blocks in document order
+    """
+    blocks = []
+    for item in items or ():
+        blocks.extend(from_dict(item))
+    return blocks
+
+def normalize(items: Iterable[Dict[str, Any]], merge_chars: int = 0) -> Iterator[ContentBlock]:
+    """Yield canonical blocks for scraped content in one pass.
+
+    Lists are expanded into their items, text is trimmed and its whitespace
+    collapsed (code keeps its lines), and blocks left empty are dropped.
+    Adjacent paragraphs shorter than merge_chars are merged into one until
+    the merged paragraph reaches merge_chars.
+
+    Args:
+        items: JSON content items, typed blocks or a mix of both
+        merge_chars: Length below which a paragraph counts as short (0 = never merge)
+
+    Returns:
+        Iterator over the normalized blocks; the input blocks are not modified
+    """
+    pending = None  # Short paragraph that a following short one may join
+    in_list = False
+    for item in items or ():
+        for block in from_dict(item):
+            kind = type(block)
+            if kind is Image:
+                if not block.image_id:
+                    continue
+            elif kind is Code:
+                text = block.text.strip('\n').rstrip()
+                if not text:
+                    continue
+                if text != block.text:
+                    block = Code(text)
+            else:
+                text = ' '.join(block.text.split())
+                if not text:
+                    continue
+                if kind is Paragraph:
+                    if len(text) < merge_chars:
+                        if pending is None:
+                            pending = text
+                        else:
+                            pending = f"{pending} {text}"
+                            if len(pending) >= merge_chars:
+                                yield Paragraph(pending)
+                                pending = None
+                        in_list = False
+                        continue
+                    if text != block.text:
+                        block = Paragraph(text)
+                elif kind is ListItem:
+                    # An item whose list start was dropped starts the list itself
+                    if text != block.text or not (block.starts_list or in_list):
+                        block = ListItem(text, block.list_type, block.starts_list or not in_list)
+                elif text != block.text:
+                    block = Heading(block.level, text) if kind is Heading else kind(text)
+
+            if pending is not None:
+                yield Paragraph(pending)
+                pending = None
+            in_list = kind is ListItem
+            yield block
+
+    if pending is not None:
+        yield Paragraph(pending)
+
+def to_dicts(blocks: Iterable[ContentBlock]) -> List[Dict[str, Any]]:
+    """Convert typed blocks back to a structured_content list.
+
+    Consecutive items of one list are grouped into a single list dict.
+    """
+    items = []
+    for block in blocks:
+        if type(block) is ListItem and not block.starts_list and items and items[-1].get('type') == 'list':
+            items[-1]['items'].append(block.text)
+        else:
+            items.append(block.to_dict())
+    return items
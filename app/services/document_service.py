@@ -11,21 +11,33 @@ import logging
 import subprocess
 import markdown
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
+from .text_layout import TextLayout, FONT_SCALE
+from .page_layout import Block, Line, Page, Paginator, page_map_entry
+from .hcl_emitter import HCLEmitter, escape_hcl, format_number
+from .document_model import Heading, ListItem, Code, Image, from_dicts
+from .rmdoc import RmdocError, merge_rmdocs, read_rmdoc, write_rmdoc
+from .conversion_batcher import ConversionBatcher, RMDOC_FLAGS, run_drawj2d
+from .conversion_cache import ConversionCache, hcl_digest
 
 # Import configuration with proper relative import
 try:
     from ..config import CONFIG
 except ImportError:
-    # Fallback to defaults if config cannot be imported
-    CONFIG = {
-        'PAGE_WIDTH': 2160,  # Updated for Remarkable Pro
-        'PAGE_HEIGHT': 1620,  # Updated for Remarkable Pro
-        'PAGE_MARGIN': 100,
-        'HEADING_FONT': 'Lines-Bold',  # Updated to Lines font family
-        'BODY_FONT': 'Lines',          # Updated to Lines font family
-        'CODE_FONT': 'Lines'           # Updated to Lines font family
-    }
+    try:
+        # The server runs with the app directory on sys.path
+        from config import CONFIG
+    except ImportError:
+        # Fallback to defaults if config cannot be imported
+        CONFIG = {
+            'PAGE_WIDTH': 2160,  # Updated for Remarkable Pro
+            'PAGE_HEIGHT': 1620,  # Updated for Remarkable Pro
+            'PAGE_MARGIN': 100,
+            'HEADING_FONT': 'Lines-Bold',  # Updated to Lines font family
+            'BODY_FONT': 'Lines',          # Updated to Lines font family
+            'CODE_FONT': 'Lines'           # Updated to Lines font family
+        }
 
 # Import utility functions for error handling
 try:
@@ -41,18 +53,28 @@ except ImportError:
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# drawj2d flags of a single-run conversion: -Trm targets reMarkable, -rmv6 the
+# v6 lines format introduced in firmware 3.0
+RM_FLAGS = ("-Trm", "-rmv6")
+
 class DocumentService:
     """Creates reMarkable documents from web content."""
     
-    def __init__(self, temp_dir: str, drawj2d_path: str):
+    def __init__(self, temp_dir: str, drawj2d_path: str, batcher: Optional[ConversionBatcher] = None,
+                 cache: Optional[ConversionCache] = None):
         """Initialize with directories and paths.
         
         Args:
             temp_dir: Directory for temporary files
             drawj2d_path: Path to drawj2d executable
+            batcher: Shared batcher that converts documents ready at the same
+                time in one drawj2d run (default: one run per document)
+            cache: Shared cache of converted documents (default: always convert)
         """
         self.temp_dir = temp_dir
         self.drawj2d_path = drawj2d_path
+        self.batcher = batcher
+        self.cache = cache
         os.makedirs(temp_dir, exist_ok=True)
         
         # Font configuration from central config - use Lines font for Remarkable
@@ -65,9 +87,25 @@ class DocumentService:
         self.page_height = 1620  # Updated for Remarkable Pro
         self.margin = 120
         self.line_height = 40
+        self.body_size = 20
+        
+        # Text is wrapped by measured width, with width tables cached next to the documents
+        self.layout = TextLayout(
+            cache_dir=os.path.join(temp_dir, 'font_metrics'),
+            font_dir=CONFIG.get('FONT_DIR'),
+            scale=CONFIG.get('FONT_SCALE', FONT_SCALE)
+        )
+        
+        # Long documents are converted in page chunks by concurrent drawj2d processes
+        self.convert_workers = CONFIG.get('CONVERT_WORKERS', 4)
+        self.chunk_pages = CONFIG.get('CONVERT_CHUNK_PAGES', 10)
 
     def create_hcl(self, url: str, qr_path: str, content: Dict[str, Any]) -> Optional[str]:
-        """Create HCL script from web content."""
+        """Create HCL script from web content.
+        
+        The content is laid out as blocks of lines, broken into pages at line
+        boundaries and written together with a page map (see load_page_map).
+        """
         try:
             # Ensure we have valid content, even if minimal
             if not content:
@@ -79,145 +117,220 @@ class DocumentService:
             hcl_filename = f"doc_{hash(url)}_{int(time.time())}.hcl"
             hcl_path = os.path.join(self.temp_dir, hcl_filename)
             
-            with open(hcl_path, 'w', encoding='utf-8') as f:
-                # Set page size - use direct syntax based on drawj2d docs
-                f.write(f'puts "size {self.page_width} {self.page_height}"\n\n')
-                
-                # Set font and pen
-                f.write(f'puts "set_font {self.heading_font} 36"\n')
-                f.write('puts "pen black"\n\n')
-                
-                # Set title position
-                y_pos = self.margin
-                
-                # Add title
-                title = content.get('title', 'Untitled Document')
-                f.write(f'puts "text {self.margin} {y_pos} \\"{self._escape_hcl(title)}\\""\n')
-                y_pos += self.line_height * 1.5  # Extra spacing after title
-                
-                # Add URL under title
-                f.write(f'puts "set_font {self.body_font} 20"\n')
-                f.write(f'puts "text {self.margin} {y_pos} \\"Source: {self._escape_hcl(url)}\\""\n')
-                y_pos += self.line_height
-                
-                # Add horizontal line separator
-                f.write(f'puts "line {self.margin} {y_pos} {self.page_width - self.margin} {y_pos} width=1.0"\n')
-                y_pos += self.line_height
-                
-                # Add QR code if available
-                if os.path.exists(qr_path):
-                    qr_size = 350
-                    qr_x = self.page_width - self.margin - qr_size
-                    f.write(f'puts "rectangle {qr_x-5} {y_pos-5} {qr_size+10} {qr_size+10} width=1.0"\n')
-                    f.write(f'puts "image {qr_x} {y_pos} {qr_size} {qr_size} \\"{qr_path}\\""\n')
-                
-                # Process structured content
-                y_pos += qr_size + self.line_height
-                
-                structured_content = content.get('structured_content', [])
-                
-                for item in structured_content:
-                    item_type = item.get('type', 'paragraph')
-                    item_content = item.get('content', '')
-                    
-                    if not item_content:
-                        continue
-                        
-                    # Check if we need a new page
-                    if y_pos > (self.page_height - self.margin * 2):
-                        f.write('puts "newpage"\n')
-                        y_pos = self.margin
-                    
-                    # Process based on content type
-                    if item_type == 'h1' or item_type == 'heading':
-                        f.write(f'puts "set_font {self.heading_font} 32"\n')
-                        f.write(f'puts "text {self.margin} {y_pos} \\"{self._escape_hcl(item_content)}\\""\n')
-                        f.write(f'puts "set_font {self.body_font} 20"\n')
-                        y_pos += self.line_height * 1.5
-                    elif item_type == 'h2':
-                        f.write(f'puts "set_font {self.heading_font} 28"\n')
-                        f.write(f'puts "text {self.margin} {y_pos} \\"{self._escape_hcl(item_content)}\\""\n')
-                        f.write(f'puts "set_font {self.body_font} 20"\n')
-                        y_pos += self.line_height * 1.3
-                    elif item_type == 'h3' or item_type in ['h4', 'h5', 'h6']:
-                        f.write(f'puts "set_font {self.heading_font} 24"\n')
-                        f.write(f'puts "text {self.margin} {y_pos} \\"{self._escape_hcl(item_content)}\\""\n')
-                        f.write(f'puts "set_font {self.body_font} 20"\n')
-                        y_pos += self.line_height * 1.2
-                    elif item_type == 'code':
-                        # Start code block
-                        code_x = self.margin + 20
-                        code_y = y_pos + self.line_height
-                        code_lines = item_content.split('\n')
-                        code_height = len(code_lines) * self.line_height + self.line_height
-                        
-                        # Draw code block background and border
-                        f.write(f'puts "rectangle {self.margin} {y_pos} {self.page_width - self.margin*2} {code_height} width=1.0"\n')
-                        
-                        # Process each line of code
-                        f.write(f'puts "set_font {self.code_font} 18"\n')
-                        for i, line in enumerate(code_lines):
-                            line_y = code_y + (i * self.line_height)
-                            f.write(f'puts "text {code_x} {line_y} \\"{self._escape_hcl(line)}\\""\n')
-                        
-                        f.write(f'puts "set_font {self.body_font} 20"\n')
-                        y_pos += code_height + self.line_height
-                    elif item_type == 'list' or item_type == 'bullet':
-                        list_indent = 30
-                        
-                        if item_type == 'list' and 'items' in item:
-                            # Handle old-style list format
-                            for list_item in item['items']:
-                                f.write(f'puts "text {self.margin} {y_pos} \\"• \\"\n')
-                                f.write(f'puts "text {self.margin + list_indent} {y_pos} \\"{self._escape_hcl(list_item)}\\""\n')
-                                y_pos += self.line_height
-                        else:
-                            # Handle single bullet point
-                            f.write(f'puts "text {self.margin} {y_pos} \\"• \\"\n')
-                            f.write(f'puts "text {self.margin + list_indent} {y_pos} \\"{self._escape_hcl(item_content)}\\""\n')
-                            y_pos += self.line_height
-                    else:
-                        # Default to paragraph
-                        # Split long content into multiple lines if needed
-                        max_chars_per_line = 85
-                        paragraph_text = item_content
-                        
-                        # Word wrap
-                        words = paragraph_text.split()
-                        current_line = ""
-                        
-                        for word in words:
-                            if len(current_line) + len(word) + 1 <= max_chars_per_line:
-                                current_line += (" " + word if current_line else word)
-                            else:
-                                # Write the current line
-                                f.write(f'puts "text {self.margin} {y_pos} \\"{self._escape_hcl(current_line)}\\""\n')
-                                y_pos += self.line_height
-                                current_line = word
-                        
-                        # Write the last line if not empty
-                        if current_line:
-                            f.write(f'puts "text {self.margin} {y_pos} \\"{self._escape_hcl(current_line)}\\""\n')
-                            y_pos += self.line_height
-                    
-                    # Add spacing between items
-                    y_pos += self.line_height * 0.5
-                
-                # Add timestamp at the bottom of the last page
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f'puts "text {self.margin} {self.page_height - self.margin} \\"Generated: {timestamp}\\""\n')
+            # Lines stop above the bottom margin; the footer goes below them on the last page
+            blocks = self._layout_blocks(url, qr_path, content)
+            paginator = Paginator(top=self.margin, bottom=self.page_height - self.margin * 2)
+            pages = paginator.paginate(blocks)
+            
+            emitter = HCLEmitter()
+            page_map = self._emit_pages(emitter, pages)
+            page_map["title"] = content.get('title', 'Untitled Document')
+            size = emitter.write(hcl_path)
+            with open(self.page_map_path(hcl_path), 'w', encoding='utf-8') as f:
+                json.dump(page_map, f, indent=1)
             
-            logger.info(f"Created HCL file: {hcl_path}")
+            logger.info(f"Created HCL file: {hcl_path} ({len(pages)} pages, {size} bytes, {emitter.stats()})")
             # Log a preview for debugging
-            with open(hcl_path, 'r', encoding='utf-8') as f:
-                hcl_preview = f.read(200)
-                logger.info(f"HCL preview (first 200 chars): {hcl_preview}")
+            logger.debug(f"HCL preview (first 200 chars): {emitter.getvalue()[:200]}")
                 
             return hcl_path
         except Exception as e:
             logger.error(f"Error creating HCL document: {e}")
             return None
 
+    @staticmethod
+    def page_map_path(hcl_path: str) -> str:
+        """Return the path of the page map written next to an HCL file."""
+        return os.path.splitext(hcl_path)[0] + '.pages.json'
+
+    @classmethod
+    def load_page_map(cls, hcl_path: str) -> Optional[Dict[str, Any]]:
+        """Load the page map of an HCL file created by create_hcl.
+        
+        Args:
+            hcl_path: Path to the HCL file
+            
+        Returns:
+            Dict with the preamble's and each page's HCL line range, the font in
+            effect at the start of each page and the content items on it, or
+            None if the file has no page map
+        """
+        try:
+            with open(cls.page_map_path(hcl_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _layout_blocks(self, url: str, qr_path: str, content: Dict[str, Any]) -> List[Block]:
+        """Lay out the document header and content items as blocks of lines."""
+        content_width = self.page_width - self.margin * 2
+        spacing = self.line_height * 0.5
+        blocks = []
+        
+        # Header: title, source, separator and QR code, kept together
+        title = content.get('title', 'Untitled Document')
+        header = self._text_lines(title, self.heading_font, 36, self.margin, self.line_height * 1.5)
+        header.append(Line(self.line_height, [("text", self.margin, 0, f"Source: {url}", self.body_font, self.body_size)]))
+        header.append(Line(self.line_height, [("line", self.margin, self.page_width - self.margin, 0, 1.0)]))
+        if qr_path and os.path.exists(qr_path):
+            qr_size = 350
+            qr_x = self.page_width - self.margin - qr_size
+            header.append(Line(qr_size + self.line_height, [
+                ("rectangle", qr_x - 5, -5, qr_size + 10, qr_size + 10),
+                ("image", qr_x, 0, qr_size, qr_size, qr_path),
+            ]))
+        else:
+            header.append(Line(self.line_height, []))
+        blocks.append(Block(header, breakable=False))
+        
+        # Images prepared by ImageService, placed where the page had them
+        images = {image.get('id'): image for image in content.get('images', []) if image.get('path')}
+        placed_images = set()
+        
+        # Content items as typed blocks; the items of one list form one block of lines
+        heading_styles = {1: (32, 1.5), 2: (28, 1.3)}
+        index = -1
+        for item in from_dicts(content.get('structured_content', [])):
+            kind = type(item)
+            if kind is not ListItem or item.starts_list:
+                index += 1
+            
+            if kind is Image:
+                if item.image_id in images and item.image_id not in placed_images:
+                    blocks.append(self._image_block(images[item.image_id], index))
+                    placed_images.add(item.image_id)
+                continue
+            
+            if not item.text:
+                continue
+            
+            if kind is Heading:
+                size, advance = heading_styles.get(item.level, (24, 1.2))
+                lines = self._text_lines(item.text, self.heading_font, size, self.margin, self.line_height * advance)
+                blocks.append(Block(lines, space_after=spacing, breakable=False, keep_with_next=True, index=index))
+            elif kind is Code:
+                # Framed block; each page's part gets its own frame with a line of padding on top
+                code_x = self.margin + 20
+                lines = [Line(self.line_height, [("text", code_x, 0, line, self.code_font, 18)])
+                         for line in item.text.split('\n')]
+                blocks.append(Block(lines, space_after=self.line_height + spacing,
+                                    frame=(self.margin, content_width, self.line_height), index=index))
+            elif kind is ListItem:
+                list_indent = 30
+                lines = self._text_lines(item.text, self.body_font, self.body_size,
+                                         self.margin + list_indent, self.line_height)
+                lines[0].ops.insert(0, ("text", self.margin, 0, "• ", self.body_font, self.body_size))
+                if not item.starts_list and blocks and blocks[-1].index == index:
+                    blocks[-1].lines.extend(lines)
+                else:
+                    blocks.append(Block(lines, space_after=spacing, index=index))
+            else:
+                # Paragraphs and quotes, wrapped by measured width
+                lines = [Line(self.line_height, [("text", self.margin, 0, line, self.body_font, self.body_size)])
+                         for line in self.layout.wrap(item.text, self.body_font, self.body_size, content_width)]
+                blocks.append(Block(lines, space_after=spacing, index=index))
+        
+        # Images the scraper found but did not place in the content go last
+        for image_id, image in images.items():
+            if image_id not in placed_images:
+                blocks.append(self._image_block(image, None))
+        
+        return blocks
+
+    def _text_lines(self, text: str, font: str, size: float, x: float, last_height: float) -> List[Line]:
+        """Wrap text into lines to the right margin.
+        
+        Args:
+            text: Text to lay out
+            font: Font the text is set in
+            size: Font size the text is set in
+            x: Left edge of the text
+            last_height: Advance below the last line
+            
+        Returns:
+            The lines; lines before the last advance by the line height scaled to the font size
+        """
+        wrapped = self.layout.wrap(text, font, size, self.page_width - self.margin - x) or [text]
+        lines = [Line(self.line_height * size / self.body_size, [("text", x, 0, line, font, size)]) for line in wrapped]
+        lines[-1].height = last_height
+        return lines
+
+    def _image_block(self, image: Dict[str, Any], index: Optional[int]) -> Block:
+        """Lay out an image scaled to the content width and at most a page high.
+        
+        Args:
+            image: Image dict with path, width and height
+            index: Position of the image's content item, if it has one
+            
+        Returns:
+            A block the paginator shrinks into the rest of a page when at least
+            half a page is left, and moves to a new page otherwise
+        """
+        content_width = self.page_width - self.margin * 2
+        usable_height = self.page_height - self.margin * 3
+        
+        width = min(image['width'], content_width)
+        height = image['height'] * width / image['width']
+        if height > usable_height:
+            width, height = width * usable_height / height, usable_height
+        
+        line = Line(height, [("image", self.margin, 0, width, height, image['path'])], shrinkable=True)
+        return Block([line], space_after=self.line_height * 0.5, breakable=False, index=index)
+
+    def _emit_pages(self, emitter: HCLEmitter, pages: List[Page]) -> Dict[str, Any]:
+        """Emit paginated lines as HCL, with the timestamp in the last page's footer.
+        
+        Without a cache only: a cached conversion would carry the time of its
+        first conversion (see create_rmdoc).
+        
+        Args:
+            emitter: Emitter collecting the script
+            pages: Pages from the paginator
+            
+        Returns:
+            The page map
+        """
+        emitter.size(self.page_width, self.page_height)
+        emitter.set_font(self.heading_font, 36)
+        emitter.set_pen("black")
+        preamble_end = len(emitter)
+        
+        entries = []
+        for number, page in enumerate(pages):
+            if number:
+                emitter.newpage()
+            first, page_font = len(emitter), emitter.font
+            
+            for x, y, width, height in page.frames:
+                emitter.rectangle(x, y, width, height)
+            for top, line in page.placed:
+                for op in line.ops:
+                    kind = op[0]
+                    if kind == "text":
+                        _, x, dy, text, font, size = op
+                        emitter.text(x, top + dy, text, (font, size))
+                    elif kind == "image":
+                        _, x, dy, width, height, path = op
+                        emitter.image(x, top + dy, width, height, path)
+                    elif kind == "line":
+                        _, x1, x2, dy, width = op
+                        emitter.line(x1, top + dy, x2, top + dy, width)
+                    elif kind == "rectangle":
+                        _, x, dy, width, height = op
+                        emitter.rectangle(x, top + dy, width, height)
+            
+            if number == len(pages) - 1 and self.cache is None:
+                # Add timestamp in the footer of the last page
+                emitter.timestamp(self.margin, self.page_height - self.margin, (self.body_font, self.body_size))
+            entries.append(page_map_entry(number, page, (first, len(emitter)), page_font))
+        
+        return {
+            "page_width": self.page_width,
+            "page_height": self.page_height,
+            "preamble": [0, preamble_end],
+            "pages": entries,
+        }
+
     def create_pdf_hcl(self, pdf_path: str, title: str, qr_path: str = None) -> Optional[str]:
         """Create HCL script for PDF file."""
         try:
@@ -227,46 +340,45 @@ class DocumentService:
             hcl_filename = f"pdf_{hash(pdf_path)}_{int(time.time())}.hcl"
             hcl_path = os.path.join(self.temp_dir, hcl_filename)
             
-            with open(hcl_path, 'w', encoding='utf-8') as f:
-                # Set page size - use direct syntax based on drawj2d docs
-                f.write(f'puts "size {self.page_width} {self.page_height}"\n\n')
-                
-                # Set font and pen
-                f.write(f'puts "set_font {self.heading_font} 36"\n')
-                f.write('puts "pen black"\n\n')
-                
-                # Set title position
-                y_pos = self.margin
-                
-                # Add title
-                f.write(f'puts "text {self.margin} {y_pos} \\"{self._escape_hcl(title)}\\""\n')
-                y_pos += self.line_height * 1.5
-                
-                # Add URL under title
-                f.write(f'puts "set_font {self.body_font} 20"\n')
-                f.write(f'puts "text {self.margin} {y_pos} \\"Source: {self._escape_hcl(os.path.basename(pdf_path))}\\""\n')
-                y_pos += self.line_height
-                
-                # Add horizontal line separator
-                f.write(f'puts "line {self.margin} {y_pos} {self.page_width - self.margin} {y_pos} width=1.0"\n')
-                y_pos += self.line_height * 2
-                
-                # Add QR code if available
-                if qr_path and os.path.exists(qr_path):
-                    qr_size = 350
-                    qr_x = self.page_width - self.margin - qr_size
-                    f.write(f'puts "rectangle {qr_x-5} {y_pos-5} {qr_size+10} {qr_size+10} width=1.0"\n')
-                    f.write(f'puts "image {qr_x} {y_pos} {qr_size} {qr_size} \\"{qr_path}\\""\n')
-                    y_pos += qr_size + self.line_height
-                
-                # Add instructions for viewing the PDF
-                f.write(f'puts "text {self.margin} {y_pos} \\"This document has been converted to Remarkable format.\\""\n')
-                y_pos += self.line_height
-                f.write(f'puts "text {self.margin} {y_pos} \\"Original PDF: {self._escape_hcl(os.path.basename(pdf_path))}\\""\n')
-                
-                # Add timestamp at the bottom of the page
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f'puts "text {self.margin} {self.page_height - self.margin} \\"Generated: {timestamp}\\""\n')
+            emitter = HCLEmitter()
+            
+            # Set page size, font and pen
+            emitter.size(self.page_width, self.page_height)
+            emitter.set_font(self.heading_font, 36)
+            emitter.set_pen("black")
+            
+            # Set title position
+            y_pos = self.margin
+            
+            # Add title
+            emitter.text(self.margin, y_pos, title)
+            y_pos += self.line_height * 1.5
+            
+            # Add URL under title
+            emitter.text(self.margin, y_pos, f"Source: {os.path.basename(pdf_path)}", (self.body_font, self.body_size))
+            y_pos += self.line_height
+            
+            # Add horizontal line separator
+            emitter.line(self.margin, y_pos, self.page_width - self.margin, y_pos)
+            y_pos += self.line_height * 2
+            
+            # Add QR code if available
+            if qr_path and os.path.exists(qr_path):
+                qr_size = 350
+                qr_x = self.page_width - self.margin - qr_size
+                emitter.rectangle(qr_x - 5, y_pos - 5, qr_size + 10, qr_size + 10)
+                emitter.image(qr_x, y_pos, qr_size, qr_size, qr_path)
+                y_pos += qr_size + self.line_height
+            
+            # Add instructions for viewing the PDF
+            emitter.text(self.margin, y_pos, "This document has been converted to Remarkable format.")
+            y_pos += self.line_height
+            emitter.text(self.margin, y_pos, f"Original PDF: {os.path.basename(pdf_path)}")
+            
+            # Add timestamp at the bottom of the page, unless conversions are cached
+            if self.cache is None:
+                emitter.timestamp(self.margin, self.page_height - self.margin)
+            emitter.write(hcl_path)
             
             logger.info(f"Created HCL file for PDF: {hcl_path}")
             return hcl_path
@@ -275,17 +387,189 @@ class DocumentService:
             return None
 
     def create_rmdoc(self, hcl_path: str, url: str) -> Optional[str]:
-        """Convert HCL to Remarkable document."""
+        """Convert HCL to Remarkable document.
+        
+        A document with a page map and enough pages is converted in chunks
+        (see _convert_chunked) into an .rmdoc. Others go to the batcher, when
+        there is one, and are converted together with the documents ready at
+        the same time into an .rmdoc of their own. Anything else, and any
+        document whose chunked or batched conversion fails, is converted in
+        a single drawj2d run.
+        
+        With a cache, a document whose script was converted before is taken
+        from the cache without running drawj2d. Such scripts have no drawn
+        timestamp; a cached .rmdoc gets fresh ids, the current time and this
+        document's title in its metadata instead.
+        """
         try:
             timestamp = int(time.time())
-            rm_filename = f"rm_{hash(url)}_{timestamp}.rm"
-            rm_path = os.path.join(self.temp_dir, rm_filename)
+            output_stem = os.path.join(self.temp_dir, f"rm_{hash(url)}_{timestamp}")
             
-            return self._convert_to_remarkable(hcl_path, rm_path)
+            body_digest = self._body_digest(hcl_path)
+            if body_digest:
+                cached_path = self._fetch_cached(body_digest, hcl_path, output_stem)
+                if cached_path:
+                    return cached_path
+                self.cache.record_miss()
+            
+            output_path = self._convert(hcl_path, output_stem)
+            if output_path and body_digest:
+                flags = RMDOC_FLAGS if output_path.endswith('.rmdoc') else RM_FLAGS
+                extension = os.path.splitext(output_path)[1]
+                self.cache.store(self.cache.key(body_digest, flags), extension, output_path)
+            return output_path
         except Exception as e:
             logger.error(f"Error in create_rmdoc: {e}")
             return None
 
+    def _fetch_cached(self, body_digest: str, hcl_path: str, output_stem: str) -> Optional[str]:
+        """Put a cached conversion of the script at output_stem, or return None if there is none."""
+        for flags, extension in ((RMDOC_FLAGS, '.rmdoc'), (RM_FLAGS, '.rm')):
+            output_path = output_stem + extension
+            if not self.cache.fetch(self.cache.key(body_digest, flags), extension, output_path):
+                continue
+            if extension == '.rmdoc' and not self._restamp(output_path, hcl_path):
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                return None
+            logger.info(f"Using cached conversion of {hcl_path}")
+            return output_path
+        return None
+
+    def _restamp(self, rmdoc_path: str, hcl_path: str) -> bool:
+        """Rewrite a cached .rmdoc as a new document generated now, titled from the page map."""
+        title = (self.load_page_map(hcl_path) or {}).get("title") or os.path.basename(hcl_path)
+        try:
+            content, pages = read_rmdoc(rmdoc_path)
+            # The fetched file may be a link to the cache entry; write a new file instead
+            os.remove(rmdoc_path)
+            write_rmdoc(rmdoc_path, content, pages, title)
+        except (OSError, RmdocError) as e:
+            logger.warning(format_error("cache", "Could not restamp cached document", e))
+            return False
+        return True
+
+    def _body_digest(self, hcl_path: str) -> Optional[str]:
+        """Digest of the script for the cache, or None without a cache or a readable script."""
+        if self.cache is None:
+            return None
+        try:
+            return hcl_digest(hcl_path)
+        except OSError as e:
+            logger.warning(format_error("cache", "Could not digest HCL file", e))
+            return None
+
+    def _convert(self, hcl_path: str, output_stem: str) -> Optional[str]:
+        """Convert in chunks, in a batch or in one run, as create_rmdoc describes.
+        
+        Args:
+            hcl_path: Script to convert
+            output_stem: Output path without extension
+            
+        Returns:
+            Path of the .rmdoc or .rm written, or None if conversion failed
+        """
+        page_map = self.load_page_map(hcl_path)
+        rmdoc_path = output_stem + '.rmdoc'
+        if self._chunk_count(page_map) > 1:
+            if self._convert_chunked(hcl_path, page_map, rmdoc_path):
+                return rmdoc_path
+            logger.warning("Chunked conversion failed, converting the whole document at once")
+        elif self.batcher is not None:
+            title = (page_map or {}).get("title", "")
+            if self.batcher.convert(hcl_path, rmdoc_path, title):
+                return rmdoc_path
+            logger.warning("Batched conversion failed, converting the document on its own")
+        
+        return self._convert_to_remarkable(hcl_path, output_stem + '.rm')
+
+    def _chunk_count(self, page_map: Optional[Dict[str, Any]]) -> int:
+        """Number of chunks a document is converted in: one per worker, of at least chunk_pages pages."""
+        if not page_map or self.chunk_pages <= 0:
+            return 1
+        return max(1, min(self.convert_workers, len(page_map["pages"]) // self.chunk_pages))
+
+    def _write_chunks(self, hcl_path: str, page_map: Dict[str, Any], count: int) -> List[str]:
+        """Split an HCL file at page boundaries into count chunk files.
+        
+        Each chunk repeats the preamble (page size, font, pen) and switches
+        to the font in effect at its first page, so it draws exactly like
+        its pages of the whole document.
+        
+        Args:
+            hcl_path: HCL file written by create_hcl
+            page_map: Its page map
+            count: Number of chunks
+            
+        Returns:
+            Paths of the chunk files in page order
+        """
+        with open(hcl_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        
+        pages = page_map["pages"]
+        preamble = lines[page_map["preamble"][0]:page_map["preamble"][1]]
+        preamble_font = page_map["pages"][0]["font"]
+        bounds = [round(len(pages) * number / count) for number in range(count + 1)]
+        
+        chunk_paths = []
+        stem = os.path.splitext(hcl_path)[0]
+        for number, (first, end) in enumerate(zip(bounds, bounds[1:])):
+            chunk = list(preamble)
+            font = pages[first]["font"]
+            if font and font != preamble_font:
+                chunk.append(f'puts "set_font {font[0]} {format_number(font[1])}"')
+            chunk.extend(lines[pages[first]["hcl_lines"][0]:pages[end - 1]["hcl_lines"][1]])
+            
+            chunk_path = f"{stem}.part{number}.hcl"
+            with open(chunk_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(chunk) + '\n')
+            chunk_paths.append(chunk_path)
+        return chunk_paths
+
+    def _convert_chunked(self, hcl_path: str, page_map: Dict[str, Any], rmdoc_path: str) -> Optional[str]:
+        """Convert a long document in page chunks and merge them into one .rmdoc.
+        
+        drawj2d converts a file on a single core, so the chunks are converted
+        by up to convert_workers drawj2d processes at a time and their
+        archives merged with the pages in order.
+        
+        Args:
+            hcl_path: HCL file written by create_hcl
+            page_map: Its page map
+            rmdoc_path: Merged archive to write
+            
+        Returns:
+            rmdoc_path, or None if a chunk failed to convert
+        """
+        if not os.path.exists(self.drawj2d_path):
+            logger.error(format_error("config", "drawj2d executable not found", self.drawj2d_path))
+            return None
+        
+        started = time.time()
+        chunk_paths = self._write_chunks(hcl_path, page_map, self._chunk_count(page_map))
+        outputs = [os.path.splitext(path)[0] + '.rmdoc' for path in chunk_paths]
+        try:
+            with ThreadPoolExecutor(max_workers=len(chunk_paths), thread_name_prefix="drawj2d") as executor:
+                converted = list(executor.map(self._run_drawj2d, chunk_paths, outputs))
+            if not all(converted):
+                return None
+            
+            pages = merge_rmdocs(outputs, rmdoc_path, page_map.get("title") or os.path.basename(hcl_path))
+            logger.info(f"Converted {pages} pages in {len(chunk_paths)} chunks in {time.time() - started:.1f}s: {rmdoc_path}")
+            return rmdoc_path
+        except RmdocError as e:
+            logger.error(format_error("conversion", "Could not merge converted chunks", e))
+            return None
+        finally:
+            for path in chunk_paths + outputs:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _run_drawj2d(self, hcl_path: str, rmdoc_path: str) -> bool:
+        """Convert one HCL file to an .rmdoc; return whether it succeeded."""
+        return run_drawj2d(self.drawj2d_path, hcl_path, rmdoc_path)
+
     def _convert_to_remarkable(self, hcl_path: str, rm_path: str) -> Optional[str]:
         """Convert HCL file to Remarkable format using drawj2d."""
         try:
@@ -316,11 +600,9 @@ class DocumentService:
                 logger.info(f"Creating output directory: {output_dir}")
                 os.makedirs(output_dir, exist_ok=True)
                 
-            # Use parameters for Remarkable format - fixed to not use `-r229` flag
-            # -Trm: Target is Remarkable
+            # Use parameters for Remarkable format (RM_FLAGS) - fixed to not use `-r229` flag
             # -o: Specify output file
-            # -rmv6: Use rmv6 format introduced in Remarkable firmware 3.0
-            cmd = [self.drawj2d_path, "-Trm", "-rmv6", "-o", rm_path, hcl_path]
+            cmd = [self.drawj2d_path, *RM_FLAGS, "-o", rm_path, hcl_path]
             logger.info(f"Conversion command: {' '.join(cmd)}")
             
             # Define the conversion function that will be retried if it fails
@@ -364,9 +646,7 @@ class DocumentService:
 
     def _escape_hcl(self, text: str) -> str:
         """Escape special characters for HCL."""
-        if not text:
-            return ""
-        return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+        return escape_hcl(text)
 
     def _process_content(self, content: Dict[str, Any]) -> str:
         """Process content dictionary into plain text.
@@ -0,0 +1,121 @@
+"""HCL script emitter for drawj2d documents.
+
+Collects drawing commands in memory and writes the script in one call.
+The emitter tracks the current font and pen, so a font or pen command that
+would not change anything is dropped, and formats coordinates compactly
+(whole numbers without a decimal point).
+
+The "Generated:" timestamp drawn by timestamp() is the one part of a script
+that differs between two runs over the same content; scripts whose
+conversions are cached leave it out (see DocumentService).
+"""
+
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def escape_hcl(text: str) -> str:
+    """Escape special characters for a quoted HCL string."""
+    if not text:
+        return ""
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+def format_number(value: float) -> str:
+    """Format a coordinate: whole numbers without a decimal point, others to one decimal."""
+    if type(value) is int:
+        return str(value)
+    value = round(value, 1)
+    return str(int(value)) if value == int(value) else str(value)
+
+class HCLEmitter:
+    """Buffers drawj2d commands, skipping redundant font and pen changes."""
+
+    def __init__(self):
+        self._commands = []
+        self.font: Optional[Tuple[str, float]] = None
+        self.pen: Optional[str] = None
+        self.counters = {"commands": 0, "skipped": 0}
+
+    def __len__(self) -> int:
+        """Return the number of lines emitted so far, i.e. the index of the next one."""
+        return len(self._commands)
+
+    def command(self, command: str) -> None:
+        """Emit a raw drawj2d command."""
+        self._commands.append(f'puts "{command}"')
+        self.counters["commands"] += 1
+
+    def size(self, width: float, height: float) -> None:
+        """Set the page size."""
+        self.command(f"size {format_number(width)} {format_number(height)}")
+
+    def set_font(self, name: str, size: float) -> None:
+        """Switch font unless it is already current."""
+        if self.font == (name, size):
+            self.counters["skipped"] += 1
+            return
+        self.command(f"set_font {name} {format_number(size)}")
+        self.font = (name, size)
+
+    def set_pen(self, pen: str) -> None:
+        """Switch pen unless it is already current."""
+        if self.pen == pen:
+            self.counters["skipped"] += 1
+            return
+        self.command(f"pen {pen}")
+        self.pen = pen
+
+    def text(self, x: float, y: float, text: str, font: Optional[Tuple[str, float]] = None) -> None:
+        """Draw text, switching to font first if one is given."""
+        if font is not None:
+            self.set_font(*font)
+        self.command(f'text {format_number(x)} {format_number(y)} \\"{escape_hcl(text)}\\"')
+
+    def timestamp(self, x: float, y: float, font: Optional[Tuple[str, float]] = None) -> None:
+        """Draw "Generated: " and the current time."""
+        self.text(x, y, f"Generated: {time.strftime(TIMESTAMP_FORMAT)}", font)
+
+    def image(self, x: float, y: float, width: float, height: float, path: str) -> None:
+        """Place an image scaled to width by height."""
+        self.command(f'image {format_number(x)} {format_number(y)} {width:.0f} {height:.0f} \\"{path}\\"')
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 1.0) -> None:
+        """Draw a straight line."""
+        self.command(f"line {format_number(x1)} {format_number(y1)} {format_number(x2)} {format_number(y2)} "
+                     f"width={width}")
+
+    def rectangle(self, x: float, y: float, width: float, height: float, line_width: float = 1.0) -> None:
+        """Draw a rectangle outline."""
+        self.command(f"rectangle {format_number(x)} {format_number(y)} {format_number(width)} "
+                     f"{format_number(height)} width={line_width}")
+
+    def newpage(self) -> None:
+        """Start a new page; font and pen carry over."""
+        self.command("newpage")
+
+    def getvalue(self) -> str:
+        """Return the script emitted so far."""
+        return '\n'.join(self._commands) + '\n'
+
+    def write(self, path: str) -> int:
+        """Write the script to path in one call.
+
+        Args:
+            path: Destination file
+
+        Returns:
+            Number of bytes written
+        """
+        data = self.getvalue().encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(data)
+        return len(data)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counts of emitted and skipped commands."""
+        return dict(self.counters)
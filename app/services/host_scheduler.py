@@ -0,0 +1,149 @@
+"""Per-host politeness scheduling for outgoing requests.
+
+Limits how many requests run against one host at a time and how closely
+they follow each other, and backs off a host that answered 429 or 503 for
+as long as its Retry-After asks (or exponentially when it does not say).
+Requests to other hosts are never held up, so a bulk fetch over many sites
+keeps its throughput while each origin sees polite traffic.
+"""
+
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Status codes that ask the client to slow down
+THROTTLE_STATUSES = (429, 503)
+
+class _HostState:
+    """Scheduling state of one host."""
+
+    __slots__ = ("active", "next_start", "blocked_until", "backoff")
+
+    def __init__(self):
+        self.active = 0
+        self.next_start = 0.0
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+
+def host_of(url: str) -> str:
+    """Return the scheduling key (host and port) of a URL."""
+    return urlparse(url).netloc.lower()
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def interleave_by_host(urls: Iterable[str]) -> List[str]:
+    """Order URLs round-robin across hosts, keeping each host's own order.
+
+    Fetching in this order keeps workers busy on other hosts while one host's
+    spacing or concurrency limit holds its next request back.
+    """
+    queues: Dict[str, List[str]] = {}
+    for url in urls:
+        queues.setdefault(host_of(url), []).append(url)
+    ordered = []
+    rounds = max((len(queue) for queue in queues.values()), default=0)
+    for i in range(rounds):
+        ordered.extend(queue[i] for queue in queues.values() if i < len(queue))
+    return ordered
+
+class HostScheduler:
+    """Gates requests per host by concurrency, spacing and server back-off."""
+
+    def __init__(self, max_per_host: int = 4, min_interval: float = 0.1,
+                 max_retry_after: float = 120, initial_backoff: float = 1.0):
+        """Initialize the scheduler.
+
+        Args:
+            max_per_host: Requests in flight to one host at a time
+            min_interval: Seconds between the starts of two requests to one host
+            max_retry_after: Longest Retry-After honored, in seconds
+            initial_backoff: Back-off after a 429/503 without Retry-After; doubles per repeat
+        """
+        self.max_per_host = max(1, max_per_host)
+        self.min_interval = min_interval
+        self.max_retry_after = max_retry_after
+        self.initial_backoff = initial_backoff
+        self._hosts: Dict[str, _HostState] = {}
+        self._condition = threading.Condition()
+        self.counters = {"requests": 0, "delayed": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Wait until a request to url may start and hold a slot while it runs."""
+        host = host_of(url)
+        waited = self._acquire(host)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._hosts[host].active -= 1
+                self.counters["requests"] += 1
+                if waited > 0.001:
+                    self.counters["delayed"] += 1
+                    self.counters["wait_seconds"] += waited
+                self._condition.notify_all()
+
+    def observe(self, url: str, status_code: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """Record a response status, backing the host off when it throttles.
+
+        Args:
+            url: URL the response came from
+            status_code: HTTP status
+            retry_after: The response's Retry-After header
+
+        Returns:
+            Seconds the host is backed off for, or None if it did not throttle
+        """
+        with self._condition:
+            state = self._hosts.setdefault(host_of(url), _HostState())
+            if status_code not in THROTTLE_STATUSES:
+                state.backoff = 0.0
+                return None
+
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                state.backoff = min(self.max_retry_after, state.backoff * 2 or self.initial_backoff)
+                delay = state.backoff
+            delay = min(delay, self.max_retry_after)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+            self.counters["throttled"] += 1
+        logger.info(f"{host_of(url)} answered {status_code}, holding requests to it for {delay:.1f}s")
+        return delay
+
+    def stats(self) -> Dict[str, float]:
+        """Return scheduling counters."""
+        with self._condition:
+            return dict(self.counters, wait_seconds=round(self.counters["wait_seconds"], 3))
+
+    def _acquire(self, host: str) -> float:
+        """Block until host has a free slot and its spacing has passed; return seconds waited."""
+        started = time.monotonic()
+        with self._condition:
+            state = self._hosts.setdefault(host, _HostState())
+            while True:
+                now = time.monotonic()
+                ready_at = max(state.next_start, state.blocked_until)
+                if state.active < self.max_per_host and now >= ready_at:
+                    break
+                # With every slot taken, a finishing request notifies the condition
+                self._condition.wait(None if now >= ready_at else ready_at - now)
+            state.active += 1
+            state.next_start = now + self.min_interval
+        return time.monotonic() - started
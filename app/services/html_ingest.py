@@ -0,0 +1,252 @@
+"""Size-capped streaming HTML ingestion.
+
+Fetches a page as a stream instead of reading the whole body at once. The
+body is decoded incrementally and fed to a light parser that counts the
+readable text collected so far. Reading stops at a byte cap, or as soon as
+enough text for a document has been collected, so a 20 MB single-page
+archive or an endless feed never has to fit in memory or in a parse tree.
+Whether and why the page was cut short is returned with the HTML.
+"""
+
+import codecs
+import time
+import logging
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+from .charset import META_SNIFF_BYTES, DecodedText, choose_encoding
+
+# Import configuration with proper relative import
+try:
+    from ..config import CONFIG
+except ImportError:
+    try:
+        # Scraper scripts run with the app directory on sys.path
+        from config import CONFIG
+    except ImportError:
+        # Fallback to defaults if config cannot be imported
+        CONFIG = {}
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bytes of HTML read at most
+MAX_HTML_BYTES = 5 * 1024 * 1024
+
+# Characters of readable text after which the rest of the page is not needed
+MAX_TEXT_CHARS = 500_000
+
+# Elements whose text never reaches the document
+NON_CONTENT_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'nav', 'footer', 'header', 'aside'}
+
+def configured_limits() -> Tuple[int, int]:
+    """Return (max_bytes, max_text_chars) from CONFIG."""
+    max_bytes = int(CONFIG.get('HTML_MAX_MB', MAX_HTML_BYTES / (1024 * 1024)) * 1024 * 1024)
+    return max_bytes, CONFIG.get('HTML_MAX_TEXT_CHARS', MAX_TEXT_CHARS)
+
+class IngestedHtml(NamedTuple):
+    """HTML read from a stream, with how much was read and whether it was cut short."""
+    html: str
+    bytes_read: int
+    text_chars: int
+    truncated: Optional[str]  # None, "bytes" or "text"
+    decoded: DecodedText
+
+    def report(self) -> Dict[str, Any]:
+        """Return the ingestion summary recorded in scrape results."""
+        return {
+            "bytes_read": self.bytes_read,
+            "text_chars": self.text_chars,
+            "truncated": self.truncated is not None,
+            "truncated_reason": self.truncated,
+        }
+
+class TextCounter(HTMLParser):
+    """Incremental parser counting the characters of readable text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chars = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in NON_CONTENT_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in NON_CONTENT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.chars += len(data.strip())
+
+def ingest_html(chunks: Iterable[bytes], content_type: Optional[str] = None,
+                max_bytes: int = MAX_HTML_BYTES, max_text_chars: int = MAX_TEXT_CHARS) -> IngestedHtml:
+    """Decode and collect HTML from body chunks, stopping at the caps.
+
+    Args:
+        chunks: Body chunks, e.g. response.iter_content()
+        content_type: Content-Type header, used to pick the encoding
+        max_bytes: Bytes read at most
+        max_text_chars: Readable characters after which reading stops
+
+    Returns:
+        The collected HTML and ingestion summary
+    """
+    decode_seconds = 0.0
+    counter = TextCounter()
+    decoder = None
+    pending = b''
+    parts = []
+    bytes_read = 0
+    truncated = None
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if bytes_read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - bytes_read]
+            truncated = "bytes"
+        bytes_read += len(chunk)
+
+        if decoder is None:
+            # Buffer until the encoding can be sniffed from the first bytes
+            pending += chunk
+            if len(pending) < META_SNIFF_BYTES and not truncated:
+                continue
+            chunk, pending = pending, b''
+            started = time.perf_counter()
+            encoding, source, bom_length = choose_encoding(chunk, content_type)
+            encoding = encoding or 'utf-8'
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            chunk = chunk[bom_length:]
+            decode_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        text = decoder.decode(chunk)
+        decode_seconds += time.perf_counter() - started
+        parts.append(text)
+        counter.feed(text)
+        if truncated:
+            break
+        if counter.chars >= max_text_chars:
+            truncated = "text"
+            break
+
+    if decoder is None:
+        # Body shorter than the sniffing window
+        started = time.perf_counter()
+        encoding, source, bom_length = choose_encoding(pending, content_type)
+        encoding = encoding or 'utf-8'
+        text = pending[bom_length:].decode(encoding, errors='replace')
+        decode_seconds += time.perf_counter() - started
+        parts.append(text)
+        counter.feed(text)
+    else:
+        parts.append(decoder.decode(b'', final=True))
+
+    html = ''.join(parts)
+    decoded = DecodedText(html, encoding, source, decode_seconds)
+    return IngestedHtml(html, bytes_read, counter.chars, truncated, decoded)
+
+def cap_html(html: str, max_bytes: Optional[int] = None, max_text_chars: Optional[int] = None,
+             chunk_size: int = 64 * 1024) -> IngestedHtml:
+    """Apply the ingestion caps to HTML that is already in memory, e.g. a rendered DOM.
+
+    Args:
+        html: The page HTML
+        max_bytes: Characters of HTML kept at most (default: configured byte limit)
+        max_text_chars: Readable characters after which the rest is dropped (default: configured limit)
+        chunk_size: Characters counted at a time
+
+    Returns:
+        The kept HTML and ingestion summary
+    """
+    default_bytes, default_chars = configured_limits()
+    max_bytes = max_bytes or default_bytes
+    max_text_chars = max_text_chars or default_chars
+
+    counter = TextCounter()
+    end = 0
+    truncated = None
+    while end < len(html):
+        if end >= max_bytes:
+            truncated = "bytes"
+            break
+        if counter.chars >= max_text_chars:
+            truncated = "text"
+            break
+        chunk = html[end:min(end + chunk_size, max_bytes)]
+        counter.feed(chunk)
+        end += len(chunk)
+
+    kept = html[:end]
+    decoded = DecodedText(kept, 'utf-8', 'default', 0.0)
+    return IngestedHtml(kept, len(kept.encode('utf-8')), counter.chars, truncated, decoded)
+
+def fetch_html(http_client, url: str, timeout: float = 30, max_bytes: Optional[int] = None,
+               max_text_chars: Optional[int] = None, chunk_size: int = 64 * 1024):
+    """Fetch a page's HTML as a stream, stopping at the caps.
+
+    A fresh copy in the HTTP cache is used without going to the network and
+    a stale one is revalidated; a page read to its end is stored in the cache.
+
+    Args:
+        http_client: HttpClient to fetch with
+        url: Page URL
+        timeout: Request timeout in seconds
+        max_bytes: Bytes read at most (default: configured limit)
+        max_text_chars: Readable characters after which reading stops (default: configured limit)
+        chunk_size: Size of the chunks read from the connection
+
+    Returns:
+        (IngestedHtml, final URL after redirects)
+    """
+    default_bytes, default_chars = configured_limits()
+    max_bytes = max_bytes or default_bytes
+    max_text_chars = max_text_chars or default_chars
+
+    def ingest_cached(response):
+        body = response.content
+        chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        ingested = ingest_html(chunks, response.headers.get('Content-Type'), max_bytes, max_text_chars)
+        http_client.charset_stats.record(ingested.decoded, ingested.bytes_read)
+        return ingested, response.url or url
+
+    cache = http_client.cache
+    entry = cache.lookup(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        return ingest_cached(cache.response(entry))
+
+    headers = cache.validators(entry) if entry is not None else {}
+    request_time = time.time()
+    response = http_client.get(url, stream=True, timeout=timeout, headers=headers)
+    if entry is not None and response.status_code == 304:
+        with response:
+            try:
+                entry = cache.refresh(entry, response, request_time)
+                return ingest_cached(cache.response(entry, revalidated=True))
+            except OSError as e:
+                logger.warning(f"Could not serve revalidated {url} from HTTP cache: {e}")
+        # The body was evicted or replaced since the lookup; fetch it unconditionally
+        request_time = time.time()
+        response = http_client.get(url, stream=True, timeout=timeout)
+
+    with response:
+        response.raise_for_status()
+        received = []
+
+        def recorded_chunks():
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                received.append(chunk)
+                yield chunk
+
+        ingested = ingest_html(recorded_chunks(), response.headers.get('Content-Type'), max_bytes, max_text_chars)
+        if ingested.truncated:
+            logger.info(f"Stopped reading {url} after {ingested.bytes_read} bytes ({ingested.truncated} limit)")
+        elif cache is not None:
+            http_client.cache_streamed(url, response, b''.join(received), request_time)
+        final_url = response.url or url
+
+    http_client.charset_stats.record(ingested.decoded, ingested.bytes_read)
+    return ingested, final_url
@@ -0,0 +1,312 @@
+"""On-disk HTTP response cache for Pi Share Receiver.
+
+A private cache in the spirit of RFC 7234: responses are stored with their
+headers, served locally while fresh according to Cache-Control/Expires (or
+the Last-Modified heuristic), and revalidated with ETag/Last-Modified once
+stale. The store is bounded in size and evicts least recently used entries.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+import requests
+from email.utils import parsedate_to_datetime
+from requests.structures import CaseInsensitiveDict
+from typing import Dict, Any, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Status codes that may be cached without explicit freshness information
+HEURISTICALLY_CACHEABLE = {200, 203, 300, 301, 404, 410}
+
+# Headers that describe a single transfer and must not be stored or merged
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'content-encoding', 'content-length'
+}
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into a dict of lowercase directives."""
+    directives: Dict[str, Optional[str]] = {}
+    if not value:
+        return directives
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, argument = part.partition('=')
+        directives[name.strip().lower()] = argument.strip().strip('"') if argument else None
+    return directives
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    """Parse an HTTP date header into a timestamp, or None if invalid."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    """Parse a delta-seconds directive argument."""
+    try:
+        return max(int(value), 0) if value is not None else None
+    except ValueError:
+        return None
+
+class HttpCache:
+    """Size-bounded disk cache of GET responses."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 100 * 1024 * 1024,
+                 heuristic_fraction: float = 0.1, max_heuristic_lifetime: int = 86400):
+        """Initialize the cache directory.
+
+        Args:
+            cache_dir: Directory for cached bodies and metadata
+            max_bytes: Total size the store is kept under
+            heuristic_fraction: Fraction of the Last-Modified age used as lifetime when
+                the response has no explicit freshness
+            max_heuristic_lifetime: Upper bound in seconds for the heuristic lifetime
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 10
+        self.heuristic_fraction = heuristic_fraction
+        self.max_heuristic_lifetime = max_heuristic_lifetime
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for a URL, or None if nothing usable is cached."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get("url") != url or not os.path.exists(body_path):
+                return None
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Check whether a stored entry can be served without revalidation."""
+        headers = CaseInsensitiveDict(entry["headers"])
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-cache' in directives or 'must-understand' in directives:
+            return False
+        return self.freshness_lifetime(entry) > self.current_age(entry, now)
+
+    def freshness_lifetime(self, entry: Dict[str, Any]) -> float:
+        """Freshness lifetime in seconds (RFC 7234 section 4.2.1)."""
+        headers = CaseInsensitiveDict(entry["headers"])
+        directives = parse_cache_control(headers.get('Cache-Control'))
+
+        max_age = _seconds(directives.get('max-age'))
+        if max_age is not None:
+            return max_age
+
+        date = parse_http_date(headers.get('Date')) or entry["response_time"]
+        expires = headers.get('Expires')
+        if expires is not None:
+            expires_at = parse_http_date(expires)
+            # An invalid Expires value means already expired
+            return max(expires_at - date, 0) if expires_at else 0
+
+        last_modified = parse_http_date(headers.get('Last-Modified'))
+        if last_modified and entry["status"] in HEURISTICALLY_CACHEABLE:
+            return min((date - last_modified) * self.heuristic_fraction, self.max_heuristic_lifetime)
+        return 0
+
+    def current_age(self, entry: Dict[str, Any], now: Optional[float] = None) -> float:
+        """Current age in seconds (RFC 7234 section 4.2.3)."""
+        now = time.time() if now is None else now
+        headers = CaseInsensitiveDict(entry["headers"])
+        date = parse_http_date(headers.get('Date')) or entry["response_time"]
+        age_value = _seconds(headers.get('Age')) or 0
+
+        apparent_age = max(0.0, entry["response_time"] - date)
+        response_delay = entry["response_time"] - entry["request_time"]
+        corrected_initial_age = max(apparent_age, age_value + response_delay)
+        return corrected_initial_age + (now - entry["response_time"])
+
+    def validators(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stored entry."""
+        headers = CaseInsensitiveDict(entry["headers"])
+        conditional = {}
+        if headers.get('ETag'):
+            conditional['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            conditional['If-Modified-Since'] = headers['Last-Modified']
+        return conditional
+
+    def is_storable(self, response: requests.Response) -> bool:
+        """Check whether a response may be stored (RFC 7234 section 3)."""
+        if response.request is not None and response.request.method != 'GET':
+            return False
+        request_directives = parse_cache_control(
+            response.request.headers.get('Cache-Control') if response.request is not None else None
+        )
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        if 'no-store' in directives or 'no-store' in request_directives:
+            return False
+        if response.headers.get('Vary', '').strip() == '*':
+            return False
+        if len(response.content) > self.max_entry_bytes:
+            return False
+
+        has_validator = 'ETag' in response.headers or 'Last-Modified' in response.headers
+        has_explicit_freshness = 'max-age' in directives or 'Expires' in response.headers
+        if response.status_code in HEURISTICALLY_CACHEABLE:
+            return has_explicit_freshness or has_validator
+        return response.status_code < 400 and has_explicit_freshness
+
+    def store(self, url: str, response: requests.Response, request_time: float) -> bool:
+        """Store a response if it is cacheable.
+
+        Args:
+            url: Request URL used as cache key
+            response: The full (non-streamed) response
+            request_time: time.time() when the request was sent
+
+        Returns:
+            True if the response was stored
+        """
+        if not self.is_storable(response):
+            return False
+
+        entry = {
+            "url": url,
+            "final_url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+            "request_time": request_time,
+            "response_time": time.time(),
+            "size": len(response.content)
+        }
+        self._write(url, entry, response.content)
+        with self._lock:
+            self._stats["stores"] += 1
+        self._evict()
+        return True
+
+    def refresh(self, entry: Dict[str, Any], not_modified: requests.Response, request_time: float) -> Dict[str, Any]:
+        """Update a stored entry from a 304 Not Modified response (RFC 7234 section 4.3.4).
+
+        The updated entry is returned even if it cannot be written, so the
+        revalidated response can still be served.
+        """
+        headers = CaseInsensitiveDict(entry["headers"])
+        for name, value in not_modified.headers.items():
+            if name.lower() not in HOP_BY_HOP_HEADERS:
+                headers[name] = value
+        entry = dict(entry, headers=dict(headers), request_time=request_time, response_time=time.time())
+
+        meta_path, _ = self._paths(entry["url"])
+        try:
+            self._write_json(meta_path, entry)
+        except OSError as e:
+            logger.warning(f"Could not update HTTP cache entry for {entry['url']}: {e}")
+        return entry
+
+    def response(self, entry: Dict[str, Any], revalidated: bool = False) -> requests.Response:
+        """Build a requests.Response from a stored entry and count the hit."""
+        _, body_path = self._paths(entry["url"])
+        with open(body_path, 'rb') as f:
+            body = f.read()
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry.get("reason") or ""
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = entry.get("final_url") or entry["url"]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        response.from_cache = True
+
+        with self._lock:
+            self._stats["revalidated" if revalidated else "hits"] += 1
+        return response
+
+    def record_miss(self) -> None:
+        """Count a request that had to go to the origin."""
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the hit rate for this process.
+
+        Revalidated responses count as hits: the body was served locally.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        served_locally = stats["hits"] + stats["revalidated"]
+        lookups = served_locally + stats["misses"]
+        stats["hit_rate"] = served_locally / lookups if lookups else 0.0
+        return stats
+
+    def _paths(self, url: str):
+        """Metadata and body paths for a URL."""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def _write(self, url: str, entry: Dict[str, Any], body: bytes) -> None:
+        """Write body then metadata, each atomically."""
+        meta_path, body_path = self._paths(url)
+        tmp_path = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, body_path)
+        self._write_json(meta_path, entry)
+
+    def _write_json(self, path: str, data: Dict[str, Any]) -> None:
+        """Write a JSON file atomically."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the store is under max_bytes."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    if not dir_entry.name.endswith('.body'):
+                        continue
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                    total += stat.st_size
+        except OSError as e:
+            logger.warning(f"Could not scan HTTP cache {self.cache_dir}: {e}")
+            return
+
+        if total <= self.max_bytes:
+            return
+
+        # Evict down to 90% so every store does not trigger another scan-and-evict
+        target = self.max_bytes * 0.9
+        for _, size, body_path in sorted(entries):
+            if total <= target:
+                break
+            for path in (body_path, body_path[:-len('.body')] + '.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            with self._lock:
+                self._stats["evictions"] += 1
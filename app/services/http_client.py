@@ -0,0 +1,275 @@
+"""Shared HTTP client for Pi Share Receiver.
+
+Wraps a single requests.Session with a per-host keep-alive connection pool
+and consistent timeouts, User-Agent and redirect handling, so fetches to the
+same host reuse connections instead of paying a new TCP/TLS handshake.
+GET requests can be served from an on-disk HttpCache, and HTML bodies are
+decoded without whole-body charset detection.
+"""
+
+import os
+import time
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
+from .http_cache import HttpCache
+from .charset import CharsetStats, decode_html
+from .host_scheduler import HostScheduler, interleave_by_host
+
+# Import configuration with proper relative import
+try:
+    from ..config import CONFIG
+except ImportError:
+    try:
+        # Scraper scripts run with the app directory on sys.path
+        from config import CONFIG
+    except ImportError:
+        # Fallback to defaults if config cannot be imported
+        CONFIG = {}
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+
+# Used when CONFIG has no TEMP_DIR (mirrors the default in config.py)
+DEFAULT_TEMP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'temp')
+
+Timeout = Union[float, Tuple[float, float]]
+
+class HttpClient:
+    """Pooled HTTP client shared by all services."""
+
+    def __init__(self, timeout: float = 30, connect_timeout: float = 10,
+                 user_agent: str = DEFAULT_USER_AGENT, max_redirects: int = 10,
+                 pool_connections: int = 10, pool_maxsize: int = 10,
+                 cache: Optional[HttpCache] = None, scheduler: Optional[HostScheduler] = None,
+                 throttle_retries: int = 2):
+        """Initialize the session and its connection pools.
+
+        Args:
+            timeout: Default read timeout in seconds
+            connect_timeout: Default connect timeout in seconds
+            user_agent: User-Agent sent with every request
+            max_redirects: Maximum redirects followed per request
+            pool_connections: Number of hosts to keep connection pools for
+            pool_maxsize: Keep-alive connections kept per host
+            cache: Disk cache for GET responses (optional)
+            scheduler: Per-host politeness limits (optional)
+            throttle_retries: Times a GET/HEAD answered with 429/503 is retried once
+                the host's Retry-After has passed (needs a scheduler)
+        """
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.cache = cache
+        self.scheduler = scheduler
+        self.throttle_retries = throttle_retries
+        self.charset_stats = CharsetStats()
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent
+        self.session.max_redirects = max_redirects
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, url: str, timeout: Optional[Timeout] = None, **kwargs: Any) -> requests.Response:
+        """Send a request through the shared session.
+
+        Args:
+            method: HTTP method
+            url: URL to fetch
+            timeout: Read timeout in seconds, or a (connect, read) tuple (default: client timeouts)
+            kwargs: Passed through to requests.Session.request
+
+        Returns:
+            The response
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, self.timeout)
+        elif not isinstance(timeout, tuple):
+            timeout = (min(self.connect_timeout, timeout), timeout)
+        if self.scheduler is None:
+            return self.session.request(method, url, timeout=timeout, **kwargs)
+
+        retries = self.throttle_retries if method in ('GET', 'HEAD') else 0
+        for attempt in range(retries + 1):
+            # The slot covers the request up to its headers; a streamed body is read after
+            with self.scheduler.slot(url):
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            delay = self.scheduler.observe(url, response.status_code, response.headers.get('Retry-After'))
+            # Waiting longer than a response may take is left to the caller
+            if delay is None or attempt == retries or delay > timeout[1]:
+                return response
+            response.close()
+            logger.info(f"Retrying {url} after {response.status_code} once the host allows it")
+        return response
+
+    def get(self, url: str, use_cache: bool = True, **kwargs: Any) -> requests.Response:
+        """Send a GET request, following redirects.
+        
+        Without stream=True the response is looked up in the cache first:
+        fresh entries are served locally, stale ones are revalidated with
+        their ETag/Last-Modified, and cacheable origin responses are stored.
+        Cached responses have a from_cache attribute set to True.
+        
+        Args:
+            url: URL to fetch
+            use_cache: Consult and update the cache (default True)
+            kwargs: Passed through to request
+        """
+        kwargs.setdefault('allow_redirects', True)
+        if self.cache is None or not use_cache or kwargs.get('stream'):
+            return self.request('GET', url, **kwargs)
+
+        entry = self.cache.lookup(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            logger.debug(f"HTTP cache hit: {url}")
+            return self.cache.response(entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            headers.update(self.cache.validators(entry))
+
+        request_time = time.time()
+        response = self.request('GET', url, headers=headers, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            logger.debug(f"HTTP cache revalidated: {url}")
+            try:
+                entry = self.cache.refresh(entry, response, request_time)
+                return self.cache.response(entry, revalidated=True)
+            except OSError as e:
+                # The body was evicted or replaced since the lookup; fetch it unconditionally
+                logger.warning(f"Could not serve revalidated {url} from HTTP cache: {e}")
+                for name in self.cache.validators(entry):
+                    headers.pop(name, None)
+                request_time = time.time()
+                response = self.request('GET', url, headers=headers, **kwargs)
+
+        self.cache.record_miss()
+        try:
+            self.cache.store(url, response, request_time)
+        except OSError as e:
+            logger.warning(f"Could not store {url} in HTTP cache: {e}")
+        return response
+
+    def cache_streamed(self, url: str, response: requests.Response, body: bytes, request_time: float) -> bool:
+        """Store a streamed response that was read to its end in the cache.
+
+        Args:
+            url: Request URL used as cache key
+            response: The streamed response
+            body: Its complete body
+            request_time: time.time() when the request was sent
+
+        Returns:
+            True if the response was stored
+        """
+        if self.cache is None:
+            return False
+        # Streamed responses have no content of their own once iterated
+        response._content = body
+        self.cache.record_miss()
+        try:
+            return self.cache.store(url, response, request_time)
+        except OSError as e:
+            logger.warning(f"Could not store {url} in HTTP cache: {e}")
+            return False
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a HEAD request, following redirects."""
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, **kwargs)
+
+    def get_many(self, urls: Iterable[str], max_workers: int = 8,
+                 **kwargs: Any) -> Iterator[Tuple[str, Union[requests.Response, Exception]]]:
+        """Fetch many URLs concurrently, interleaving hosts.
+
+        URLs are started round-robin across hosts, so with a scheduler the
+        workers keep fetching from other hosts while one host's limits hold
+        its next request back.
+
+        Args:
+            urls: URLs to fetch
+            max_workers: Requests in flight at a time over all hosts
+            kwargs: Passed through to get
+
+        Yields:
+            (url, response) as each fetch completes, or (url, exception) if it failed
+        """
+        ordered = interleave_by_host(urls)
+        if not ordered:
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ordered)), thread_name_prefix="fetch") as executor:
+            futures = {executor.submit(self.get, url, **kwargs): url for url in ordered}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+    def text(self, response: requests.Response) -> str:
+        """Decode a response body as HTML.
+
+        Used instead of response.text, which runs charset detection over the
+        whole body when the server declares no charset (and assumes
+        ISO-8859-1 for text/* types, garbling UTF-8 pages). See
+        charset.decode_html for the order the encoding is looked up in.
+
+        Args:
+            response: A response whose body has not been streamed
+
+        Returns:
+            The decoded text
+        """
+        body = response.content
+        decoded = decode_html(body, response.headers.get('Content-Type'))
+        self.charset_stats.record(decoded, len(body))
+        logger.debug(f"Decoded {response.url} as {decoded.encoding} ({decoded.source}) in {decoded.seconds * 1000:.1f}ms")
+        return decoded.text
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+def create_cache_from_config() -> Optional[HttpCache]:
+    """Create the disk cache configured in CONFIG, or None if disabled."""
+    if not CONFIG.get('HTTP_CACHE', True):
+        return None
+    cache_dir = CONFIG.get('HTTP_CACHE_DIR') or os.path.join(CONFIG.get('TEMP_DIR', DEFAULT_TEMP_DIR), 'http_cache')
+    return HttpCache(cache_dir, max_bytes=CONFIG.get('HTTP_CACHE_MAX_MB', 100) * 1024 * 1024)
+
+def create_scheduler_from_config() -> HostScheduler:
+    """Create the per-host politeness scheduler configured in CONFIG."""
+    return HostScheduler(
+        max_per_host=CONFIG.get('HTTP_HOST_CONCURRENCY', 4),
+        min_interval=CONFIG.get('HTTP_HOST_INTERVAL', 0.1),
+        max_retry_after=CONFIG.get('HTTP_MAX_RETRY_AFTER', 120)
+    )
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+def get_default_client() -> HttpClient:
+    """Return the process-wide HTTP client, creating it from config on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(
+                timeout=CONFIG.get('HTTP_TIMEOUT', 30),
+                connect_timeout=CONFIG.get('HTTP_CONNECT_TIMEOUT', 10),
+                user_agent=CONFIG.get('USER_AGENT', DEFAULT_USER_AGENT),
+                max_redirects=CONFIG.get('HTTP_MAX_REDIRECTS', 10),
+                pool_maxsize=CONFIG.get('HTTP_POOL_SIZE', 10),
+                cache=create_cache_from_config(),
+                scheduler=create_scheduler_from_config()
+            )
+        return _default_client
@@ -0,0 +1,296 @@
+"""Image pipeline for Pi Share Receiver.
+
+Downloads the images a scraper found, concurrently and over the shared
+keep-alive HTTP client, with per-image size and time limits. Each image is
+converted to grayscale, downscaled to the page and dithered to the number of
+gray levels the e-ink display shows. Processed images are deduplicated and
+cached on disk by content hash, so an image shared by several documents (or
+reached through several URLs) is downloaded and processed once. The cache is
+bounded in size and evicts least recently used images.
+"""
+
+import io
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from PIL import Image
+from .http_client import HttpClient, get_default_client
+
+try:
+    import numpy as np
+except ImportError:
+    # Dithering falls back to Pillow's error diffusion
+    np = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bumped whenever processing changes, so stale cached output is not reused
+PIPELINE_VERSION = 1
+
+def bayer_matrix(size: int) -> List[List[int]]:
+    """Return the size x size Bayer ordered-dither matrix (size a power of two)."""
+    matrix = [[0]]
+    while len(matrix) < size:
+        n = len(matrix)
+        matrix = [
+            [4 * matrix[y % n][x % n] + (0, 2, 3, 1)[(y // n) * 2 + (x // n)] for x in range(2 * n)]
+            for y in range(2 * n)
+        ]
+    return matrix
+
+class ImageTooLarge(Exception):
+    """Raised when an image exceeds the download size limit."""
+
+class ImageService:
+    """Downloads, dithers and caches images for documents."""
+
+    def __init__(self, cache_dir: str, http_client: Optional[HttpClient] = None,
+                 max_workers: int = 4, max_bytes: int = 5 * 1024 * 1024, timeout: float = 15,
+                 max_width: int = 1920, max_height: int = 1260, gray_levels: int = 16,
+                 url_ttl: float = 7 * 86400, cache_max_bytes: int = 100 * 1024 * 1024):
+        """Initialize the pipeline.
+
+        Args:
+            cache_dir: Directory for processed images
+            http_client: Shared HTTP client (defaults to the process-wide client)
+            max_workers: Images downloaded and processed at the same time
+            max_bytes: Largest image downloaded; bigger ones are skipped
+            timeout: Seconds an image download may take in total
+            max_width: Width processed images are scaled down to (content width)
+            max_height: Height processed images are scaled down to (usable page height)
+            gray_levels: Gray levels images are dithered to
+            url_ttl: Seconds a URL is trusted to still serve the image cached for it
+            cache_max_bytes: Total size the image cache is kept under
+        """
+        self.cache_dir = cache_dir
+        self.http_client = http_client or get_default_client()
+        self.max_workers = max_workers
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_width = max_width
+        self.max_height = max_height
+        self.gray_levels = max(2, gray_levels)
+        self.url_ttl = url_ttl
+        self.cache_max_bytes = cache_max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def process_content_images(self, content: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Prepare the images of scraped content for layout.
+
+        Every image dict in content["images"] that could be processed gets
+        "path", "width" and "height" keys. Images whose content duplicates an
+        earlier one get "duplicate_of" with that image's id instead.
+
+        Args:
+            content: Scraped content with an "images" list
+
+        Returns:
+            The image dicts that are ready for layout
+        """
+        images = [image for image in content.get('images', []) if image.get('src')]
+        if not images:
+            return []
+
+        started = time.time()
+        workers = min(self.max_workers, len(images))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image") as executor:
+            results = list(executor.map(self._process_one, images))
+
+        ready = []
+        seen = {}
+        for image, result in zip(images, results):
+            if result is None:
+                continue
+            if result["hash"] in seen:
+                image["duplicate_of"] = seen[result["hash"]]
+                continue
+            seen[result["hash"]] = image.get("id")
+            image.update(path=result["path"], width=result["width"], height=result["height"])
+            ready.append(image)
+
+        logger.info(f"Prepared {len(ready)} of {len(images)} images in {time.time() - started:.1f}s")
+        self._evict()
+        return ready
+
+    def _process_one(self, image: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Download and process one image, using the cache where possible."""
+        url = image["src"]
+        try:
+            cached = self._cached_url(url)
+            if cached is not None:
+                return cached
+
+            data = self._download(url)
+            digest = hashlib.sha256(data).hexdigest()
+            result = self._cached_content(digest)
+            if result is None:
+                result = self._convert(data, digest)
+            self._write_json(self._url_index_path(url), result)
+            return result
+        except Exception as e:
+            logger.warning(f"Skipping image {url}: {e}")
+            return None
+
+    def _download(self, url: str) -> bytes:
+        """Download an image within the size and time limits."""
+        deadline = time.monotonic() + self.timeout
+        with self.http_client.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            declared = response.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise ImageTooLarge(f"{declared} bytes declared, limit {self.max_bytes}")
+
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                received += len(chunk)
+                if received > self.max_bytes:
+                    raise ImageTooLarge(f"more than {self.max_bytes} bytes")
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"download took longer than {self.timeout}s")
+                chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _convert(self, data: bytes, digest: str) -> Dict[str, Any]:
+        """Convert image bytes to a dithered grayscale PNG in the cache."""
+        with Image.open(io.BytesIO(data)) as img:
+            # Let JPEG decode at a reduced size when it is much larger than needed
+            img.draft('L', (self.max_width, self.max_height))
+            img = self._flatten(img)
+            img.thumbnail((self.max_width, self.max_height), Image.LANCZOS)
+            img = self.dither(img)
+
+            path = self._content_path(digest)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            img.save(tmp_path, format='PNG', optimize=True)
+            os.replace(tmp_path, path)
+            result = {"hash": digest, "path": path, "width": img.width, "height": img.height}
+
+        self._write_json(f"{path}.json", result)
+        return result
+
+    def _flatten(self, img: Image.Image) -> Image.Image:
+        """Convert to 8-bit grayscale, compositing transparency onto white paper."""
+        if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+            rgba = img.convert('RGBA')
+            background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            img = Image.alpha_composite(background, rgba)
+        return img.convert('L')
+
+    def dither(self, img: Image.Image) -> Image.Image:
+        """Reduce an 8-bit grayscale image to gray_levels levels.
+
+        Uses vectorized ordered (Bayer 8x8) dithering when NumPy is installed,
+        which keeps flat areas free of the noise error diffusion adds, and
+        Pillow's Floyd-Steinberg quantization otherwise.
+        """
+        levels = self.gray_levels
+        if np is not None:
+            pixels = np.asarray(img, dtype=np.float32) * ((levels - 1) / 255.0)
+            threshold = (np.array(bayer_matrix(8), dtype=np.float32) + 0.5) / 64.0
+            height, width = pixels.shape
+            tiled = np.tile(threshold, (height // 8 + 1, width // 8 + 1))[:height, :width]
+            quantized = np.clip(np.floor(pixels + tiled), 0, levels - 1)
+            return Image.fromarray((quantized * (255.0 / (levels - 1))).round().astype(np.uint8), mode='L')
+
+        palette = Image.new('P', (1, 1))
+        gray = [round(i * 255 / (levels - 1)) for i in range(levels)]
+        palette.putpalette([value for level in gray for value in (level, level, level)] + [0] * (768 - 3 * levels))
+        return img.convert('RGB').quantize(palette=palette, dither=Image.Dither.FLOYDSTEINBERG).convert('L')
+
+    def _cached_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the processed result of a recently fetched URL."""
+        index_path = self._url_index_path(url)
+        try:
+            if time.time() - os.path.getmtime(index_path) > self.url_ttl:
+                return None
+            with open(index_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return self._cached_content(result.get("hash", ""))
+
+    def _cached_content(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the processed result for image content with this hash."""
+        path = self._content_path(digest)
+        try:
+            with open(f"{path}.json", 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            # Touch the image so eviction sees it as recently used
+            os.utime(path)
+        except OSError:
+            return None
+        return result
+
+    def _content_path(self, digest: str) -> str:
+        key = f"{digest}_{self.max_width}x{self.max_height}_{self.gray_levels}_v{PIPELINE_VERSION}"
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _url_index_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"url_{key}.json")
+
+    def _write_json(self, path: str, data: Dict[str, Any]) -> None:
+        """Write a JSON file atomically."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _evict(self) -> None:
+        """Remove expired URL entries, then least recently used images until the cache is under cache_max_bytes."""
+        images = []
+        total = 0
+        now = time.time()
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    name = dir_entry.name
+                    if name.endswith('.tmp'):
+                        continue
+                    stat = dir_entry.stat()
+                    if name.startswith('url_'):
+                        # A URL entry past its TTL is never read again
+                        if now - stat.st_mtime > self.url_ttl:
+                            self._remove(dir_entry.path)
+                        else:
+                            total += stat.st_size
+                    elif name.endswith('.png'):
+                        images.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                        total += stat.st_size
+                    else:
+                        total += stat.st_size
+        except OSError as e:
+            logger.warning(f"Could not scan image cache {self.cache_dir}: {e}")
+            return
+
+        if total <= self.cache_max_bytes:
+            return
+
+        # Evict down to 90% so every document does not trigger another scan-and-evict
+        target = self.cache_max_bytes * 0.9
+        evicted = 0
+        for _, size, path in sorted(images):
+            if total <= target:
+                break
+            self._remove(path)
+            self._remove(f"{path}.json")
+            total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} images from the image cache")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
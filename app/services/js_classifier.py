@@ -0,0 +1,131 @@
+"""JavaScript-necessity classifier for Pi Share Receiver.
+
+Looks at the HTML returned by a plain static fetch and decides whether the
+page needs a headless browser to render its content.
+"""
+
+import re
+import logging
+from bs4 import BeautifulSoup
+from typing import Dict, Any, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Root containers that SPA frameworks render into
+SPA_ROOT_IDS = ['root', 'app', '__next', '__nuxt', '___gatsby', 'svelte', 'main-app']
+SPA_ROOT_TAGS = ['app-root']
+
+# Phrases that a <noscript> block uses to ask for JavaScript
+NOSCRIPT_HINT_PATTERN = re.compile(
+    r'(enable|requires?|turn on|activate)\s+javascript|javascript\s+(is\s+)?(disabled|required|must be enabled)',
+    re.IGNORECASE
+)
+
+# Paragraphs that the static scraper adds itself and that say nothing about the page
+SCRAPER_NOISE_PREFIXES = ('Scraped at:', 'No content could be extracted')
+
+
+class JSNecessityClassifier:
+    """Decides whether a statically fetched page needs JavaScript rendering."""
+
+    def __init__(self, min_main_text: int = 500, min_total_text: int = 1000,
+                 min_text_ratio: float = 0.02):
+        """Initialize with the thresholds a static result must clear.
+
+        Args:
+            min_main_text: Characters of text an article/main element needs
+            min_total_text: Characters of extracted text without an article/main element
+            min_text_ratio: Minimum ratio of visible text to raw markup
+        """
+        self.min_main_text = min_main_text
+        self.min_total_text = min_total_text
+        self.min_text_ratio = min_text_ratio
+
+    def classify(self, html: str, content: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Classify a static fetch result.
+
+        Args:
+            html: Raw HTML of the static fetch
+            content: Structured content the static scraper produced (optional)
+
+        Returns:
+            Dict with needs_js flag, the reasons for it and the measured signals
+        """
+        signals = self._measure(html or "", content)
+        reasons: List[str] = []
+
+        has_main = signals['main_text_length'] >= self.min_main_text
+        has_text = signals['content_text_length'] >= self.min_total_text
+
+        if signals['empty_spa_roots'] and not has_main:
+            reasons.append(f"empty SPA root: {', '.join(signals['empty_spa_roots'])}")
+        if signals['noscript_hint'] and not (has_main or has_text):
+            reasons.append("noscript asks for JavaScript")
+        if signals['text_ratio'] < self.min_text_ratio and not has_main:
+            reasons.append(f"text-to-markup ratio {signals['text_ratio']:.3f} below {self.min_text_ratio}")
+        if not has_main and not has_text:
+            reasons.append(
+                f"static text too short (main {signals['main_text_length']}, "
+                f"content {signals['content_text_length']} chars)"
+            )
+
+        return {
+            "needs_js": bool(reasons),
+            "reasons": reasons,
+            "signals": signals
+        }
+
+    def _measure(self, html: str, content: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Collect the raw signals used by classify."""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # noscript hints have to be read before the text measurement drops them
+        noscript_hint = any(
+            NOSCRIPT_HINT_PATTERN.search(tag.get_text(" ", strip=True))
+            for tag in soup.find_all('noscript')
+        )
+
+        for element in soup(["script", "style", "noscript", "template"]):
+            element.decompose()
+
+        visible_text = soup.get_text(" ", strip=True)
+        text_ratio = len(visible_text) / len(html) if html else 0.0
+
+        empty_spa_roots = []
+        for root_id in SPA_ROOT_IDS:
+            root = soup.find(id=root_id)
+            if root is not None and len(root.get_text(strip=True)) < 20:
+                empty_spa_roots.append(f"#{root_id}")
+        for tag_name in SPA_ROOT_TAGS:
+            root = soup.find(tag_name)
+            if root is not None and len(root.get_text(strip=True)) < 20:
+                empty_spa_roots.append(tag_name)
+
+        main_text_length = 0
+        for main in soup.find_all(['article', 'main']) + soup.find_all(attrs={'role': 'main'}):
+            main_text_length = max(main_text_length, len(main.get_text(" ", strip=True)))
+
+        return {
+            "html_length": len(html),
+            "text_length": len(visible_text),
+            "text_ratio": text_ratio,
+            "noscript_hint": noscript_hint,
+            "empty_spa_roots": empty_spa_roots,
+            "main_text_length": main_text_length,
+            "content_text_length": self._content_text_length(content)
+        }
+
+    def _content_text_length(self, content: Optional[Dict[str, Any]]) -> int:
+        """Count the text a scraper extracted, ignoring its own status paragraphs."""
+        if not content:
+            return 0
+
+        total = 0
+        for item in content.get('structured_content', []):
+            text = item.get('content', '')
+            if isinstance(text, str) and not text.startswith(SCRAPER_NOISE_PREFIXES):
+                total += len(text)
+            for list_item in item.get('items', []):
+                total += len(list_item)
+        return total
@@ -0,0 +1,206 @@
+"""Main content detection for Pi Share Receiver.
+
+Readability-style scoring: paragraphs are scored by length and comma count,
+their scores are credited to their parent and grandparent, and every
+candidate container is weighted by its class/id names and penalized by its
+link density. Everything is computed in a single bottom-up pass over the
+tree, so the cost is linear in the size of the page.
+"""
+
+import re
+import logging
+from bs4 import NavigableString, Tag
+from typing import Dict, Optional
+from .content_extractor import NON_CONTENT_TAGS, NON_TEXT_STRINGS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Class/id names suggesting article content or page chrome
+POSITIVE_NAMES = re.compile(r'article|body|content|entry|hentry|h-entry|main|page|post|text|blog|story', re.I)
+NEGATIVE_NAMES = re.compile(
+    r'hidden|banner|combx|comment|com-|contact|cookie|foot|footer|footnote|gdpr|masthead|media|menu|meta|'
+    r'nav|newsletter|outbrain|promo|related|scroll|share|shoutbox|sidebar|skyscraper|social|sponsor|'
+    r'shopping|subscribe|tags|tool|widget',
+    re.I
+)
+
+# Elements scored as paragraphs
+PARAGRAPH_TAGS = {'p', 'pre', 'td'}
+
+# Block-level children that stop a div from counting as a paragraph itself
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dl', 'div', 'fieldset', 'figure', 'footer', 'form',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'table', 'ul'
+}
+
+# Base score of a candidate by tag
+TAG_WEIGHTS = {
+    'div': 5, 'article': 5, 'main': 5, 'section': 3,
+    'pre': 3, 'td': 3, 'blockquote': 3,
+    'address': -3, 'ol': -3, 'ul': -3, 'dl': -3, 'dd': -3, 'dt': -3, 'li': -3, 'form': -3,
+    'h1': -5, 'h2': -5, 'h3': -5, 'h4': -5, 'h5': -5, 'h6': -5, 'th': -5
+}
+
+class _NodeStats:
+    """Text statistics of a subtree, filled in when the walk leaves it."""
+    __slots__ = ('node', 'parent', 'text_length', 'link_length', 'commas', 'has_block', 'score', 'is_candidate')
+
+    def __init__(self, node: Tag, parent: Optional['_NodeStats']):
+        self.node = node
+        self.parent = parent
+        self.text_length = 0
+        self.link_length = 0
+        self.commas = 0
+        self.has_block = False
+        self.score = 0.0
+        self.is_candidate = False
+
+    @property
+    def link_density(self) -> float:
+        return self.link_length / self.text_length if self.text_length else 0.0
+
+class MainContentScorer:
+    """Finds the element holding a page's main content."""
+
+    def __init__(self, min_paragraph_length: int = 25, min_text_length: int = 250,
+                 class_weight: float = 25, promote_ratio: float = 1.25):
+        """Initialize scoring options.
+
+        Args:
+            min_paragraph_length: Paragraphs shorter than this are not scored
+            min_text_length: Text the best candidate needs to be trusted
+            class_weight: Score added or removed for positive/negative class and id names
+            promote_ratio: The result is widened to its parent while the parent
+                has at most this much more text, mostly not links (to keep
+                titles, bylines and lead images)
+        """
+        self.min_paragraph_length = min_paragraph_length
+        self.min_text_length = min_text_length
+        self.class_weight = class_weight
+        self.promote_ratio = promote_ratio
+
+    def score(self, root: Tag) -> Dict[int, _NodeStats]:
+        """Score every candidate container under root in one bottom-up pass.
+
+        Args:
+            root: Element or document to score
+
+        Returns:
+            Dict mapping id(element) to the statistics of each candidate;
+            stats.score is its final score
+        """
+        candidates: Dict[int, _NodeStats] = {}
+        root_stats = _NodeStats(root, None)
+
+        # Explicit post-order walk: (stats, child iterator)
+        stack = [(root_stats, iter(root.children))]
+        while stack:
+            current, children = stack[-1]
+            child = next(children, None)
+
+            if child is None:
+                stack.pop()
+                self._leave(current, candidates)
+                continue
+            if isinstance(child, NavigableString):
+                if not isinstance(child, NON_TEXT_STRINGS):
+                    text = str(child)
+                    current.text_length += len(' '.join(text.split()))
+                    current.commas += text.count(',')
+                continue
+            if child.name in NON_CONTENT_TAGS:
+                continue
+
+            if child.name in BLOCK_TAGS:
+                current.has_block = True
+            stack.append((_NodeStats(child, current), iter(child.children)))
+
+        # Final score: weighted content score scaled down by link density
+        for candidate in candidates.values():
+            candidate.score *= 1 - candidate.link_density
+        return candidates
+
+    def find_main(self, root: Optional[Tag]) -> Optional[Tag]:
+        """Return the element most likely to hold the main content.
+
+        Args:
+            root: Element or document to search
+
+        Returns:
+            The best scoring element, or None if no candidate has enough text
+        """
+        if root is None:
+            return None
+
+        candidates = self.score(root)
+        if not candidates:
+            return None
+        best = max(candidates.values(), key=lambda c: c.score)
+        if best.text_length < self.min_text_length:
+            logger.debug(f"No main content candidate with enough text (best has {best.text_length} chars)")
+            return None
+
+        # Widen to parents that add little besides a title, byline or image
+        while self._is_wrapper(best.parent, best):
+            best = best.parent
+
+        logger.debug(f"Main content: <{best.node.name}> score={best.score:.1f} text={best.text_length} chars")
+        return best.node
+
+    def _is_wrapper(self, parent: Optional[_NodeStats], child: _NodeStats) -> bool:
+        """Check whether parent only adds a little text, not made of links, around child."""
+        if parent is None or parent.parent is None or parent.node.name in ('body', 'html'):
+            return False
+        extra_text = parent.text_length - child.text_length
+        if extra_text > child.text_length * (self.promote_ratio - 1):
+            return False
+        # Link lists next to the article (related posts, sidebars) stay out
+        extra_links = parent.link_length - child.link_length
+        return extra_text == 0 or extra_links / extra_text <= 0.5
+
+    def _leave(self, current: _NodeStats, candidates: Dict[int, _NodeStats]) -> None:
+        """Finish a subtree: roll its statistics up and credit paragraph scores."""
+        if current.node.name == 'a':
+            current.link_length = current.text_length
+
+        parent = current.parent
+        if parent is None:
+            return
+        parent.text_length += current.text_length
+        parent.link_length += current.link_length
+        parent.commas += current.commas
+
+        name = current.node.name
+        is_paragraph = name in PARAGRAPH_TAGS or (name == 'div' and not current.has_block)
+        if not is_paragraph or current.text_length < self.min_paragraph_length:
+            return
+
+        # Paragraph score goes to its parent in full and its grandparent in half
+        content_score = 1 + current.commas + min(current.text_length // 100, 3)
+        for ancestor, share in ((parent, 1.0), (parent.parent, 0.5)):
+            if ancestor is None or ancestor.parent is None:
+                continue
+            if not ancestor.is_candidate:
+                ancestor.is_candidate = True
+                ancestor.score += self._initial_score(ancestor.node)
+                candidates[id(ancestor.node)] = ancestor
+            ancestor.score += content_score * share
+
+    def _initial_score(self, node: Tag) -> float:
+        """Score of a new candidate from its tag and class/id names."""
+        score = TAG_WEIGHTS.get(node.name, 0)
+        classes = node.get('class') or []
+        if isinstance(classes, str):
+            classes = [classes]
+        names = ' '.join(classes) + ' ' + (node.get('id') or '')
+        if NEGATIVE_NAMES.search(names):
+            score -= self.class_weight
+        if POSITIVE_NAMES.search(names):
+            score += self.class_weight
+        return score
+
+def find_main_content(root: Optional[Tag], **options) -> Optional[Tag]:
+    """Return the main content element of root, or None if there is no clear one."""
+    return MainContentScorer(**options).find_main(root)
@@ -0,0 +1,219 @@
+"""Page breaking for Pi Share Receiver documents.
+
+A document is laid out as blocks of lines before anything is written. Each
+line knows its height and what it draws relative to its top, so the
+paginator can break paragraphs, lists and code blocks between any two lines
+and place every line on the page it actually fits on:
+
+- orphan and widow control keeps at least `orphans` lines of a block at the
+  bottom of a page and `widows` lines at the top of the next one;
+- headings are kept with the start of the block that follows them;
+- a framed block (code) gets its frame drawn around each page's part;
+- an image that does not fit is shrunk when enough of the page is left
+  and moved to the next page otherwise.
+
+The result is a list of pages with their placed lines, from which the HCL
+writer produces the document and a page map.
+"""
+
+import logging
+from typing import Any, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class Line:
+    """One unbreakable row of a block.
+
+    Operations are tuples whose vertical positions are relative to the top
+    of the line:
+        ("text", x, dy, text, font, size)
+        ("image", x, dy, width, height, path)
+        ("line", x1, x2, dy, width)
+        ("rectangle", x, dy, width, height)
+    """
+
+    __slots__ = ("height", "ops", "shrinkable")
+
+    def __init__(self, height: float, ops: List[Tuple], shrinkable: bool = False):
+        self.height = height
+        self.ops = ops
+        self.shrinkable = shrinkable  # An image that may be scaled down to fit
+
+    def shrunk(self, height: float) -> "Line":
+        """Return this line with its images scaled down to the given height."""
+        factor = height / self.height
+        ops = [(op[0], op[1], op[2], op[3] * factor, op[4] * factor, op[5]) if op[0] == "image" else op
+               for op in self.ops]
+        return Line(height, ops, self.shrinkable)
+
+class Block:
+    """A run of lines from one content item, placed together where possible."""
+
+    __slots__ = ("lines", "space_after", "breakable", "keep_with_next", "frame", "index")
+
+    def __init__(self, lines: List[Line], space_after: float = 0.0, breakable: bool = True,
+                 keep_with_next: bool = False, frame: Optional[Tuple[float, float, float]] = None,
+                 index: Optional[int] = None):
+        """Initialize the block.
+
+        Args:
+            lines: The block's lines, top to bottom
+            space_after: Gap below the block, dropped at the bottom of a page
+            breakable: Whether the block may be split between pages
+            keep_with_next: Keep the block on the same page as the start of the next one
+            frame: (x, width, padding) of a rectangle drawn around each page's part,
+                with padding above the first line
+            index: Position of the content item the block came from
+        """
+        self.lines = lines
+        self.space_after = space_after
+        self.breakable = breakable
+        self.keep_with_next = keep_with_next
+        self.frame = frame
+        self.index = index
+
+class Page:
+    """Lines placed on one page."""
+
+    __slots__ = ("placed", "frames", "blocks")
+
+    def __init__(self):
+        self.placed: List[Tuple[float, Line]] = []  # (top, line)
+        self.frames: List[Tuple[float, float, float, float]] = []  # (x, y, width, height)
+        self.blocks: List[int] = []  # Indices of the content items with lines on this page
+
+class Paginator:
+    """Breaks blocks into pages at line boundaries."""
+
+    def __init__(self, top: float, bottom: float, orphans: int = 2, widows: int = 2,
+                 min_shrink: float = 0.5):
+        """Initialize the paginator.
+
+        Args:
+            top: Vertical position of the first line on a page
+            bottom: Lowest position a line may reach
+            orphans: Lines of a split block kept at least at the bottom of a page
+            widows: Lines of a split block carried at least to the top of the next page
+            min_shrink: Share of a page that must be left for an image to be shrunk into it
+        """
+        self.top = top
+        self.bottom = bottom
+        self.orphans = max(1, orphans)
+        self.widows = max(1, widows)
+        self.min_shrink = min_shrink
+
+    def paginate(self, blocks: List[Block]) -> List[Page]:
+        """Place the blocks on as many pages as they need.
+
+        Args:
+            blocks: Blocks in document order
+
+        Returns:
+            The pages, each with at least one line except for an empty document
+        """
+        pages = [Page()]
+        y = self.top
+
+        for position, block in enumerate(blocks):
+            lines = block.lines
+            if not lines:
+                continue
+
+            if block.keep_with_next and y > self.top:
+                following = blocks[position + 1] if position + 1 < len(blocks) else None
+                needed = self._height(lines) + block.space_after
+                if following is not None and following.lines:
+                    needed += self._height(following.lines[:self.orphans]) + self._padding(following)
+                if y + needed > self.bottom and self.top + needed <= self.bottom:
+                    pages.append(Page())
+                    y = self.top
+
+            while lines:
+                padding = self._padding(block)
+                fitting = self._fitting(lines, y + padding)
+                count = fitting
+                at_top = y == self.top
+
+                if fitting < len(lines):
+                    if len(lines) == 1 and lines[0].shrinkable and not at_top:
+                        remaining = self.bottom - y - padding
+                        if remaining >= (self.bottom - self.top) * self.min_shrink:
+                            lines = [lines[0].shrunk(remaining)]
+                            count = 1
+                    elif not block.breakable:
+                        count = fitting if at_top else 0
+                    else:
+                        count = min(fitting, len(lines) - self.widows)
+                        if count < self.orphans:
+                            count = 0
+
+                if count == 0 and at_top:
+                    # Nothing fits even on an empty page: place what can be placed
+                    count = max(1, fitting)
+                if count == 0:
+                    pages.append(Page())
+                    y = self.top
+                    continue
+
+                y = self._place(pages[-1], block, lines[:count], y)
+                lines = lines[count:]
+                if lines:
+                    pages.append(Page())
+                    y = self.top
+
+            y += block.space_after
+
+        return pages
+
+    def _place(self, page: Page, block: Block, lines: List[Line], y: float) -> float:
+        """Put lines of a block on a page at y; return the position below them."""
+        start = y
+        y += self._padding(block)
+        for line in lines:
+            page.placed.append((y, line))
+            y += line.height
+        if block.frame is not None:
+            x, width, _ = block.frame
+            page.frames.append((x, start, width, y - start))
+        if block.index is not None and (not page.blocks or page.blocks[-1] != block.index):
+            page.blocks.append(block.index)
+        return y
+
+    def _fitting(self, lines: List[Line], y: float) -> int:
+        """Count the leading lines that fit between y and the bottom of the page."""
+        count = 0
+        for line in lines:
+            y += line.height
+            if y > self.bottom + 1e-6:
+                break
+            count += 1
+        return count
+
+    @staticmethod
+    def _height(lines: List[Line]) -> float:
+        return sum(line.height for line in lines)
+
+    @staticmethod
+    def _padding(block: Block) -> float:
+        return block.frame[2] if block.frame is not None else 0.0
+
+def page_map_entry(number: int, page: Page, hcl_lines: Tuple[int, int], font: Any) -> dict:
+    """Describe one written page for the page map.
+
+    Args:
+        number: Page number, from 0
+        page: The page
+        hcl_lines: (first, end) line numbers of the page's commands in the HCL file
+        font: (name, size) in effect when the page starts
+
+    Returns:
+        The page map entry
+    """
+    return {
+        "page": number,
+        "hcl_lines": list(hcl_lines),
+        "font": list(font) if font else None,
+        "blocks": page.blocks,
+        "lines": len(page.placed),
+    }
@@ -0,0 +1,185 @@
+"""Head-only page metadata extraction for Pi Share Receiver.
+
+Reads <title>, og:title, twitter:title and the description by streaming the
+response through an incremental parser and stopping once the document head
+has been read. Only when the head has no usable title does reading continue,
+up to the end of the first <h1>. A multi-megabyte page therefore costs a few
+kilobytes of transfer and parsing instead of a full download and parse.
+"""
+
+import codecs
+import logging
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, Optional
+from .charset import META_SNIFF_BYTES, choose_encoding
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bytes read at most when looking for a title, even if none is found
+MAX_METADATA_BYTES = 512 * 1024
+
+# Shorter titles are treated as missing
+MIN_TITLE_LENGTH = 3
+
+# <meta> names/properties collected, mapped to metadata keys
+META_KEYS = {
+    'og:title': 'og_title',
+    'twitter:title': 'twitter_title',
+    'description': 'description',
+    'og:description': 'og_description',
+}
+
+# Tags that end the head when it has no explicit </head>
+BODY_START_TAGS = {'body', 'div', 'h1', 'main', 'article', 'header', 'p'}
+
+class HeadMetadataParser(HTMLParser):
+    """Incremental parser collecting page metadata; sets done when it has enough."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.metadata: Dict[str, str] = {}
+        self.head_finished = False
+        self.done = False
+        self._capture: Optional[str] = None
+        self._text = []
+
+    def has_title(self) -> bool:
+        """Check whether the head provided a usable title."""
+        return any(
+            len(self.metadata.get(key, '').strip()) >= MIN_TITLE_LENGTH
+            for key in ('title', 'og_title', 'twitter_title')
+        )
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'meta' and not self.head_finished:
+            attributes = dict(attrs)
+            key = META_KEYS.get((attributes.get('property') or attributes.get('name') or '').lower())
+            if key and attributes.get('content') and key not in self.metadata:
+                self.metadata[key] = attributes['content']
+        elif tag == 'title' and 'title' not in self.metadata and not self.head_finished:
+            self._start_capture('title')
+        elif tag in BODY_START_TAGS:
+            self._finish_head()
+            if tag == 'h1' and not self.done:
+                self._start_capture('h1')
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == self._capture:
+            self.metadata[tag] = ' '.join(''.join(self._text).split())
+            self._capture = None
+            if tag == 'h1':
+                self.done = True
+        elif tag == 'head':
+            self._finish_head()
+
+    def handle_data(self, data):
+        if self._capture:
+            self._text.append(data)
+
+    def _start_capture(self, tag: str) -> None:
+        self._capture = tag
+        self._text = []
+
+    def _finish_head(self) -> None:
+        """The head is complete: stop unless its title is missing."""
+        if self.head_finished:
+            return
+        self.head_finished = True
+        if self._capture == 'title':
+            self.metadata['title'] = ' '.join(''.join(self._text).split())
+            self._capture = None
+        if self.has_title():
+            self.done = True
+
+def parse_head_metadata(chunks: Iterable[bytes], content_type: Optional[str] = None,
+                        max_bytes: int = MAX_METADATA_BYTES) -> Dict[str, Any]:
+    """Parse metadata from a stream of body chunks, reading no more than needed.
+
+    Args:
+        chunks: Body chunks, e.g. response.iter_content()
+        content_type: Content-Type header, used to pick the encoding
+        max_bytes: Bytes read at most
+
+    Returns:
+        Dict with any of title, og_title, twitter_title, description,
+        og_description and h1, plus bytes_read and complete (True if parsing
+        stopped because it had what it needed rather than at a limit or the end)
+    """
+    parser = HeadMetadataParser()
+    decoder = None
+    pending = b''
+    bytes_read = 0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        bytes_read += len(chunk)
+
+        if decoder is None:
+            # Buffer until the encoding can be sniffed from the first bytes
+            pending += chunk
+            if len(pending) < META_SNIFF_BYTES and bytes_read < max_bytes:
+                continue
+            chunk, pending = pending, b''
+            encoding, _, bom_length = choose_encoding(chunk, content_type)
+            decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+            chunk = chunk[bom_length:]
+
+        parser.feed(decoder.decode(chunk))
+        if parser.done or bytes_read >= max_bytes:
+            break
+
+    if decoder is None and pending:
+        # Body shorter than the sniffing window
+        encoding, _, bom_length = choose_encoding(pending, content_type)
+        parser.feed(pending[bom_length:].decode(encoding or 'utf-8', errors='replace'))
+    if not parser.done:
+        parser.close()
+
+    metadata: Dict[str, Any] = dict(parser.metadata)
+    metadata['bytes_read'] = bytes_read
+    metadata['complete'] = parser.done
+    return metadata
+
+def fetch_page_metadata(http_client, url: str, timeout: float = 10,
+                        max_bytes: int = MAX_METADATA_BYTES, chunk_size: int = 8192) -> Dict[str, Any]:
+    """Fetch a page's metadata, downloading only as much as needed.
+
+    A fresh copy in the HTTP cache is used without going to the network.
+    Otherwise the response is streamed and closed as soon as the metadata is
+    complete; a fully read response returns its connection to the pool, a
+    partly read one has its connection closed.
+
+    Args:
+        http_client: HttpClient to fetch with
+        url: Page URL
+        timeout: Request timeout in seconds
+        max_bytes: Bytes read at most
+        chunk_size: Size of the chunks read from the connection
+
+    Returns:
+        Metadata dict as returned by parse_head_metadata
+    """
+    cache = http_client.cache
+    if cache is not None:
+        entry = cache.lookup(url)
+        if entry is not None and cache.is_fresh(entry):
+            response = cache.response(entry)
+            body = response.content
+            chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+            return parse_head_metadata(chunks, response.headers.get('Content-Type'), max_bytes)
+
+    with http_client.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        metadata = parse_head_metadata(
+            response.iter_content(chunk_size=chunk_size),
+            response.headers.get('Content-Type'),
+            max_bytes
+        )
+        logger.debug(f"Read {metadata['bytes_read']} of {response.headers.get('Content-Length', 'unknown')} bytes for metadata of {url}")
+    return metadata
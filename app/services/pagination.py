@@ -0,0 +1,363 @@
+"""Multi-page article assembly for Pi Share Receiver.
+
+Detects when an article continues on further pages (rel="next" links or a
+"next" link in a pagination bar) and works out the URL scheme of its pages:
+a page number or offset in the query string (?page=2, ?start=20) or in the
+path (/2/, /page/2). Two numbered URLs alone are not enough, since post ids
+look like page numbers too: the number must be named as a page (/page/3,
+?page=3), the current page must be the first (unnumbered, 0 or 1), or the
+next link must sit in a pagination bar. When the pagination bar shows the
+last page, all continuation pages are fetched concurrently; otherwise the
+next links are followed one page at a time. Either way at most max_pages
+pages are read.
+
+Each page's content is then merged in order, dropping the blocks that
+repeat across pages: site headers, the title, share bars and footers.
+"""
+
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode, urljoin
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup
+from .content_extractor import normalize_text
+
+# Import configuration with proper relative import
+try:
+    from ..config import CONFIG
+except ImportError:
+    try:
+        # Scraper scripts run with the app directory on sys.path
+        from config import CONFIG
+    except ImportError:
+        # Fallback to defaults if config cannot be imported
+        CONFIG = {}
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Pages of one article read at most, including the first
+MAX_PAGES = 10
+
+# Link texts of "next page" links (compared lowercased and stripped)
+NEXT_TEXTS = {'next', 'next page', 'next »', 'next ›', 'next >', '›', '»', '>', '→', 'older posts'}
+
+# Class/id hints of pagination bars and of their "next" links
+PAGINATION_HINTS = re.compile(r'pagination|pager|paging|page-numbers|pages', re.I)
+NEXT_HINTS = re.compile(r'(^|[-_ ])next([-_ ]|$)', re.I)
+
+# Path segments that introduce a page number, as in /page/2
+PAGE_SEGMENTS = {'page', 'p', 'seite', 'pagina'}
+
+# Query parameters holding a page number or offset, as in ?page=2 or ?start=20
+PAGE_PARAMETERS = PAGE_SEGMENTS | {'pg', 'paged', 'start', 'offset'}
+
+def configured_max_pages() -> int:
+    """Return the page cap from CONFIG; 0 or 1 turns pagination off."""
+    return int(CONFIG.get('PAGINATION_MAX_PAGES', MAX_PAGES))
+
+class PageScheme:
+    """URL scheme of a paginated article, built from its first two page URLs.
+
+    Page index 0 is the current page; its URL maps page indices to values
+    first + index * step in one query parameter or path segment.
+    """
+
+    def __init__(self, base: Tuple, kind: str, key: Any, first: int, step: int):
+        self.base = base  # urlparse() result of the current page
+        self.kind = kind  # "query" or "path"
+        self.key = key  # Parameter name, or index of the path segment
+        self.first = first
+        self.step = step
+        self._path_prefix = None  # Path segments before the number, when the current page has none
+
+    @classmethod
+    def from_urls(cls, current: str, next_url: str, in_pagination: bool = False) -> Optional["PageScheme"]:
+        """Derive the scheme from the current page and its next page, or None if they do not fit one.
+
+        Args:
+            current: URL of the current page
+            next_url: URL of the next page
+            in_pagination: Whether the next link sits in a pagination bar
+
+        Returns:
+            The scheme, or None if the URLs do not fit one or, when both are
+            numbered, nothing shows the number is a page number
+        """
+        a, b = urlparse(current), urlparse(next_url)
+        if (a.scheme, a.netloc) != (b.scheme, b.netloc):
+            return None
+
+        if a.path.rstrip('/') == b.path.rstrip('/'):
+            query_a, query_b = dict(parse_qsl(a.query)), dict(parse_qsl(b.query))
+            changed = [k for k in set(query_a) | set(query_b) if query_a.get(k) != query_b.get(k)]
+            if len(changed) != 1 or not query_b.get(changed[0], '').isdigit():
+                return None
+            key = changed[0]
+            named = in_pagination or key.lower() in PAGE_PARAMETERS
+            return cls._numbered(a, "query", key, query_a.get(key), int(query_b[key]), named)
+
+        segments_a, segments_b = _segments(a.path), _segments(b.path)
+        if len(segments_a) == len(segments_b):
+            changed = [i for i, (x, y) in enumerate(zip(segments_a, segments_b)) if x != y]
+            if len(changed) == 1 and segments_a[changed[0]].isdigit() and segments_b[changed[0]].isdigit():
+                index = changed[0]
+                named = in_pagination or (index > 0 and segments_a[index - 1].lower() in PAGE_SEGMENTS)
+                return cls._numbered(a, "path", index, segments_a[index], int(segments_b[index]), named)
+            return None
+
+        # The first page often has no number at all: /article -> /article/2 or /article/page/2
+        extra = segments_b[len(segments_a):]
+        if segments_b[:len(segments_a)] != segments_a or not extra[-1].isdigit():
+            return None
+        if len(extra) == 1 or (len(extra) == 2 and extra[0].lower() in PAGE_SEGMENTS):
+            return cls._numbered(a, "path", len(segments_b) - 1, None, int(extra[-1]), True, segments_b[:-1])
+        return None
+
+    @classmethod
+    def _numbered(cls, base, kind, key, current_value, next_value, named, path_prefix=None):
+        if current_value is not None:
+            first = int(current_value)
+            if first > 1 and not named:
+                # /posts/123 -> /posts/124 is more likely the next post than page 124
+                return None
+            step = next_value - first
+        elif next_value == 2:
+            # Page numbers: the unnumbered page is page 1
+            first, step = 1, 1
+        else:
+            # Offsets: the unnumbered page starts at 0
+            first, step = 0, next_value
+        if step <= 0:
+            return None
+        scheme = cls(base, kind, key, first, step)
+        scheme._path_prefix = path_prefix
+        return scheme
+
+    def url_for(self, index: int) -> str:
+        """Return the URL of the page index pages after the current one."""
+        value = str(self.first + index * self.step)
+        if self.kind == "query":
+            query = dict(parse_qsl(self.base.query))
+            query[self.key] = value
+            return urlunparse(self.base._replace(query=urlencode(query)))
+        segments = list(self._path_prefix) + [value] if self._path_prefix is not None else _segments(self.base.path)
+        segments[self.key] = value
+        trailing = '/' if self.base.path.endswith('/') else ''
+        return urlunparse(self.base._replace(path='/' + '/'.join(segments) + trailing))
+
+    def index_of(self, url: str) -> Optional[int]:
+        """Return the page index of a URL following this scheme, or None."""
+        parsed = urlparse(url)
+        if (parsed.scheme, parsed.netloc) != (self.base.scheme, self.base.netloc):
+            return None
+        if self.kind == "query":
+            query = dict(parse_qsl(parsed.query))
+            value = query.pop(self.key, None)
+            base_query = dict(parse_qsl(self.base.query))
+            base_query.pop(self.key, None)
+            if parsed.path.rstrip('/') != self.base.path.rstrip('/') or query != base_query:
+                return None
+        else:
+            segments = _segments(parsed.path)
+            expected = list(self._path_prefix) + ['#'] if self._path_prefix is not None else _segments(self.base.path)
+            if len(segments) != len(expected) or any(
+                    x != y for i, (x, y) in enumerate(zip(segments, expected)) if i != self.key):
+                return None
+            value = segments[self.key]
+        if value is None or not value.isdigit():
+            return None
+        offset = int(value) - self.first
+        return offset // self.step if offset >= 0 and offset % self.step == 0 else None
+
+def _segments(path: str) -> List[str]:
+    return [segment for segment in path.split('/') if segment]
+
+def find_next_link(soup: BeautifulSoup, url: str) -> Optional[str]:
+    """Find the URL of the next page from rel="next" or a pagination "next" link."""
+    return _find_next(soup, url)[0]
+
+def _find_next(soup: BeautifulSoup, url: str) -> Tuple[Optional[str], bool]:
+    """Return the next page URL (or None) and whether its link sits in a pagination bar."""
+    for tag in soup.find_all(['link', 'a'], rel=True):
+        rel = tag.get('rel')
+        rels = rel if isinstance(rel, list) else str(rel).split()
+        if 'next' in [r.lower() for r in rels] and tag.get('href'):
+            return urljoin(url, tag['href']), tag.name == 'a' and _in_pagination(tag)
+
+    for link in soup.find_all('a', href=True):
+        text = normalize_text(link.get_text(" ")).lower()
+        hints = ' '.join(link.get('class', [])) + ' ' + (link.get('id') or '')
+        if text in NEXT_TEXTS or NEXT_HINTS.search(hints):
+            in_pagination = _in_pagination(link)
+            if in_pagination or text.startswith('next'):
+                return urljoin(url, link['href']), in_pagination
+    return None, False
+
+def _in_pagination(link) -> bool:
+    """Check whether a link sits in a pagination bar."""
+    for parent in link.parents:
+        if parent.name in ('body', 'html', None):
+            return False
+        hints = ' '.join(parent.get('class', [])) + ' ' + (parent.get('id') or '') + ' ' + (parent.get('aria-label') or '')
+        if PAGINATION_HINTS.search(hints):
+            return True
+    return False
+
+def continuation_pages(soup: BeautifulSoup, url: str, max_pages: int) -> Tuple[Optional[PageScheme], List[str], bool]:
+    """Work out which further pages belong to the article.
+
+    Args:
+        soup: Parsed current page
+        url: URL of the current page
+        max_pages: Pages read at most, including the current one
+
+    Returns:
+        (scheme, URLs of the continuation pages, whether that list is complete).
+        The list is incomplete when the last page is unknown; it then holds
+        only the next page and later pages have to be found by following links.
+    """
+    if max_pages <= 1:
+        return None, [], True
+    next_url, in_pagination = _find_next(soup, url)
+    if not next_url or next_url.split('#')[0] == url.split('#')[0]:
+        return None, [], True
+    scheme = PageScheme.from_urls(url, next_url, in_pagination)
+    if scheme is None:
+        logger.debug(f"Next link {next_url} does not continue {url}, ignoring it")
+        return None, [], True
+
+    last = 0
+    for link in soup.find_all('a', href=True):
+        index = scheme.index_of(urljoin(url, link['href']))
+        if index is not None:
+            last = max(last, index)
+    if last <= 1:
+        return scheme, [next_url], False
+    return scheme, [scheme.url_for(index) for index in range(1, min(last, max_pages - 1) + 1)], True
+
+def collect_pages(soup: BeautifulSoup, url: str, fetch: Callable[[str], Tuple[str, str]],
+                  parse: Callable[[str], BeautifulSoup], max_pages: int = 10,
+                  max_workers: int = 4) -> List[Tuple[str, BeautifulSoup]]:
+    """Fetch the continuation pages of an article.
+
+    Args:
+        soup: Parsed first page
+        url: URL of the first page
+        fetch: Returns (html, final URL) for a URL; raises on failure
+        parse: Parses HTML into a soup
+        max_pages: Pages read at most, including the first
+        max_workers: Pages fetched at the same time
+
+    Returns:
+        (url, soup) of each continuation page, in page order; pages that failed
+        to load end the article there
+    """
+    scheme, urls, complete = continuation_pages(soup, url, max_pages)
+    if not urls:
+        return []
+
+    pages = []
+    if complete:
+        logger.info(f"Fetching {len(urls)} continuation pages of {url}")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="page") as executor:
+            results = list(executor.map(lambda page_url: _fetch_quietly(fetch, page_url), urls))
+        for page_url, html in zip(urls, results):
+            if html is None:
+                break
+            pages.append((page_url, parse(html)))
+        return pages
+
+    # Last page unknown: follow next links one page at a time
+    visited = {url.split('#')[0]}
+    next_url = urls[0]
+    while next_url and len(pages) < max_pages - 1 and next_url.split('#')[0] not in visited:
+        visited.add(next_url.split('#')[0])
+        html = _fetch_quietly(fetch, next_url)
+        if html is None:
+            break
+        page_soup = parse(html)
+        pages.append((next_url, page_soup))
+        candidate = find_next_link(page_soup, next_url)
+        next_url = candidate if candidate and scheme.index_of(candidate) is not None else None
+    return pages
+
+def _fetch_quietly(fetch: Callable[[str], Tuple[str, str]], url: str) -> Optional[str]:
+    try:
+        html, _ = fetch(url)
+        return html
+    except Exception as e:
+        logger.warning(f"Could not fetch continuation page {url}: {e}")
+        return None
+
+def _block_key(block: Dict[str, Any], images: Dict[str, Dict[str, Any]]) -> str:
+    """Key identifying a block's content across pages."""
+    if block.get("type") == "image":
+        image = images.get(block.get("image_id"), {})
+        return "image " + image.get("src", "")
+    text = block.get("content") or ' '.join(block.get("items", []))
+    return f"{block.get('type')} {normalize_text(text).lower()}"
+
+def merge_pages(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the extracted content of an article's pages in order.
+
+    Blocks found on more than one page are boilerplate (site header, title,
+    share bar, footer): they are kept where they lead the first page, dropped
+    where they trail it and dropped from every continuation page. Images are
+    renumbered so their ids stay unique.
+
+    Args:
+        pages: Content dicts (title, structured_content, images) in page order
+
+    Returns:
+        The merged content dict, with the first page's title
+    """
+    if len(pages) == 1:
+        return pages[0]
+
+    keyed = []
+    counts: Dict[str, int] = {}
+    for page in pages:
+        images = {image["id"]: image for image in page.get("images", [])}
+        keys = [_block_key(block, images) for block in page.get("structured_content", [])]
+        keyed.append((page, images, keys))
+        for key in set(keys):
+            counts[key] = counts.get(key, 0) + 1
+    repeated = {key for key, count in counts.items() if count > 1}
+
+    merged_blocks = []
+    merged_images = []
+    image_srcs = {}
+    for page_number, (page, images, keys) in enumerate(keyed):
+        blocks = page.get("structured_content", [])
+        if page_number == 0:
+            # Keep the first page's header, drop its footer
+            end = max((i + 1 for i, key in enumerate(keys) if key not in repeated), default=len(blocks))
+            kept = [(block, key) for block, key in zip(blocks[:end], keys[:end])]
+        else:
+            kept = [(block, key) for block, key in zip(blocks, keys) if key not in repeated]
+
+        for block, key in kept:
+            if block.get("type") == "image":
+                image = images.get(block.get("image_id"))
+                if image is None or image["src"] in image_srcs:
+                    continue
+                block = dict(block, image_id=_merge_image(image, merged_images, image_srcs))
+            merged_blocks.append(block)
+
+        for image in page.get("images", []):
+            if image["src"] not in image_srcs and counts.get("image " + image["src"], 0) <= 1:
+                _merge_image(image, merged_images, image_srcs)
+
+    merged = dict(pages[0])
+    merged["structured_content"] = merged_blocks
+    merged["images"] = merged_images
+    return merged
+
+def _merge_image(image: Dict[str, Any], merged_images: List[Dict[str, Any]], image_srcs: Dict[str, str]) -> str:
+    """Add an image under a new id unless its source is already merged; return its id."""
+    if image["src"] not in image_srcs:
+        image_srcs[image["src"]] = f"img_{len(merged_images)}"
+        merged_images.append(dict(image, id=image_srcs[image["src"]]))
+    return image_srcs[image["src"]]
@@ -1,11 +1,11 @@
 """PDF processing service for Pi Share Receiver."""
 
 import os
-import requests
 import PyPDF2
 from urllib.parse import urlparse
 from typing import Dict, Optional, Any
 import logging
+from .http_client import HttpClient, get_default_client
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -13,15 +13,17 @@ logger = logging.getLogger(__name__)
 class PDFService:
     """Handles PDF processing operations."""
     
-    def __init__(self, temp_dir: str, extract_dir: str):
+    def __init__(self, temp_dir: str, extract_dir: str, http_client: Optional[HttpClient] = None):
         """Initialize with directories for temporary and extracted files.
         
         Args:
             temp_dir: Directory for temporary PDF storage
             extract_dir: Directory for PDF content extraction
+            http_client: Shared HTTP client (default: the process-wide client)
         """
         self.temp_dir = temp_dir
         self.extract_dir = extract_dir
+        self.http_client = http_client or get_default_client()
         os.makedirs(temp_dir, exist_ok=True)
         os.makedirs(extract_dir, exist_ok=True)
 
@@ -40,7 +42,7 @@ class PDFService:
         
         # Check content type from headers
         try:
-            headers = requests.head(url, allow_redirects=True, timeout=10).headers
+            headers = self.http_client.head(url, timeout=10).headers
             content_type = headers.get('Content-Type', '').lower()
             return 'application/pdf' in content_type
         except Exception as e:
@@ -69,12 +71,12 @@ class PDFService:
             pdf_path = os.path.join(self.temp_dir, filename)
             
             # Download PDF
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            with open(pdf_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            with self.http_client.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                
+                with open(pdf_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
             
             # Extract title from PDF metadata or filename
             title = self._extract_pdf_title(pdf_path, url)
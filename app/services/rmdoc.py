@@ -0,0 +1,183 @@
+"""reMarkable .rmdoc archives for Pi Share Receiver.
+
+An .rmdoc is a zip holding one document:
+
+    <doc>.content     JSON: file type, page count and page order
+    <doc>.metadata    JSON: visible name, type and timestamps
+    <doc>/<page>.rm   one lines file per page (plus optional
+                      <doc>/<page>-metadata.json)
+
+Page order comes from "cPages" (newer firmware, pages sorted by a
+fractional index string) or from the plain "pages" list. merge_rmdocs
+joins the documents drawj2d wrote for consecutive chunks of a long
+document into one archive, and split_rmdoc cuts the document of a batched
+conversion into one archive per job; both keep the pages in order and
+rebuild the content and metadata for the new page lists.
+"""
+
+import json
+import time
+import uuid
+import zipfile
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class RmdocError(Exception):
+    """Raised when an archive is not a readable .rmdoc."""
+
+def read_rmdoc(path: str) -> Tuple[Dict[str, Any], List[Tuple[bytes, bytes]]]:
+    """Read the content JSON and the pages of an .rmdoc in order.
+
+    Args:
+        path: Archive to read
+
+    Returns:
+        (content, pages) where each page is (lines data, page metadata or b"")
+
+    Raises:
+        RmdocError: If the archive has no content file or lacks a listed page
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+            content_name = next((name for name in names if name.endswith('.content') and '/' not in name), None)
+            if content_name is None:
+                raise RmdocError(f"{path}: no .content file")
+            doc_id = content_name[:-len('.content')]
+            content = json.loads(archive.read(content_name))
+
+            pages = []
+            for page_id in page_ids(content):
+                page_name = f"{doc_id}/{page_id}.rm"
+                if page_name not in names:
+                    raise RmdocError(f"{path}: page {page_id} missing")
+                metadata_name = f"{doc_id}/{page_id}-metadata.json"
+                metadata = archive.read(metadata_name) if metadata_name in names else b""
+                pages.append((archive.read(page_name), metadata))
+            return content, pages
+    except (zipfile.BadZipFile, ValueError, KeyError) as e:
+        raise RmdocError(f"{path}: {e}") from e
+
+def page_ids(content: Dict[str, Any]) -> List[str]:
+    """Return the ids of a document's pages in display order."""
+    c_pages = content.get('cPages')
+    if c_pages:
+        pages = [page for page in c_pages.get('pages', []) if not page.get('deleted')]
+        pages.sort(key=lambda page: (page.get('idx') or {}).get('value', ''))
+        return [page['id'] for page in pages]
+    return list(content.get('pages', []))
+
+def index_values(count: int) -> List[str]:
+    """Return count fractional index strings that sort in page order."""
+    width = 1
+    while 26 ** width < count:
+        width += 1
+    values = []
+    for number in range(count):
+        digits = []
+        for _ in range(width):
+            number, digit = divmod(number, 26)
+            digits.append(chr(ord('a') + digit))
+        values.append('b' + ''.join(reversed(digits)))
+    return values
+
+def merge_rmdocs(paths: List[str], out_path: str, title: str) -> int:
+    """Merge .rmdoc archives into one, keeping their pages in order.
+
+    The merged content JSON is based on the first archive's, with the page
+    list (and cPages, when present) rebuilt for fresh page ids; the
+    metadata is written anew with title as the visible name.
+
+    Args:
+        paths: Archives in page order
+        out_path: Merged archive to write
+        title: Visible name of the merged document
+
+    Returns:
+        Number of pages in the merged document
+
+    Raises:
+        RmdocError: If one of the archives cannot be read
+    """
+    content = None
+    pages = []
+    for path in paths:
+        chunk_content, chunk_pages = read_rmdoc(path)
+        if content is None:
+            content = chunk_content
+        pages.extend(chunk_pages)
+
+    write_rmdoc(out_path, content, pages, title)
+    logger.info(f"Merged {len(paths)} archives into {out_path} ({len(pages)} pages)")
+    return len(pages)
+
+def split_rmdoc(path: str, page_counts: List[int], out_paths: List[str], titles: List[str]) -> None:
+    """Split an .rmdoc into consecutive documents of the given page counts.
+
+    Args:
+        path: Archive to split
+        page_counts: Pages of each part, in order
+        out_paths: Archive to write for each part
+        titles: Visible name of each part
+
+    Raises:
+        RmdocError: If the archive cannot be read or its page count is not
+            the sum of page_counts
+    """
+    content, pages = read_rmdoc(path)
+    if len(pages) != sum(page_counts):
+        raise RmdocError(f"{path}: {len(pages)} pages, expected {sum(page_counts)}")
+
+    first = 0
+    for count, out_path, title in zip(page_counts, out_paths, titles):
+        write_rmdoc(out_path, content, pages[first:first + count], title)
+        first += count
+    logger.info(f"Split {path} into {len(page_counts)} archives")
+
+def write_rmdoc(out_path: str, content: Optional[Dict[str, Any]], pages: List[Tuple[bytes, bytes]], title: str) -> None:
+    """Write pages as a new document with fresh ids.
+
+    Args:
+        out_path: Archive to write
+        content: Content JSON to base the new one on (page list replaced)
+        pages: (lines data, page metadata or b"") in order
+        title: Visible name of the document
+    """
+    doc_id = str(uuid.uuid4())
+    ids = [str(uuid.uuid4()) for _ in pages]
+    document = dict(content or {"fileType": "notebook", "orientation": "portrait"})
+    document["pageCount"] = len(pages)
+    if "cPages" in document:
+        c_pages = dict(document["cPages"])
+        c_pages["pages"] = [{"id": page_id, "idx": {"timestamp": "1:2", "value": value}}
+                            for page_id, value in zip(ids, index_values(len(ids)))]
+        c_pages["lastOpened"] = {"timestamp": "1:1", "value": ids[0] if ids else ""}
+        document["cPages"] = c_pages
+        document.pop("pages", None)
+    else:
+        document["pages"] = ids
+
+    now = str(int(time.time() * 1000))
+    metadata = {
+        "visibleName": title,
+        "type": "DocumentType",
+        "parent": "",
+        "lastModified": now,
+        "createdTime": now,
+        "lastOpenedPage": 0,
+        "version": 0,
+        "pinned": False,
+        "deleted": False,
+    }
+
+    with zipfile.ZipFile(out_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"{doc_id}.content", json.dumps(document, indent=4))
+        archive.writestr(f"{doc_id}.metadata", json.dumps(metadata, indent=4))
+        for page_id, (data, page_metadata) in zip(ids, pages):
+            archive.writestr(f"{doc_id}/{page_id}.rm", data)
+            if page_metadata:
+                archive.writestr(f"{doc_id}/{page_id}-metadata.json", page_metadata)
+
@@ -0,0 +1,157 @@
+"""Per-domain scraper routing table for Pi Share Receiver.
+
+Remembers which scraper produced the best result for each domain, and how
+long it took, so later shares from the same site can start with it.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from urllib.parse import urlparse
+from typing import Dict, Any, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION = 1
+
+class ScraperRoutingTable:
+    """Persistent, time-decayed record of scraper outcomes per domain."""
+
+    def __init__(self, path: str, half_life_days: float = 14.0, min_confidence: float = 0.5,
+                 score_tolerance: float = 0.1):
+        """Initialize and load the table from disk.
+
+        Args:
+            path: JSON file the table is persisted to
+            half_life_days: Days after which an observation counts half as much
+            min_confidence: Decayed sample weight a strategy needs before it is used for routing
+            score_tolerance: Quality difference within which the faster strategy is preferred
+        """
+        self.path = path
+        self.half_life = half_life_days * 86400
+        self.min_confidence = min_confidence
+        self.score_tolerance = score_tolerance
+        self._lock = threading.Lock()
+        self._domains: Dict[str, Dict[str, Dict[str, float]]] = self._load()
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        """Return the routing key for a URL (lowercase host without www.)."""
+        host = urlparse(url).netloc.lower().split('@')[-1].split(':')[0]
+        return host[4:] if host.startswith('www.') else host
+
+    def record(self, url: str, scraper_name: str, quality: float, duration: float) -> None:
+        """Record the outcome of one scraper run.
+
+        Args:
+            url: The scraped URL
+            scraper_name: Scraper that ran
+            quality: Result quality from 0 (failed) to 1
+            duration: Seconds the scraper took
+        """
+        domain = self.domain_of(url)
+        if not domain:
+            return
+
+        now = time.time()
+        with self._lock:
+            entry = self._domains.setdefault(domain, {}).get(scraper_name)
+            if entry is None:
+                entry = {"score": quality, "duration": duration, "weight": 1.0, "updated": now}
+            else:
+                decay = self._decay(now - entry["updated"])
+                old_weight = entry["weight"] * decay
+                weight = old_weight + 1.0
+                entry = {
+                    "score": (entry["score"] * old_weight + quality) / weight,
+                    "duration": (entry["duration"] * old_weight + duration) / weight,
+                    "weight": weight,
+                    "updated": now
+                }
+            self._domains[domain][scraper_name] = entry
+            self._save()
+
+        logger.info(f"Routing table: {domain} {scraper_name} quality={quality:.2f} duration={duration:.1f}s")
+
+    def best_strategy(self, url: str, candidates: Optional[List[str]] = None) -> Optional[str]:
+        """Return the historically best scraper for the URL's domain.
+
+        Strategies whose decayed weight has dropped below min_confidence are
+        ignored, so a domain falls back to the default order once its
+        observations are old enough for a site change to matter.
+
+        Args:
+            url: URL about to be scraped
+            candidates: Only consider these scrapers (optional)
+
+        Returns:
+            Scraper name, or None if there is no confident record
+        """
+        domain = self.domain_of(url)
+        now = time.time()
+        with self._lock:
+            strategies = dict(self._domains.get(domain, {}))
+
+        ranked = []
+        for scraper_name, entry in strategies.items():
+            if candidates is not None and scraper_name not in candidates:
+                continue
+            if entry["weight"] * self._decay(now - entry["updated"]) < self.min_confidence:
+                continue
+            if entry["score"] <= 0:
+                continue
+            ranked.append((entry["score"], -entry["duration"], scraper_name))
+
+        if not ranked:
+            return None
+
+        top_score = max(score for score, _, _ in ranked)
+        # Among strategies of near-equal quality, the fastest wins
+        close = [item for item in ranked if top_score - item[0] <= self.score_tolerance]
+        return max(close, key=lambda item: item[1])[2]
+
+    def order(self, url: str, default_order: List[str]) -> List[str]:
+        """Return default_order with the domain's best strategy moved to the front."""
+        best = self.best_strategy(url, default_order)
+        if best is None:
+            return list(default_order)
+        return [best] + [name for name in default_order if name != best]
+
+    def stats(self, url: str) -> Dict[str, Any]:
+        """Return the recorded strategies for the URL's domain."""
+        with self._lock:
+            return json.loads(json.dumps(self._domains.get(self.domain_of(url), {})))
+
+    def _decay(self, age: float) -> float:
+        """Weight multiplier for an observation age seconds old."""
+        if self.half_life <= 0:
+            return 1.0
+        return 0.5 ** (max(age, 0.0) / self.half_life)
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Load the table from disk, starting empty if it is missing or unreadable."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != TABLE_VERSION:
+                logger.warning(f"Ignoring routing table with unknown version: {self.path}")
+                return {}
+            return data.get("domains", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load routing table {self.path}: {e}")
+            return {}
+
+    def _save(self) -> None:
+        """Write the table atomically. Caller holds the lock."""
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": TABLE_VERSION, "domains": self._domains}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save routing table {self.path}: {e}")
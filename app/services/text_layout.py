@@ -0,0 +1,355 @@
+"""Font-metric text layout for Pi Share Receiver documents.
+
+Measures text with the advance widths of the document fonts instead of
+counting characters, so a line of narrow letters is not broken early and a
+line of capitals or wide glyphs does not run off the page.
+
+Widths come from the font's TrueType/OpenType file when one is found in the
+font directory (measured with Pillow), and otherwise from the built-in
+Helvetica, Helvetica-Bold and Courier AFM metrics. They are kept per em in a
+width table per font, which is cached on disk; the per-size tables are those
+widths scaled, since drawj2d output is vector and advances scale linearly.
+
+Line breaking measures a paragraph in one pass: the character widths are
+summed into a running total once, and each line end is then found by binary
+search over the word ends. With numpy installed the widths and totals are
+computed as arrays.
+"""
+
+import os
+import json
+import logging
+import unicodedata
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from PIL import ImageFont
+except ImportError:
+    ImageFont = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Code points held in a width table (Latin, Latin Extended, IPA and spacing
+# modifiers); others are measured on first use
+TABLE_SIZE = 0x300
+
+# Further ranges precomputed into cached tables: general punctuation (dashes,
+# quotes, ellipsis), currency symbols and arrows
+EXTRA_RANGES = ((0x2000, 0x2070), (0x20A0, 0x20C0), (0x2190, 0x2200))
+
+# Font size at which TrueType advances are measured; widths are stored per 1000 em
+MEASURE_SIZE = 1000
+
+# Bump when the table format or the built-in metrics change
+TABLE_VERSION = 1
+
+# Drawing units per point of font size. drawj2d's sizes are not in page units;
+# this default makes average body text wrap where the old fixed 85-character
+# limit did, so only lines of unusually wide or narrow text change
+FONT_SCALE = 2.5
+
+# Advance widths (per 1000 em) of printable ASCII, 0x20-0x7E, from the Adobe AFM files
+HELVETICA_ASCII = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+HELVETICA_BOLD_ASCII = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+COURIER_ASCII = (600,) * 95
+
+class FontMetrics:
+    """Advance widths of one font, per 1000 em."""
+
+    def __init__(self, name: str, widths: Dict[int, float], source: str, fallback_ascii: Tuple[int, ...]):
+        """Initialize the metrics.
+
+        Args:
+            name: Font name
+            widths: Width per code point for the precomputed ranges
+            source: Where the widths came from ("ttf:<path>" or "afm:<name>")
+            fallback_ascii: Built-in ASCII widths used for code points not in widths
+        """
+        self.name = name
+        self.widths = widths
+        self.source = source
+        self.fallback_ascii = fallback_ascii
+        self._font = None
+
+    def width(self, code_point: int) -> float:
+        """Return the advance of a code point, measuring it on first use."""
+        width = self.widths.get(code_point)
+        if width is None:
+            width = self._measure(code_point)
+            self.widths[code_point] = width
+        return width
+
+    def _measure(self, code_point: int) -> float:
+        if self.source.startswith("ttf:") and ImageFont is not None:
+            if self._font is None:
+                self._font = ImageFont.truetype(self.source[4:], MEASURE_SIZE)
+            return round(self._font.getlength(chr(code_point)) * 1000 / MEASURE_SIZE, 2)
+        return builtin_width(code_point, self.fallback_ascii)
+
+def builtin_width(code_point: int, ascii_widths: Tuple[int, ...]) -> float:
+    """Width of a code point from built-in ASCII metrics.
+
+    Accented letters take the width of their base letter, wide East Asian
+    characters a full em, combining marks and controls none, and anything
+    else the width of "n".
+    """
+    if 0x20 <= code_point <= 0x7E:
+        return ascii_widths[code_point - 0x20]
+    char = chr(code_point)
+    category = unicodedata.category(char)
+    if category in ('Mn', 'Me', 'Cf', 'Cc'):
+        return 0
+    if unicodedata.east_asian_width(char) in ('W', 'F'):
+        return 1000
+    base = unicodedata.normalize('NFKD', char)[:1]
+    if base and base != char and 0x20 <= ord(base) <= 0x7E:
+        return ascii_widths[ord(base) - 0x20]
+    if category == 'Zs':
+        return ascii_widths[0]
+    return ascii_widths[ord('n') - 0x20]
+
+def builtin_ascii(font: str) -> Tuple[str, Tuple[int, ...]]:
+    """Pick the built-in metrics closest to a font name."""
+    lowered = font.lower()
+    if any(hint in lowered for hint in ('mono', 'courier', 'code', 'consol')):
+        return "Courier", COURIER_ASCII
+    if any(hint in lowered for hint in ('bold', 'black', 'heavy')):
+        return "Helvetica-Bold", HELVETICA_BOLD_ASCII
+    return "Helvetica", HELVETICA_ASCII
+
+def _table_code_points() -> List[int]:
+    code_points = list(range(TABLE_SIZE))
+    for start, end in EXTRA_RANGES:
+        code_points.extend(range(start, end))
+    return code_points
+
+class WidthTable:
+    """Advance widths of one font at one size, in drawing units."""
+
+    def __init__(self, metrics: FontMetrics, size: float, scale: float):
+        self.metrics = metrics
+        self.factor = size * scale / 1000
+        self.widths = [metrics.width(cp) * self.factor for cp in range(TABLE_SIZE)]
+        self.array = np.array(self.widths, dtype=np.float64) if np is not None else None
+
+    def width(self, code_point: int) -> float:
+        """Return the advance of one code point."""
+        if code_point < TABLE_SIZE:
+            return self.widths[code_point]
+        return self.metrics.width(code_point) * self.factor
+
+    def measure(self, text: str) -> float:
+        """Return the advance width of a string."""
+        widths = self.widths
+        return sum(widths[cp] if cp < TABLE_SIZE else self.width(cp) for cp in map(ord, text))
+
+    def cumulative(self, text: str):
+        """Return the running total of advances: element i is the width of text[:i]."""
+        if self.array is not None and len(text) > 64:
+            code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+            outside = code_points >= TABLE_SIZE
+            widths = self.array[np.where(outside, 0, code_points)]
+            for i in np.flatnonzero(outside):
+                widths[i] = self.width(int(code_points[i]))
+            totals = np.empty(len(widths) + 1, dtype=np.float64)
+            totals[0] = 0.0
+            np.cumsum(widths, out=totals[1:])
+            return totals
+        widths = self.widths
+        return list(accumulate((widths[cp] if cp < TABLE_SIZE else self.width(cp) for cp in map(ord, text)),
+                               initial=0.0))
+
+class TextLayout:
+    """Measures and wraps text with cached per-font width tables."""
+
+    def __init__(self, cache_dir: Optional[str] = None, font_dir: Optional[str] = None,
+                 scale: float = FONT_SCALE):
+        """Initialize the layout engine.
+
+        Args:
+            cache_dir: Directory for cached width tables (None: no disk cache)
+            font_dir: Directory searched for <font>.ttf/.otf files
+            scale: Drawing units per point of font size
+        """
+        self.cache_dir = cache_dir
+        self.font_dir = font_dir
+        self.scale = scale
+        self._metrics: Dict[str, FontMetrics] = {}
+        self._tables: Dict[Tuple[str, float], WidthTable] = {}
+        self.counters = {"tables_loaded": 0, "tables_built": 0, "paragraphs": 0, "lines": 0}
+
+    def table(self, font: str, size: float) -> WidthTable:
+        """Return the width table of a font at a size."""
+        key = (font, size)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = WidthTable(self.metrics(font), size, self.scale)
+        return table
+
+    def measure(self, text: str, font: str, size: float) -> float:
+        """Return the width of text in drawing units."""
+        return self.table(font, size).measure(text)
+
+    def wrap(self, text: str, font: str, size: float, width: float) -> List[str]:
+        """Break text into lines no wider than width.
+
+        Whitespace is collapsed to single spaces. A word wider than a whole
+        line is split between characters.
+
+        Args:
+            text: Text to wrap
+            font: Font name
+            size: Font size
+            width: Line width in drawing units
+
+        Returns:
+            The lines, without leading or trailing spaces
+        """
+        words = text.split()
+        if not words:
+            return []
+        joined = ' '.join(words)
+        totals = self.table(font, size).cumulative(joined)
+
+        # Character offsets of word starts and ends in the joined text
+        starts, ends = [], []
+        offset = 0
+        for word in words:
+            starts.append(offset)
+            offset += len(word)
+            ends.append(offset)
+            offset += 1
+        end_totals = [float(totals[end]) for end in ends]
+
+        lines = []
+        first = 0
+        line_start = starts[0]
+        while first < len(words):
+            limit = float(totals[line_start]) + width + 1e-6
+            last = bisect_right(end_totals, limit, lo=first) - 1
+            if last >= first:
+                lines.append(joined[line_start:ends[last]])
+                first = last + 1
+                line_start = starts[first] if first < len(words) else len(joined)
+                continue
+
+            # The next word alone is wider than the line: break it between characters
+            cut = self._character_break(totals, line_start, ends[first], limit)
+            lines.append(joined[line_start:cut])
+            line_start = cut
+
+            if line_start == ends[first]:
+                first += 1
+                line_start = starts[first] if first < len(words) else len(joined)
+
+        self.counters["paragraphs"] += 1
+        self.counters["lines"] += len(lines)
+        return lines
+
+    def _character_break(self, totals, start: int, end: int, limit: float) -> int:
+        """Return the end of the longest run of characters from start that fits, at least one character."""
+        if np is not None and hasattr(totals, 'dtype'):
+            cut = int(np.searchsorted(totals[start:end + 1], limit, side='right')) - 1 + start
+        else:
+            cut = bisect_right(totals, limit, start, end + 1) - 1
+        return max(cut, start + 1)
+
+    def metrics(self, font: str) -> FontMetrics:
+        """Return a font's metrics, from memory, the disk cache or its source."""
+        metrics = self._metrics.get(font)
+        if metrics is not None:
+            return metrics
+
+        source, path = self._source(font)
+        cache_path = self._cache_path(font)
+        metrics = self._load_cached(font, source, path, cache_path)
+        if metrics is None:
+            metrics = self._build(font, source, path)
+            self._save_cached(metrics, path, cache_path)
+        self._metrics[font] = metrics
+        return metrics
+
+    def stats(self) -> Dict[str, int]:
+        """Return layout counters."""
+        return dict(self.counters, fonts=len(self._metrics), tables=len(self._tables))
+
+    def _source(self, font: str) -> Tuple[str, Optional[str]]:
+        """Find where a font's widths come from: its font file or built-in metrics."""
+        if self.font_dir and ImageFont is not None:
+            for extension in ('.ttf', '.otf', '.TTF', '.OTF'):
+                path = os.path.join(self.font_dir, font + extension)
+                if os.path.exists(path):
+                    return f"ttf:{path}", path
+        return f"afm:{builtin_ascii(font)[0]}", None
+
+    def _cache_path(self, font: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in font)
+        return os.path.join(self.cache_dir, f"{safe_name}.json")
+
+    def _load_cached(self, font: str, source: str, path: Optional[str],
+                     cache_path: Optional[str]) -> Optional[FontMetrics]:
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable width table {cache_path}: {e}")
+            return None
+        mtime = os.path.getmtime(path) if path else None
+        if cached.get("version") != TABLE_VERSION or cached.get("source") != source or cached.get("mtime") != mtime:
+            return None
+        self.counters["tables_loaded"] += 1
+        widths = {int(cp): width for cp, width in cached["widths"].items()}
+        return FontMetrics(font, widths, source, builtin_ascii(font)[1])
+
+    def _build(self, font: str, source: str, path: Optional[str]) -> FontMetrics:
+        """Measure the precomputed ranges of a font."""
+        self.counters["tables_built"] += 1
+        metrics = FontMetrics(font, {}, source, builtin_ascii(font)[1])
+        for code_point in _table_code_points():
+            metrics.width(code_point)
+        logger.info(f"Built width table for {font} from {source}")
+        return metrics
+
+    def _save_cached(self, metrics: FontMetrics, path: Optional[str], cache_path: Optional[str]) -> None:
+        if not cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": TABLE_VERSION,
+                    "font": metrics.name,
+                    "source": metrics.source,
+                    "mtime": os.path.getmtime(path) if path else None,
+                    "widths": {str(cp): width for cp, width in metrics.widths.items()},
+                }, f)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache width table for {metrics.name}: {e}")
@@ -2,12 +2,20 @@
 
 import os
 import json
+import queue
+import shutil
 import subprocess
+import threading
+import time
 import logging
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from .js_classifier import JSNecessityClassifier, SCRAPER_NOISE_PREFIXES
+from .scraper_routing import ScraperRoutingTable
+from .http_client import HttpClient, get_default_client
+from .page_metadata import fetch_page_metadata
+from .worker_pool import ScraperWorkerPool, WorkerError
+from .document_model import normalize, to_dicts
 
 # Import utility functions for error handling
 try:
@@ -26,14 +34,61 @@ logger = logging.getLogger(__name__)
 class WebScraperService:
     """Scrapes web content using multiple fallback methods."""
     
-    def __init__(self, temp_dir: str):
+    # Scrapers in fallback order, with the message logged when each is used
+    SCRAPERS = [
+        ("playwright", "Using Playwright for JavaScript-enabled scraping"),
+        ("simple", "Using simple requests + BeautifulSoup scraping"),
+        ("browser", "Using Selenium browser-based scraping"),
+        ("requests_html", "Using requests-html scraping")
+    ]
+    
+    # Scrapers that fetch without running JavaScript
+    STATIC_SCRAPERS = ("simple",)
+    
+    # Scrapers raced in hedged mode: (scraper_name, start delay multiplier)
+    HEDGED_SCRAPERS = [("simple", 0), ("playwright", 1)]
+    
+    def __init__(self, temp_dir: str, static_first: bool = True, scrape_mode: str = "sequential",
+                 hedge_delay: float = 2.0, quality_threshold: float = 0.5,
+                 scraper_timeout: int = 120, routing_table_path: Optional[str] = None,
+                 routing_half_life_days: float = 14.0, http_client: Optional[HttpClient] = None,
+                 worker_pool: Optional[ScraperWorkerPool] = None, merge_paragraph_chars: int = 80,
+                 routing: Optional[ScraperRoutingTable] = None):
         """Initialize with temp directory for content files.
         
         Args:
             temp_dir: Directory to save temporary content
+            static_first: Try the static scraper before any headless browser
+            scrape_mode: "sequential" for the fallback chain, "hedged" to race scrapers
+            hedge_delay: Seconds before the browser scraper joins the race (0 = parallel)
+            quality_threshold: Quality score (0-1) a hedged result needs to win the race
+            scraper_timeout: Seconds a hedged scraper process may run before it is killed
+            routing_table_path: JSON file for the per-domain routing table
+                (default: scraper_routes.json in temp_dir)
+            routing_half_life_days: Days after which a routing observation counts half
+            http_client: Shared HTTP client (default: the process-wide client)
+            worker_pool: Pre-forked scraper workers to run scrapers on
+                (default: a new python3 process per scraper attempt)
+            merge_paragraph_chars: Adjacent paragraphs shorter than this are merged
+                when content is validated (0 = never merge)
+            routing: Shared routing table (default: a table loaded from
+                routing_table_path for this instance)
         """
         self.temp_dir = temp_dir
+        self.static_first = static_first
+        self.scrape_mode = scrape_mode
+        self.hedge_delay = hedge_delay
+        self.quality_threshold = quality_threshold
+        self.scraper_timeout = scraper_timeout
+        self.http_client = http_client or get_default_client()
+        self.worker_pool = worker_pool
+        self.merge_paragraph_chars = merge_paragraph_chars
+        self.js_classifier = JSNecessityClassifier()
         os.makedirs(temp_dir, exist_ok=True)
+        self.routing = routing or ScraperRoutingTable(
+            routing_table_path or os.path.join(temp_dir, "scraper_routes.json"),
+            half_life_days=routing_half_life_days
+        )
         
         # Script paths - relative to current file location
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -48,6 +103,11 @@ class WebScraperService:
     def scrape(self, url: str) -> Dict[str, Any]:
         """Scrape content from URL using multiple methods.
         
+        The static scraper runs first. Its result is only discarded in favour
+        of the browser-based scrapers when the JS-necessity classifier says
+        the page needs JavaScript to render its content. Domains with a
+        confident routing table entry start with their best scraper instead.
+        
         Args:
             url: The URL to scrape
             
@@ -62,79 +122,53 @@ class WebScraperService:
         # Try manual title extraction first for reliability
         extracted_title = self._extract_title_directly(url)
         
+        # Static result kept in case every browser-based scraper fails too
+        static_content = None
+        raced = set()
+        
+        preferred = self.routing.best_strategy(url, [name for name, _ in self.SCRAPERS])
+        if preferred:
+            logger.info(f"Routing table prefers {preferred} for {self.routing.domain_of(url)}")
+        
+        if self.scrape_mode == "hedged" and not preferred:
+            content = self._scrape_hedged(url, content_path)
+            if content is not None:
+                return self._finalize_content(content, url, extracted_title, content_path)
+            logger.info("Hedged scrapers produced no content, continuing with remaining scrapers")
+            raced = {scraper_name for scraper_name, _ in self.HEDGED_SCRAPERS}
+        
         # Try different scrapers in order until one succeeds
-        scrapers = [
-            ("playwright", "Using Playwright for JavaScript-enabled scraping"),
-            ("simple", "Using simple requests + BeautifulSoup scraping"),
-            ("browser", "Using Selenium browser-based scraping"),
-            ("requests_html", "Using requests-html scraping")
-        ]
-        
-        for scraper_name, message in scrapers:
-            script_path = self.scraper_scripts.get(scraper_name)
-            if not script_path or not os.path.exists(script_path):
-                logger.warning(f"Scraper script not found: {scraper_name}")
+        for scraper_name, message in self._scraper_order(url):
+            if scraper_name in raced:
+                continue
+            # Each scraper writes its own file, so one that exits without output
+            # cannot pick up an earlier scraper's result
+            output_path = f"{content_path}.{scraper_name}"
+            started = time.time()
+            content = self._run_scraper(scraper_name, message, url, output_path)
+            duration = time.time() - started
+            if content is None:
+                self.routing.record(url, scraper_name, 0.0, duration)
                 continue
-                
-            logger.info(message)
             
-            try:
-                # Define the scraping function that will be retried if it fails
-                def run_scraper(scraper_name, script_path, url, output_path):
-                    result = subprocess.run(
-                        ["python3", script_path, url, output_path],
-                        capture_output=True,
-                        text=True,
-                        check=False
-                    )
-                    
-                    if result.returncode != 0:
-                        error_msg = result.stderr if result.stderr else f"Exit code: {result.returncode}"
-                        raise RuntimeError(f"Scraper failed: {error_msg}")
-                    
-                    return result
-                
-                # Use retry operation for running the scraper
-                try:
-                    result = retry_operation(
-                        run_scraper,
-                        scraper_name,
-                        script_path,
-                        url,
-                        content_path,
-                        operation_name=f"Scraper ({scraper_name})",
-                        max_retries=1  # Only retry once per scraper since we have multiple scrapers
-                    )
-                except Exception as retry_error:
-                    logger.warning(format_error("scraper", f"{scraper_name} failed after retry", retry_error))
-                    continue  # Try the next scraper
-                
-                # Check if content was generated successfully
-                if os.path.exists(content_path):
-                    try:
-                        with open(content_path, 'r', encoding='utf-8') as f:
-                            content = json.load(f)
-                        
-                        # Update the title if our extracted title is better
-                        if extracted_title and (not content.get('title') or content.get('title') == "Untitled" or len(extracted_title) > len(content.get('title', ''))):
-                            logger.info(f"Using directly extracted title: {extracted_title}")
-                            content['title'] = extracted_title
-                        
-                        # Validate the content structure
-                        content = self._validate_and_fix_content(content, url)
-                        
-                        # Save the updated content back to the file
-                        with open(content_path, 'w', encoding='utf-8') as f:
-                            json.dump(content, f, indent=2)
-                        
-                        logger.info(f"Successfully scraped with {scraper_name}")
-                        return content
-                    except json.JSONDecodeError as json_error:
-                        logger.warning(format_error("parser", f"Invalid JSON from {scraper_name}", json_error))
-                else:
-                    logger.warning(format_error("scraper", f"{scraper_name} did not generate output file", content_path))
-            except Exception as e:
-                logger.warning(format_error("scraper", f"Error using {scraper_name}", e))
+            if scraper_name in self.STATIC_SCRAPERS and (self.static_first or preferred == scraper_name):
+                verdict = self._classify_static_result(output_path, content)
+                if verdict["needs_js"]:
+                    logger.info(f"Static result insufficient, escalating to browser: {'; '.join(verdict['reasons'])}")
+                    self.routing.record(url, scraper_name, 0.0, duration)
+                    static_content = content
+                    continue
+                logger.info("Static result sufficient, skipping headless browser")
+            
+            self.routing.record(url, scraper_name, self._score_content(content), duration)
+            logger.info(f"Successfully scraped with {scraper_name}")
+            if os.path.exists(f"{output_path}.html"):
+                shutil.move(f"{output_path}.html", f"{content_path}.html")
+            return self._finalize_content(content, url, extracted_title, content_path)
+        
+        if static_content is not None:
+            logger.warning("Browser-based scrapers failed, using static result")
+            return self._finalize_content(static_content, url, extracted_title, content_path)
         
         # If all scrapers fail, return a basic error content with the best title we have
         logger.error(format_error("scraping", "All scrapers failed to extract content", url))
@@ -157,8 +191,327 @@ class WebScraperService:
             "images": []
         }
     
+    def _scraper_order(self, url: str) -> List[Tuple[str, str]]:
+        """Return the (scraper_name, message) pairs in the order to try them.
+        
+        Args:
+            url: The URL to scrape; its domain's best scraper (see the routing
+                table) is tried first
+        """
+        order = list(self.SCRAPERS)
+        if self.static_first:
+            static = [entry for entry in order if entry[0] in self.STATIC_SCRAPERS]
+            others = [entry for entry in order if entry[0] not in self.STATIC_SCRAPERS]
+            order = static + others
+        
+        messages = dict(order)
+        return [(name, messages[name]) for name in self.routing.order(url, [name for name, _ in order])]
+    
+    def _run_scraper(self, scraper_name: str, message: str, url: str, content_path: str) -> Optional[Dict[str, Any]]:
+        """Run one scraper script and load the content it produced.
+        
+        Args:
+            scraper_name: Key into self.scraper_scripts
+            message: Log message describing the scraper
+            url: The URL to scrape
+            content_path: Path the scraper writes its JSON to
+            
+        Returns:
+            The scraped content, or None if the scraper failed
+        """
+        script_path = self.scraper_scripts.get(scraper_name)
+        if not script_path or not os.path.exists(script_path):
+            logger.warning(f"Scraper script not found: {scraper_name}")
+            return None
+            
+        logger.info(message)
+        
+        try:
+            # Define the scraping function that will be retried if it fails
+            def run_scraper(scraper_name, script_path, url, output_path):
+                # Output left by a failed attempt must not count as this attempt's result
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                if self.worker_pool is not None:
+                    return self._run_in_worker(scraper_name, url, output_path)
+                
+                result = subprocess.run(
+                    ["python3", script_path, url, output_path],
+                    capture_output=True,
+                    text=True,
+                    check=False
+                )
+                
+                if result.returncode != 0:
+                    error_msg = result.stderr if result.stderr else f"Exit code: {result.returncode}"
+                    raise RuntimeError(f"Scraper failed: {error_msg}")
+                
+                return self._load_content(scraper_name, output_path)
+            
+            # Use retry operation for running the scraper
+            try:
+                return retry_operation(
+                    run_scraper,
+                    scraper_name,
+                    script_path,
+                    url,
+                    content_path,
+                    operation_name=f"Scraper ({scraper_name})",
+                    max_retries=1  # Only retry once per scraper since we have multiple scrapers
+                )
+            except Exception as retry_error:
+                logger.warning(format_error("scraper", f"{scraper_name} failed after retry", retry_error))
+                return None  # Try the next scraper
+        except Exception as e:
+            logger.warning(format_error("scraper", f"Error using {scraper_name}", e))
+        
+        return None
+    
+    def _run_in_worker(self, scraper_name: str, url: str, output_path: str,
+                       cancelled: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Run a scraper on the worker pool and return the content it produced.
+        
+        Args:
+            scraper_name: Scraper to run
+            url: The URL to scrape
+            output_path: Path the scraper writes its JSON (and HTML) to
+            cancelled: Event that abandons the job when set
+            
+        Returns:
+            The scraped content
+            
+        Raises:
+            WorkerError: If the worker died, timed out or was cancelled
+            RuntimeError: If the scraper reported a failure
+        """
+        reply = self.worker_pool.run(scraper_name, url, output_path,
+                                     timeout=self.scraper_timeout, cancelled=cancelled)
+        if reply.get("exit_code") != 0 or "content" not in reply:
+            error_msg = reply.get("error") or f"Exit code: {reply.get('exit_code')}"
+            raise RuntimeError(f"Scraper failed: {error_msg}")
+        logger.info(f"{scraper_name} finished in {reply.get('seconds', 0):.1f}s on a pooled worker")
+        return reply["content"]
+    
+    def _load_content(self, scraper_name: str, content_path: str) -> Optional[Dict[str, Any]]:
+        """Load the JSON content a scraper wrote, or None if it is missing or invalid."""
+        # Check if content was generated successfully
+        if not os.path.exists(content_path):
+            logger.warning(format_error("scraper", f"{scraper_name} did not generate output file", content_path))
+            return None
+        
+        try:
+            with open(content_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError as json_error:
+            logger.warning(format_error("parser", f"Invalid JSON from {scraper_name}", json_error))
+        return None
+    
+    def _scrape_hedged(self, url: str, content_path: str) -> Optional[Dict[str, Any]]:
+        """Race the static and browser scrapers and keep the first good result.
+        
+        The static scraper starts immediately and the browser scraper after
+        hedge_delay seconds. As soon as one result clears quality_threshold the
+        remaining scraper processes are terminated. If none clears it, the
+        best-scoring result is returned.
+        
+        Args:
+            url: The URL to scrape
+            content_path: Path the winning content is saved to
+            
+        Returns:
+            The winning content, or None if no racer produced any
+        """
+        results = queue.Queue()
+        cancelled = threading.Event()
+        processes = {}
+        lock = threading.Lock()
+        
+        def race(scraper_name, delay):
+            # Results are (scraper_name, content, output_path, duration); the
+            # duration is None when the scraper never ran or was cancelled
+            output_path = f"{content_path}.{scraper_name}"
+            script_path = self.scraper_scripts.get(scraper_name)
+            started = None
+            try:
+                # A cancelled wait means another scraper already won
+                if delay and cancelled.wait(delay):
+                    results.put((scraper_name, None, output_path, None))
+                    return
+                if not script_path or not os.path.exists(script_path):
+                    logger.warning(f"Scraper script not found: {scraper_name}")
+                    results.put((scraper_name, None, output_path, None))
+                    return
+                
+                if self.worker_pool is not None:
+                    logger.info(f"Hedged scrape: starting {scraper_name}")
+                    started = time.time()
+                    try:
+                        content = self._run_in_worker(scraper_name, url, output_path, cancelled)
+                    except (WorkerError, RuntimeError) as e:
+                        if cancelled.is_set():
+                            results.put((scraper_name, None, output_path, None))
+                            return
+                        logger.warning(format_error("scraper", f"{scraper_name} failed", e))
+                        content = None
+                    results.put((scraper_name, content, output_path, time.time() - started))
+                    return
+                
+                with lock:
+                    if cancelled.is_set():
+                        results.put((scraper_name, None, output_path, None))
+                        return
+                    logger.info(f"Hedged scrape: starting {scraper_name}")
+                    started = time.time()
+                    process = subprocess.Popen(
+                        ["python3", script_path, url, output_path],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.PIPE,
+                        text=True
+                    )
+                    processes[scraper_name] = process
+                
+                try:
+                    _, stderr = process.communicate(timeout=self.scraper_timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                    logger.warning(format_error("scraper", f"{scraper_name} timed out", f"{self.scraper_timeout}s"))
+                    results.put((scraper_name, None, output_path, time.time() - started))
+                    return
+                
+                if process.returncode != 0:
+                    if cancelled.is_set():
+                        results.put((scraper_name, None, output_path, None))
+                        return
+                    error_msg = stderr if stderr else f"Exit code: {process.returncode}"
+                    logger.warning(format_error("scraper", f"{scraper_name} failed", error_msg))
+                    results.put((scraper_name, None, output_path, time.time() - started))
+                    return
+                
+                content = self._load_content(scraper_name, output_path)
+                results.put((scraper_name, content, output_path, time.time() - started))
+            except Exception as e:
+                logger.warning(format_error("scraper", f"Error using {scraper_name}", e))
+                results.put((scraper_name, None, output_path, None if started is None else time.time() - started))
+        
+        for scraper_name, delay_factor in self.HEDGED_SCRAPERS:
+            threading.Thread(
+                target=race,
+                args=(scraper_name, self.hedge_delay * delay_factor),
+                daemon=True
+            ).start()
+        
+        best = None  # (score, scraper_name, content, output_path)
+        try:
+            for _ in self.HEDGED_SCRAPERS:
+                scraper_name, content, output_path, duration = results.get()
+                if content is None:
+                    if duration is not None:
+                        self.routing.record(url, scraper_name, 0.0, duration)
+                    continue
+                
+                score = self._score_content(content)
+                needs_js = False
+                if scraper_name in self.STATIC_SCRAPERS:
+                    needs_js = self._classify_static_result(output_path, content)["needs_js"]
+                self.routing.record(url, scraper_name, 0.0 if needs_js else score, duration)
+                logger.info(f"Hedged scrape: {scraper_name} scored {score:.2f}" + (" (needs JavaScript)" if needs_js else ""))
+                
+                if score >= self.quality_threshold and not needs_js:
+                    best = (score, scraper_name, content, output_path)
+                    break
+                if best is None or score > best[0]:
+                    best = (score, scraper_name, content, output_path)
+        finally:
+            cancelled.set()
+            with lock:
+                for scraper_name, process in processes.items():
+                    if process.poll() is None:
+                        logger.info(f"Hedged scrape: cancelling {scraper_name}")
+                        process.terminate()
+        
+        if best is None:
+            return None
+        
+        score, scraper_name, content, output_path = best
+        logger.info(f"Hedged scrape won by {scraper_name} (score {score:.2f})")
+        if os.path.exists(f"{output_path}.html"):
+            shutil.move(f"{output_path}.html", f"{content_path}.html")
+        return content
+    
+    def _score_content(self, content: Dict[str, Any]) -> float:
+        """Score scraped content quality from 0 to 1 by content blocks and text length."""
+        blocks = 0
+        text_length = 0
+        for item in content.get('structured_content', []):
+            text = item.get('content', '')
+            if isinstance(text, str) and text.strip() and not text.startswith(SCRAPER_NOISE_PREFIXES):
+                blocks += 1
+                text_length += len(text)
+            for list_item in item.get('items', []):
+                blocks += 1
+                text_length += len(list_item)
+        
+        return min(text_length / 2000, 1.0) * 0.7 + min(blocks / 10, 1.0) * 0.3
+    
+    def _classify_static_result(self, content_path: str, content: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the JS-necessity classifier on the HTML saved by a static scraper.
+        
+        Args:
+            content_path: Path of the scraper's JSON output; the HTML sits next to it
+            content: The structured content the static scraper produced
+            
+        Returns:
+            The classifier verdict
+        """
+        html = ""
+        try:
+            with open(f"{content_path}.html", 'r', encoding='utf-8') as f:
+                html = f.read()
+        except OSError as e:
+            logger.warning(format_error("scraper", "Static HTML not available for classification", e))
+        
+        try:
+            return self.js_classifier.classify(html, content)
+        except Exception as e:
+            logger.warning(format_error("classifier", "JS-necessity classification failed", e))
+            return {"needs_js": True, "reasons": [f"classifier error: {e}"], "signals": {}}
+    
+    def _finalize_content(self, content: Dict[str, Any], url: str, extracted_title: str, content_path: str) -> Dict[str, Any]:
+        """Apply the directly extracted title, validate and persist scraped content.
+        
+        Args:
+            content: Content loaded from a scraper
+            url: The source URL
+            extracted_title: Title from _extract_title_directly
+            content_path: Path to save the updated content to
+            
+        Returns:
+            The validated content
+        """
+        # Update the title if our extracted title is better
+        if extracted_title and (not content.get('title') or content.get('title') == "Untitled" or len(extracted_title) > len(content.get('title', ''))):
+            logger.info(f"Using directly extracted title: {extracted_title}")
+            content['title'] = extracted_title
+        
+        ingest = content.get('ingest') or {}
+        if ingest.get('truncated'):
+            logger.warning(f"Content of {url} truncated after {ingest.get('bytes_read')} bytes ({ingest.get('truncated_reason')} limit)")
+        
+        # Validate the content structure
+        content = self._validate_and_fix_content(content, url)
+        
+        # Save the updated content back to the file
+        try:
+            with open(content_path, 'w', encoding='utf-8') as f:
+                json.dump(content, f, indent=2)
+        except OSError as e:
+            logger.warning(format_error("file", "Could not save validated content", e))
+        
+        return content
+    
     def _extract_title_directly(self, url: str) -> str:
-        """Extract title directly from URL using requests and BeautifulSoup.
+        """Extract title directly from URL by reading only the page head.
         
         Args:
             url: The URL to extract title from
@@ -167,49 +520,27 @@ class WebScraperService:
             Extracted title or empty string if failed
         """
         try:
-            # Define the fetch operation as a separate function for retry
-            def fetch_url(url_to_fetch):
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                return requests.get(url_to_fetch, headers=headers, timeout=10)
-            
-            # Use retry operation for fetching the URL
+            # Use retry operation for fetching the metadata
             try:
-                response = retry_operation(
-                    fetch_url, 
-                    url, 
+                metadata = retry_operation(
+                    fetch_page_metadata,
+                    self.http_client,
+                    url,
+                    timeout=10,
                     operation_name="URL title extraction"
                 )
-                soup = BeautifulSoup(response.text, 'html.parser')
             except Exception as e:
                 logger.warning(format_error("network", "Failed to fetch page for title extraction", e))
                 return ""
+            logger.info(f"Read {metadata['bytes_read']} bytes of {url} for its title")
             
-            # Try to get title from various elements
+            # Standard title tag, then OpenGraph and Twitter titles, then the first h1
             title = None
-            
-            # Try standard title tag
-            if soup.title and soup.title.string:
-                title = soup.title.string.strip()
-                
-            # Try OpenGraph title which is often better
-            if not title or len(title) < 3:
-                og_title = soup.find('meta', property='og:title')
-                if og_title and og_title.get('content'):
-                    title = og_title['content'].strip()
-            
-            # Try Twitter title
-            if not title or len(title) < 3:
-                twitter_title = soup.find('meta', property='twitter:title')
-                if twitter_title and twitter_title.get('content'):
-                    title = twitter_title['content'].strip()
-            
-            # Try h1 if no title found
-            if not title or len(title) < 3:
-                h1 = soup.find('h1')
-                if h1:
-                    title = h1.get_text(strip=True)
+            for key in ('title', 'og_title', 'twitter_title', 'h1'):
+                candidate = (metadata.get(key) or '').strip()
+                if len(candidate) >= 3:
+                    title = candidate
+                    break
             
             # If the title is too long, truncate it
             if title and len(title) > 100:
@@ -283,24 +614,18 @@ class WebScraperService:
         if not content.get('title') or len(content.get('title', '').strip()) < 2:
             content['title'] = self._generate_title_from_url(url)
         
+        # Canonical blocks in one pass (list items split out, text trimmed, short
+        # paragraphs merged), written back in the JSON form
+        blocks = list(normalize(content.get('structured_content') or [], self.merge_paragraph_chars))
+        
         # Ensure content is not empty
-        if not content.get('structured_content') or len(content.get('structured_content', [])) == 0:
+        if not blocks:
             content['structured_content'] = [{
                 "type": "paragraph",
                 "content": f"This is a page from {url}. Content could not be properly extracted."
             }]
-        
-        # Convert legacy formats
-        structured_content = content.get('structured_content', [])
-        for i, item in enumerate(structured_content):
-            # Handle list items format conversion
-            if item.get('type') == 'list' and 'items' in item:
-                list_items = item.pop('items', [])
-                for j, list_item in enumerate(list_items):
-                    structured_content.insert(i + j + 1, {
-                        "type": "bullet",
-                        "content": list_item
-                    })
+        else:
+            content['structured_content'] = to_dicts(blocks)
         
         # Ensure images list exists
         if 'images' not in content:
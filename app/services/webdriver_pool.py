@@ -0,0 +1,190 @@
+"""Pool of warm Selenium WebDriver sessions.
+
+Starting headless Firefox through geckodriver takes seconds, much longer
+than the page load it is needed for. The pool keeps sessions open between
+scrapes. A session is reset before reuse (cookies and web storage cleared,
+navigated to about:blank), health-checked when it is taken from the pool
+and replaced after a number of uses or an age limit, so one page cannot
+leak state or memory into the next.
+
+The process-wide pool lives as long as the process: in a pre-forked
+scraper worker that is many scrapes, in a one-off scraper process it is one.
+"""
+
+import time
+import atexit
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Import configuration with proper relative import
+try:
+    from ..config import CONFIG
+except ImportError:
+    try:
+        # Scraper scripts run with the app directory on sys.path
+        from config import CONFIG
+    except ImportError:
+        # Fallback to defaults if config cannot be imported
+        CONFIG = {}
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Clears what delete_all_cookies does not
+CLEAR_STORAGE_SCRIPT = "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+
+class _Session:
+    """A driver with its usage bookkeeping."""
+
+    __slots__ = ("driver", "created", "uses")
+
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.created = time.monotonic()
+        self.uses = 0
+
+class WebDriverPool:
+    """Reusable WebDriver sessions with reset, health checks and a lifetime cap."""
+
+    def __init__(self, factory: Callable[[], Any], max_idle: int = 1, max_uses: int = 20,
+                 max_age: float = 1800):
+        """Configure the pool; sessions are created on first use.
+
+        Args:
+            factory: Creates a new, configured driver
+            max_idle: Sessions kept open while not in use
+            max_uses: Scrapes after which a session is replaced
+            max_age: Seconds after which a session is replaced
+        """
+        self.factory = factory
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._idle: List[_Session] = []
+        self._lock = threading.Lock()
+        self.counters = {"created": 0, "reused": 0, "retired": 0, "unhealthy": 0}
+
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        """Borrow a driver for one scrape.
+
+        The driver is reset and returned to the pool afterwards, also when the
+        scrape raised; a driver that cannot be reset is quit instead.
+        """
+        session = self._acquire()
+        try:
+            yield session.driver
+        finally:
+            session.uses += 1
+            self._release(session)
+
+    def close(self) -> None:
+        """Quit all idle sessions."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._quit(session)
+
+    def stats(self) -> Dict[str, int]:
+        """Return session counters."""
+        with self._lock:
+            return dict(self.counters, idle=len(self._idle))
+
+    def _acquire(self) -> _Session:
+        """Take a healthy idle session or create a new one."""
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                break
+            if self._expired(session):
+                self._count("retired")
+            elif self._healthy(session):
+                self._count("reused")
+                return session
+            else:
+                self._count("unhealthy")
+            self._quit(session)
+
+        session = _Session(self.factory())
+        self._count("created")
+        return session
+
+    def _release(self, session: _Session) -> None:
+        """Reset a session and keep it, or quit it if it is used up or broken."""
+        if not self._expired(session) and self._reset(session):
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(session)
+                    return
+        self._count("retired")
+        self._quit(session)
+
+    def _expired(self, session: _Session) -> bool:
+        """Check whether a session reached its use or age limit."""
+        return session.uses >= self.max_uses or time.monotonic() - session.created >= self.max_age
+
+    def _healthy(self, session: _Session) -> bool:
+        """Check that the browser still answers commands."""
+        try:
+            return session.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logger.warning(f"Discarding unresponsive WebDriver session: {e}")
+            return False
+
+    def _reset(self, session: _Session) -> bool:
+        """Clear the state the last page left behind."""
+        driver = session.driver
+        try:
+            # Cookies and storage are only reachable from the page's own origin,
+            # so they are cleared before leaving it
+            driver.execute_script(CLEAR_STORAGE_SCRIPT)
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            for handle in driver.window_handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+            return True
+        except Exception as e:
+            logger.warning(f"Could not reset WebDriver session: {e}")
+            return False
+
+    def _quit(self, session: _Session) -> None:
+        try:
+            session.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting WebDriver session: {e}")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+def create_firefox_driver(page_load_timeout: float = 30) -> Any:
+    """Start headless Firefox through geckodriver."""
+    from selenium import webdriver
+    from selenium.webdriver.firefox.options import Options
+
+    options = Options()
+    options.add_argument("--headless")
+    driver = webdriver.Firefox(options=options)
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+_default_pool: Optional[WebDriverPool] = None
+_default_pool_lock = threading.Lock()
+
+def get_default_driver_pool() -> WebDriverPool:
+    """Return the process-wide Firefox session pool, creating it from config on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WebDriverPool(
+                create_firefox_driver,
+                max_uses=CONFIG.get('BROWSER_SESSION_MAX_USES', 20),
+                max_age=CONFIG.get('BROWSER_SESSION_MAX_AGE', 1800)
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
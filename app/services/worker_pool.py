@@ -0,0 +1,278 @@
+"""Pool of pre-forked scraper worker processes.
+
+Each worker runs app/scraper_worker.py, which imports the scraper modules
+(BeautifulSoup, requests, Playwright, Selenium) once and then takes jobs over
+its stdin and answers on its stdout as newline-delimited JSON. A scrape
+therefore costs a pipe round trip instead of a cold interpreter start and a
+full round of imports, while still running outside the server process.
+
+The pool supervises its workers: a worker that crashes, times out or is
+cancelled is killed and replaced, and a worker is recycled after max_jobs
+jobs so leaks in scraper libraries cannot accumulate.
+"""
+
+import os
+import sys
+import json
+import signal
+import time
+import queue
+import threading
+import subprocess
+import logging
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for cancellation while waiting for a reply
+POLL_INTERVAL = 0.2
+
+class WorkerError(Exception):
+    """Raised when a worker dies, times out or is cancelled during a job."""
+
+class ScraperWorker:
+    """One scraper worker process and the threads reading its pipes."""
+
+    def __init__(self, command: List[str], cwd: str):
+        """Start the worker process.
+
+        Args:
+            command: Command line starting scraper_worker.py
+            cwd: Working directory of the worker
+        """
+        self.process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            # Own process group, so a kill also ends the browsers the worker started
+            start_new_session=True
+        )
+        self.pid = self.process.pid
+        self.jobs_done = 0
+        self._replies = queue.Queue()
+        self._next_id = 0
+        threading.Thread(target=self._read_replies, daemon=True, name=f"worker-{self.pid}-out").start()
+        threading.Thread(target=self._read_log, daemon=True, name=f"worker-{self.pid}-err").start()
+
+    def alive(self) -> bool:
+        """Check whether the worker process is still running."""
+        return self.process.poll() is None
+
+    def request(self, job: Dict[str, Any], timeout: float,
+                cancelled: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Send a job and wait for its reply.
+
+        Args:
+            job: Job fields; an id is added
+            timeout: Seconds to wait for the reply
+            cancelled: Event that abandons the job when set
+
+        Returns:
+            The reply dict
+
+        Raises:
+            WorkerError: If the worker died, timed out or the job was cancelled
+        """
+        self._next_id += 1
+        job_id = self._next_id
+        try:
+            self.process.stdin.write(json.dumps(dict(job, id=job_id)) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise WorkerError(f"worker {self.pid} is not accepting jobs: {e}")
+
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                raise WorkerError("cancelled")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise WorkerError(f"no reply from worker {self.pid} within {timeout}s")
+            try:
+                reply = self._replies.get(timeout=min(POLL_INTERVAL, remaining))
+            except queue.Empty:
+                continue
+            if reply is None:
+                raise WorkerError(f"worker {self.pid} exited with code {self.process.wait()}")
+            if reply.get("ready"):
+                if reply.get("errors"):
+                    logger.debug(f"Worker {self.pid} could not load: {reply['errors']}")
+                continue
+            if reply.get("id") == job_id:
+                self.jobs_done += 1
+                return reply
+
+    def stop(self, timeout: float = 5) -> None:
+        """Ask the worker to exit by closing its stdin, killing it if it does not."""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+    def kill(self) -> None:
+        """Kill the worker and everything it started immediately."""
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except OSError:
+            if self.alive():
+                self.process.kill()
+        self.process.wait()
+
+    def _read_replies(self) -> None:
+        for line in self.process.stdout:
+            try:
+                self._replies.put(json.loads(line))
+            except ValueError:
+                logger.warning(f"Worker {self.pid} wrote a malformed reply: {line[:200]!r}")
+        self._replies.put(None)
+
+    def _read_log(self) -> None:
+        # Scraper output is only interesting when debugging a scraper
+        for line in self.process.stderr:
+            logger.debug(f"[worker {self.pid}] {line.rstrip()}")
+
+class ScraperWorkerPool:
+    """Supervised pool of long-lived scraper workers."""
+
+    def __init__(self, size: int = 2, max_jobs: int = 50, job_timeout: float = 120,
+                 scrapers: Optional[List[str]] = None, python: Optional[str] = None,
+                 worker_script: Optional[str] = None):
+        """Configure the pool; workers are started by start() or on first use.
+
+        Args:
+            size: Number of worker processes (and of jobs run at the same time)
+            max_jobs: Jobs after which a worker is replaced by a fresh one
+            job_timeout: Default seconds a job may take before its worker is killed
+            scrapers: Scrapers the workers preload (default: all)
+            python: Interpreter for the workers (default: the current one)
+            worker_script: Path of scraper_worker.py
+        """
+        app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.job_timeout = job_timeout
+        self.worker_script = worker_script or os.path.join(app_dir, "scraper_worker.py")
+        self.cwd = os.path.dirname(self.worker_script)
+        self.command = [python or sys.executable, self.worker_script] + list(scrapers or [])
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._closed = False
+        self.counters = {"jobs": 0, "failures": 0, "restarts": 0, "recycled": 0}
+
+    def start(self) -> None:
+        """Start the workers ahead of the first job."""
+        with self._lock:
+            missing = self.size - len(self._workers)
+        for _ in range(missing):
+            self._idle.put(self._spawn())
+
+    def run(self, scraper: str, url: str, output_path: str, timeout: Optional[float] = None,
+            cancelled: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Run a scrape job on a worker, waiting for a free one if all are busy.
+
+        Args:
+            scraper: Scraper name, e.g. "simple" or "playwright"
+            url: The URL to scrape
+            output_path: Path the scraper writes its JSON (and HTML) to
+            timeout: Seconds the job may take (default: job_timeout)
+            cancelled: Event that abandons the job when set
+
+        Returns:
+            The worker's reply, with exit_code and the scraped content
+
+        Raises:
+            WorkerError: If the worker died, timed out or the job was cancelled
+        """
+        if self._closed:
+            raise WorkerError("worker pool is closed")
+
+        with self._slots:
+            worker = self._checkout()
+            try:
+                reply = worker.request(
+                    {"scraper": scraper, "url": url, "output_path": output_path},
+                    timeout or self.job_timeout,
+                    cancelled
+                )
+            except WorkerError as e:
+                self._count("failures")
+                logger.warning(f"Scraper worker {worker.pid} failed running {scraper}: {e}")
+                self._retire(worker, kill=True)
+                if not self._closed:
+                    self._count("restarts")
+                    self._idle.put(self._spawn())
+                raise
+            self._count("jobs")
+            self._checkin(worker)
+            return reply
+
+    def close(self) -> None:
+        """Stop all workers."""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Return job and supervision counters."""
+        with self._lock:
+            return dict(self.counters, workers=len(self._workers))
+
+    def _checkout(self) -> ScraperWorker:
+        """Take an idle worker, replacing one that died while idle."""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if worker.alive():
+                return worker
+            logger.warning(f"Scraper worker {worker.pid} died while idle, restarting")
+            self._count("restarts")
+            self._retire(worker, kill=True)
+
+    def _checkin(self, worker: ScraperWorker) -> None:
+        """Return a worker to the pool, or recycle it after max_jobs jobs."""
+        if self._closed:
+            self._retire(worker)
+        elif self.max_jobs and worker.jobs_done >= self.max_jobs:
+            logger.info(f"Recycling scraper worker {worker.pid} after {worker.jobs_done} jobs")
+            self._count("recycled")
+            self._retire(worker)
+            self._idle.put(self._spawn())
+        else:
+            self._idle.put(worker)
+
+    def _spawn(self) -> ScraperWorker:
+        worker = ScraperWorker(self.command, self.cwd)
+        with self._lock:
+            self._workers.add(worker)
+        logger.debug(f"Started scraper worker {worker.pid}")
+        return worker
+
+    def _retire(self, worker: ScraperWorker, kill: bool = False) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the charset decoding helpers.
+"""
+
+import os
+import unittest
+from unittest.mock import patch
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services import charset
+from services.charset import decode_html, CharsetStats, DETECT_BYTES
+
+PAGE = "<html><head>{meta}<title>Café</title></head><body><p>Grüße aus Köln</p></body></html>"
+
+class TestDecodeHtml(unittest.TestCase):
+    """Tests for decode_html."""
+
+    def test_http_charset_wins_over_meta(self):
+        """Test that the Content-Type charset is used before the <meta> declaration."""
+        body = PAGE.format(meta='<meta charset="utf-8">').encode('latin-1')
+
+        decoded = decode_html(body, 'text/html; charset=ISO-8859-1')
+
+        self.assertEqual((decoded.encoding, decoded.source), ('iso8859-1', 'http'))
+        self.assertIn('Grüße', decoded.text)
+
+    def test_meta_charset_sniffed(self):
+        """Test that <meta charset> and http-equiv declarations are found without detection."""
+        for meta in ('<meta charset="windows-1252">',
+                     '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'):
+            body = PAGE.format(meta=meta).encode('cp1252')
+
+            with patch.object(charset, '_detect') as detect:
+                decoded = decode_html(body, 'text/html')
+
+            detect.assert_not_called()
+            self.assertEqual((decoded.encoding, decoded.source), ('cp1252', 'meta'))
+            self.assertIn('Grüße', decoded.text)
+
+    def test_bom_wins_and_is_stripped(self):
+        """Test that a byte order mark decides the encoding and is not part of the text."""
+        body = b'\xef\xbb\xbf' + PAGE.format(meta='').encode('utf-8')
+
+        decoded = decode_html(body, 'text/html; charset=latin-1')
+
+        self.assertEqual(decoded.source, 'bom')
+        self.assertTrue(decoded.text.startswith('<html>'))
+
+    def test_detection_limited_to_prefix(self):
+        """Test that undeclared bodies are detected on a bounded prefix only."""
+        body = PAGE.format(meta='').encode('utf-8') + b'<p>filler</p>\n' * (DETECT_BYTES // 4)
+        seen = []
+        detect = charset._detect
+
+        def fake_detect(data):
+            seen.append(len(data))
+            return detect(data)
+
+        with patch.object(charset, '_detect', side_effect=fake_detect):
+            decoded = decode_html(body, None)
+
+        self.assertEqual(decoded.source, 'detected')
+        self.assertLessEqual(seen[0], DETECT_BYTES)
+        self.assertIn('Grüße', decoded.text)
+
+    def test_stats_count_sources(self):
+        """Test that decode results are counted by source."""
+        stats = CharsetStats()
+        body = PAGE.format(meta='').encode('utf-8')
+        stats.record(decode_html(body, 'text/html; charset=utf-8'), len(body))
+        stats.record(decode_html(body, None), len(body))
+
+        counters = stats.stats()
+
+        self.assertEqual((counters["decodes"], counters["http"], counters["detected"]), (2, 1, 1))
+        self.assertEqual(counters["bytes"], 2 * len(body))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the single-pass ContentExtractor.
+"""
+
+import os
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the extractor to test
+from services.content_extractor import make_soup, extract_blocks, available_parsers, element_text, element_texts, CHROME_TAGS
+
+class TestContentExtractor(unittest.TestCase):
+    """Tests for extract_blocks and make_soup."""
+
+    def test_blocks_in_document_order(self):
+        """Test that blocks come out in reading order, not grouped by tag."""
+        html = (
+            "<body><h1>Title</h1><p>Intro</p><h2>Part</h2>"
+            "<ul><li>One</li><li>Two</li></ul><pre><code>x = 1\ny = 2</code></pre></body>"
+        )
+
+        blocks, _ = extract_blocks(make_soup(html, 'html.parser'))
+
+        self.assertEqual([b["type"] for b in blocks], ["h1", "paragraph", "h2", "list", "code"])
+        self.assertEqual(blocks[3]["items"], ["One", "Two"])
+        self.assertEqual(blocks[4]["content"], "x = 1\ny = 2")
+
+    def test_nested_markup_is_not_emitted_twice(self):
+        """Test that paragraphs in quotes and nested lists are emitted once."""
+        html = (
+            "<body><blockquote><p>Quoted</p></blockquote>"
+            "<ul><li>Outer<ul><li>Inner</li></ul></li></ul></body>"
+        )
+
+        blocks, _ = extract_blocks(make_soup(html, 'html.parser'))
+
+        self.assertEqual(blocks, [
+            {"type": "blockquote", "content": "Quoted"},
+            {"type": "list", "list_type": "ul", "items": ["Outer", "Inner"]}
+        ])
+
+    def test_skip_tags_and_images(self):
+        """Test that chrome is skipped and image sources are made absolute."""
+        html = (
+            "<body><nav><p>Menu</p></nav><script>var x;</script>"
+            "<article><p>Body <img src='/a.png' alt='A'></p></article></body>"
+        )
+
+        blocks, images = extract_blocks(make_soup(html, 'html.parser'),
+                                        base_url="https://example.com/post", skip_tags=CHROME_TAGS)
+
+        self.assertEqual(blocks, [{"type": "paragraph", "content": "Body"}, {"type": "image", "image_id": "img_0"}])
+        self.assertEqual(images[0]["src"], "https://example.com/a.png")
+
+    def test_deeply_nested_page(self):
+        """Test that very deep nesting does not hit the recursion limit."""
+        depth = sys.getrecursionlimit() + 100
+        soup = make_soup("<body><p>Deep</p></body>", 'html.parser')
+        node = soup.body
+        for _ in range(depth):
+            child = soup.new_tag("div")
+            node.append(child)
+            node = child
+        node.append(soup.new_tag("p"))
+        node.p.string = "Bottom"
+
+        blocks, _ = extract_blocks(soup)
+
+        self.assertEqual([b["content"] for b in blocks], ["Deep", "Bottom"])
+
+    def test_element_texts_match_element_text(self):
+        """Test that element_texts slices the same text element_text reads."""
+        html = (
+            "<body><div>Outer <b>bold</b><div>Inner<br>line</div>\n\n  <script>x</script>"
+            "<div>Glued</div><div>text</div></div></body>"
+        )
+        soup = make_soup(html, 'html.parser')
+
+        texts = element_texts(soup, 'div')
+
+        self.assertEqual([div for div, _ in texts], soup.find_all('div'))
+        self.assertEqual([text for _, text in texts], [element_text(div) for div in soup.find_all('div')])
+
+    def test_element_texts_cut_long_texts(self):
+        """Test that texts are cut after the limit instead of read in full."""
+        soup = make_soup("<div>" + "word " * 1000 + "</div>", 'html.parser')
+
+        (_, text), = element_texts(soup, 'div', limit=100)
+
+        self.assertGreaterEqual(len(text), 100)
+        self.assertLess(len(text), 300)
+
+    def test_parser_backends(self):
+        """Test that html.parser is always available and unknown backends are rejected."""
+        self.assertIn('html.parser', available_parsers())
+        with self.assertRaises(ValueError):
+            make_soup("<p></p>", 'no-such-parser')
+
+if __name__ == '__main__':
+    unittest.main()
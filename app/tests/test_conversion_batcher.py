@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched drawj2d conversion.
+"""
+
+import os
+import stat
+import unittest
+import tempfile
+import shutil
+import textwrap
+import threading
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.conversion_batcher import ConversionBatcher
+from services.document_service import DocumentService
+from services.rmdoc import read_rmdoc
+
+# Fake drawj2d: one .rmdoc page per HCL page holding the page's text commands;
+# fails on scripts containing BROKEN and logs each run
+FAKE_DRAWJ2D = textwrap.dedent('''\
+    #!{python}
+    import sys, json, uuid, zipfile
+    args = sys.argv[1:]
+    out, hcl = args[args.index("-o") + 1], args[-1]
+    with open(hcl) as f:
+        lines = f.read().splitlines()
+    with open({log!r}, "a") as f:
+        f.write(hcl + "\\n")
+    if any("BROKEN" in line for line in lines) or not lines[0].startswith('puts "size'):
+        sys.exit(1)
+    pages = [[]]
+    for line in lines:
+        if line == 'puts "newpage"':
+            pages.append([])
+        elif line.startswith('puts "text'):
+            pages[-1].append(line)
+    doc, ids = str(uuid.uuid4()), [str(uuid.uuid4()) for _ in pages]
+    with zipfile.ZipFile(out, "w") as z:
+        z.writestr(doc + ".content", json.dumps({{"fileType": "notebook", "pages": ids}}))
+        for page_id, page in zip(ids, pages):
+            z.writestr(doc + "/" + page_id + ".rm", "\\n".join(page))
+''')
+
+class TestConversionBatcher(unittest.TestCase):
+    """Tests for the ConversionBatcher class."""
+
+    def setUp(self):
+        """Write a fake drawj2d into a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "drawj2d.log")
+        self.drawj2d = os.path.join(self.temp_dir, "drawj2d")
+        with open(self.drawj2d, 'w') as f:
+            f.write(FAKE_DRAWJ2D.format(python=sys.executable, log=self.log_path))
+        os.chmod(self.drawj2d, os.stat(self.drawj2d).st_mode | stat.S_IEXEC)
+        self.batcher = None
+
+    def tearDown(self):
+        """Stop the batcher and remove the temporary directory."""
+        if self.batcher:
+            self.batcher.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _hcl(self, name, pages):
+        """Write an HCL file whose pages hold one text line each."""
+        path = os.path.join(self.temp_dir, f"{name}.hcl")
+        lines = ['puts "size 2160 1620"', 'puts "set_font Lines 20"', 'puts "pen black"']
+        for number in range(pages):
+            if number:
+                lines.append('puts "newpage"')
+            lines.append(f'puts "text 120 120 \\"{name} page {number}\\""')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def _runs(self):
+        with open(self.log_path) as f:
+            return f.read().splitlines()
+
+    def _pages(self, rmdoc_path):
+        _, pages = read_rmdoc(rmdoc_path)
+        return [data.decode('utf-8') for data, _ in pages]
+
+    def test_jobs_in_window_converted_in_one_run(self):
+        """Test that jobs arriving together share one drawj2d run and get their own pages back."""
+        self.batcher = ConversionBatcher(self.drawj2d, os.path.join(self.temp_dir, "batches"), window=1.0)
+        jobs = [("a", 2), ("b", 1), ("c", 3)]
+
+        futures = [self.batcher.submit(self._hcl(name, pages), os.path.join(self.temp_dir, f"{name}.rmdoc"), name)
+                   for name, pages in jobs]
+
+        self.assertEqual([future.result(10) for future in futures], [True, True, True])
+        self.assertEqual(len(self._runs()), 1)
+        for name, pages in jobs:
+            self.assertEqual(self._pages(os.path.join(self.temp_dir, f"{name}.rmdoc")),
+                             [f'puts "text 120 120 \\"{name} page {number}\\""' for number in range(pages)])
+        self.assertEqual(self.batcher.stats(), {"jobs": 3, "batches": 1, "drawj2d_runs": 1, "fallbacks": 0})
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir, "batches")), [])
+
+    def test_failed_batch_falls_back_to_single_runs(self):
+        """Test that a broken script only fails its own job."""
+        self.batcher = ConversionBatcher(self.drawj2d, os.path.join(self.temp_dir, "batches"), window=1.0)
+        broken = self._hcl("BROKEN", 1)
+
+        good = self.batcher.submit(self._hcl("good", 2), os.path.join(self.temp_dir, "good.rmdoc"))
+        bad = self.batcher.submit(broken, os.path.join(self.temp_dir, "bad.rmdoc"))
+
+        self.assertTrue(good.result(10))
+        self.assertFalse(bad.result(10))
+        self.assertEqual(len(self._pages(os.path.join(self.temp_dir, "good.rmdoc"))), 2)
+        self.assertEqual(self.batcher.stats()["fallbacks"], 1)
+        self.assertEqual(len(self._runs()), 3)
+
+    def test_batch_size_limited(self):
+        """Test that a batch holds at most max_jobs jobs."""
+        self.batcher = ConversionBatcher(self.drawj2d, os.path.join(self.temp_dir, "batches"), window=1.0, max_jobs=2)
+
+        futures = [self.batcher.submit(self._hcl(f"doc{i}", 1), os.path.join(self.temp_dir, f"doc{i}.rmdoc"))
+                   for i in range(3)]
+
+        self.assertTrue(all(future.result(10) for future in futures))
+        self.assertEqual(self.batcher.stats()["batches"], 2)
+
+    def test_document_service_uses_batcher(self):
+        """Test that concurrent create_rmdoc calls are converted together."""
+        self.batcher = ConversionBatcher(self.drawj2d, os.path.join(self.temp_dir, "batches"), window=1.0)
+        service = DocumentService(os.path.join(self.temp_dir, "docs"), self.drawj2d, batcher=self.batcher)
+        hcl_paths = [service.create_hcl(f"https://example.com/{i}", "", {
+            "title": f"Article {i}", "structured_content": [{"type": "paragraph", "content": "Text"}]})
+            for i in range(2)]
+        results = [None, None]
+
+        def convert(position):
+            results[position] = service.create_rmdoc(hcl_paths[position], f"https://example.com/{position}")
+
+        threads = [threading.Thread(target=convert, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(result.endswith('.rmdoc') for result in results))
+        self.assertEqual(len(self._runs()), 1)
+        self.assertIn("Article 1", self._pages(results[1])[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the conversion result cache.
+"""
+
+import os
+import stat
+import time
+import unittest
+import tempfile
+import shutil
+import textwrap
+import zipfile
+import json
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.conversion_cache import ConversionCache, hcl_digest
+from services.conversion_batcher import ConversionBatcher, RMDOC_FLAGS
+from services.document_service import DocumentService
+from services.rmdoc import read_rmdoc
+
+# Fake drawj2d: logs each run and writes a one-page .rmdoc holding the script
+FAKE_DRAWJ2D = textwrap.dedent('''\
+    #!{python}
+    import sys, json, uuid, zipfile
+    args = sys.argv[1:]
+    with open({log!r}, "a") as f:
+        f.write(args[-1] + "\\n")
+    with open(args[-1]) as f:
+        script = f.read()
+    doc, page = str(uuid.uuid4()), str(uuid.uuid4())
+    with zipfile.ZipFile(args[args.index("-o") + 1], "w") as z:
+        z.writestr(doc + ".content", json.dumps({{"fileType": "notebook", "pages": [page]}}))
+        z.writestr(doc + ".metadata", json.dumps({{"visibleName": "drawj2d", "createdTime": "0"}}))
+        z.writestr(doc + "/" + page + ".rm", script)
+''')
+
+class TestHclDigest(unittest.TestCase):
+    """Tests for hcl_digest."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, lines):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def _image(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_digest_covers_every_line(self):
+        """Test that scripts share a digest only when every line matches."""
+        body = ['puts "size 1872 2404"', 'puts "text 100 100 \\"Title\\""']
+        first = self._write("a.hcl", body)
+        same = self._write("b.hcl", body)
+        stamped = self._write("c.hcl", body + ['puts "text 100 2300 \\"Generated: 2025-06-30 23:59:59\\""'])
+
+        self.assertEqual(hcl_digest(first), hcl_digest(same))
+        self.assertNotEqual(hcl_digest(first), hcl_digest(stamped))
+
+    def test_digest_covers_image_contents_not_paths(self):
+        """Test that images are identified by their contents."""
+        one = self._image("one.png", b"pixels")
+        same = self._image("same.png", b"pixels")
+        other = self._image("other.png", b"different pixels")
+
+        def script(name, image):
+            return self._write(name, [f'puts "image 100 200 800 600 \\"{image}\\""'])
+
+        self.assertEqual(hcl_digest(script("a.hcl", one)), hcl_digest(script("b.hcl", same)))
+        self.assertNotEqual(hcl_digest(script("a.hcl", one)), hcl_digest(script("c.hcl", other)))
+
+class TestConversionCache(unittest.TestCase):
+    """Tests for the ConversionCache class."""
+
+    def setUp(self):
+        """Create a temporary directory and a cache in it."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ConversionCache(os.path.join(self.temp_dir, "cache"), max_bytes=1000)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _document(self, name, size):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(b"x" * size)
+        return path
+
+    def test_store_and_fetch(self):
+        """Test that a stored document is fetched under its key and flags."""
+        key = self.cache.key("digest", RMDOC_FLAGS)
+        self.assertTrue(self.cache.store(key, '.rmdoc', self._document("doc.rmdoc", 50)))
+        out_path = os.path.join(self.temp_dir, "out.rmdoc")
+
+        self.assertTrue(self.cache.fetch(key, '.rmdoc', out_path))
+        self.assertEqual(os.path.getsize(out_path), 50)
+        self.assertFalse(self.cache.fetch(self.cache.key("digest", ("-Trm",)), '.rmdoc', out_path))
+        self.cache.record_miss()
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.5)
+
+    def test_large_documents_not_stored(self):
+        """Test that a document above a tenth of the bound is not cached."""
+        self.assertFalse(self.cache.store("key", '.rmdoc', self._document("big.rmdoc", 101)))
+
+    def test_least_recently_used_evicted(self):
+        """Test that eviction removes the least recently used documents first."""
+        for number in range(9):
+            self.cache.store(f"key{number}", '.rmdoc', self._document(f"doc{number}.rmdoc", 100))
+            os.utime(self.cache._path(f"key{number}", '.rmdoc'), (number, number))
+        # Using the oldest entry makes it the most recent
+        self.cache.fetch("key0", '.rmdoc', os.path.join(self.temp_dir, "out.rmdoc"))
+
+        self.cache.store("key9", '.rmdoc', self._document("doc9.rmdoc", 100))
+        self.cache.store("key10", '.rmdoc', self._document("doc10.rmdoc", 100))
+
+        self.assertTrue(os.path.exists(self.cache._path("key0", '.rmdoc')))
+        self.assertFalse(os.path.exists(self.cache._path("key1", '.rmdoc')))
+        self.assertTrue(os.path.exists(self.cache._path("key10", '.rmdoc')))
+        self.assertLessEqual(sum(os.path.getsize(entry.path) for entry in os.scandir(self.cache.cache_dir)), 1000)
+
+class TestDocumentServiceCache(unittest.TestCase):
+    """Tests for cached conversion in DocumentService."""
+
+    def setUp(self):
+        """Write a fake drawj2d and create a service with a cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "drawj2d.log")
+        self.drawj2d = os.path.join(self.temp_dir, "drawj2d")
+        with open(self.drawj2d, 'w') as f:
+            f.write(FAKE_DRAWJ2D.format(python=sys.executable, log=self.log_path))
+        os.chmod(self.drawj2d, os.stat(self.drawj2d).st_mode | stat.S_IEXEC)
+        self.cache = ConversionCache(os.path.join(self.temp_dir, "cache"))
+        # A batcher without a window converts each document as it arrives
+        self.batcher = ConversionBatcher(self.drawj2d, os.path.join(self.temp_dir, "batches"), window=0)
+        self.service = DocumentService(os.path.join(self.temp_dir, "docs"), self.drawj2d,
+                                       batcher=self.batcher, cache=self.cache)
+
+    def tearDown(self):
+        """Stop the batcher and remove the temporary directory."""
+        self.batcher.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _runs(self):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path) as f:
+            return f.read().splitlines()
+
+    def _convert(self, url, text):
+        hcl_path = self.service.create_hcl(url, "", {
+            "title": "Article", "structured_content": [{"type": "paragraph", "content": text}]})
+        return self.service.create_rmdoc(hcl_path, url)
+
+    def _metadata(self, rmdoc_path):
+        with zipfile.ZipFile(rmdoc_path) as archive:
+            name = next(name for name in archive.namelist() if name.endswith('.metadata'))
+            return name, json.loads(archive.read(name))
+
+    def test_identical_content_converted_once(self):
+        """Test that a re-share of the same content skips drawj2d and is stamped as new."""
+        first = self._convert("https://example.com/a", "Same text")
+        # A later share gets a different output path
+        time.sleep(1.1)
+        second = self._convert("https://example.com/a", "Same text")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(read_rmdoc(first)[1], read_rmdoc(second)[1])
+        self.assertEqual(len(self._runs()), 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        first_name, _ = self._metadata(first)
+        second_name, metadata = self._metadata(second)
+        self.assertNotEqual(first_name, second_name)
+        self.assertEqual(metadata["visibleName"], "Article")
+        self.assertGreater(int(metadata["createdTime"]), (time.time() - 60) * 1000)
+
+    def test_cached_scripts_have_no_drawn_timestamp(self):
+        """Test that the timestamp is drawn only when conversions are not cached."""
+        content = {"title": "Article", "structured_content": [{"type": "paragraph", "content": "Text"}]}
+        uncached = DocumentService(os.path.join(self.temp_dir, "plain"), self.drawj2d)
+
+        for service, drawn in ((self.service, False), (uncached, True)):
+            with open(service.create_hcl("https://example.com/a", "", content), encoding='utf-8') as f:
+                self.assertEqual("Generated:" in f.read(), drawn)
+
+    def test_changed_content_converted_again(self):
+        """Test that different content misses the cache."""
+        self._convert("https://example.com/a", "Some text")
+        self._convert("https://example.com/a", "Other text")
+
+        self.assertEqual(len(self._runs()), 2)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Regression tests of the simple scraper's extraction against the offline corpus.
+"""
+
+import os
+import json
+import hashlib
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.content_extractor import make_soup
+from scrape_simple import extract_content
+
+CORPUS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'corpus'))
+
+class TestCorpus(unittest.TestCase):
+    """Tests that extraction of the captured pages matches the golden outputs."""
+
+    def setUp(self):
+        """Load the corpus manifest."""
+        with open(os.path.join(CORPUS_DIR, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+    def test_simple_extraction_matches_golden(self):
+        """Test each page's simple-scraper blocks against its golden output."""
+        self.assertTrue(self.manifest["pages"])
+        for page in self.manifest["pages"]:
+            with self.subTest(page=page["id"]):
+                with open(os.path.join(CORPUS_DIR, page["file"]), 'rb') as f:
+                    body = f.read()
+                self.assertEqual(hashlib.sha256(body).hexdigest(), page["sha256"])
+                with open(os.path.join(CORPUS_DIR, 'golden', 'simple', f"{page['id']}.json"), 'r', encoding='utf-8') as f:
+                    golden = json.load(f)
+
+                html = body.decode('utf-8', errors='replace')
+                soup = make_soup(html, self.manifest["golden_parser"])
+                result = extract_content(html, page["base_url"] or "https://corpus.invalid/", soup=soup)
+
+                self.assertEqual(result["structured_content"], golden)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the typed document model.
+"""
+
+import os
+import re
+import unittest
+import tempfile
+import shutil
+import sys
+import time
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.document_model import (Heading, Paragraph, ListItem, Code, Quote, Image,
+                                     ContentBlock, from_dicts, to_dicts, normalize)
+from services.content_extractor import ContentExtractor, make_soup
+from services.document_service import DocumentService
+
+CONTENT = [
+    {"type": "h2", "content": "Section"},
+    {"type": "paragraph", "content": "Text"},
+    {"type": "list", "list_type": "ol", "items": ["one", "two"]},
+    {"type": "list", "list_type": "ul", "items": ["three"]},
+    {"type": "code", "content": "x = 1\ny = 2"},
+    {"type": "blockquote", "content": "Quoted"},
+    {"type": "image", "image_id": "img_0"},
+]
+
+class TestDocumentModel(unittest.TestCase):
+    """Tests for conversion and serialization of typed blocks."""
+
+    def test_from_dicts(self):
+        """Test that each JSON item becomes its typed block and lists one block per item."""
+        blocks = from_dicts(CONTENT + [{"type": "bullet", "content": "legacy"}, {"type": "div", "content": "?"}])
+
+        self.assertEqual(blocks, [
+            Heading(2, "Section"), Paragraph("Text"),
+            ListItem("one", "ol", True), ListItem("two", "ol", False), ListItem("three", "ul", True),
+            Code("x = 1\ny = 2"), Quote("Quoted"), Image("img_0"),
+            ListItem("legacy"), Paragraph("?"),
+        ])
+
+    def test_to_dicts_round_trip(self):
+        """Test that converting back regroups list items into their lists."""
+        self.assertEqual(to_dicts(from_dicts(CONTENT)), CONTENT)
+
+    def test_base_block_is_abstract(self):
+        """Test that only concrete block types can be created."""
+        with self.assertRaises(TypeError):
+            ContentBlock()
+
+    def test_blocks_have_no_instance_dict(self):
+        """Test that blocks store their fields in slots only."""
+        for block in from_dicts(CONTENT):
+            self.assertFalse(hasattr(block, '__dict__'))
+
+    def test_extractor_produces_typed_blocks(self):
+        """Test that the extractor's typed and JSON outputs agree."""
+        html = "<h1>T</h1><p>Para</p><ul><li>a</li><li>b</li></ul><blockquote>Q</blockquote><pre>c</pre>"
+        extractor = ContentExtractor()
+
+        blocks, _ = extractor.extract_model(make_soup(html, 'html.parser'))
+        items, _ = extractor.extract(make_soup(html, 'html.parser'))
+
+        self.assertEqual(blocks, [Heading(1, "T"), Paragraph("Para"), ListItem("a", "ul", True),
+                                  ListItem("b", "ul", False), Quote("Q"), Code("c")])
+        self.assertEqual(items, to_dicts(blocks))
+
+class TestNormalize(unittest.TestCase):
+    """Tests for the single-pass content normalizer."""
+
+    def test_canonical_blocks(self):
+        """Test that lists are expanded, whitespace trimmed and empty blocks dropped."""
+        items = [
+            {"type": "h2", "content": "  A   heading \n"},
+            {"type": "list", "list_type": "ol", "items": ["  ", " first\titem "]},
+            {"type": "paragraph", "content": " \n "},
+            {"type": "code", "content": "\n  indented\n\n"},
+            {"type": "image"},
+        ]
+
+        self.assertEqual(list(normalize(items)), [
+            Heading(2, "A heading"), ListItem("first item", "ol", True), Code("  indented"),
+        ])
+
+    def test_short_paragraphs_merged(self):
+        """Test that adjacent short paragraphs merge until they reach the limit."""
+        items = [{"type": "paragraph", "content": text} for text in ("Share", "Tweet", "Email", "x" * 30, "y" * 100)]
+        items.insert(3, {"type": "h2", "content": "Next"})
+
+        blocks = list(normalize(items, merge_chars=12))
+
+        self.assertEqual(blocks, [Paragraph("Share Tweet Email"), Heading(2, "Next"),
+                                  Paragraph("x" * 30), Paragraph("y" * 100)])
+        self.assertEqual(len(list(normalize(items))), 6)
+
+    def test_input_not_modified(self):
+        """Test that typed input blocks are replaced rather than changed."""
+        block = Paragraph(" text ")
+
+        self.assertEqual(list(normalize([block])), [Paragraph("text")])
+        self.assertEqual(block.text, " text ")
+
+    def test_linear_time(self):
+        """Test that normalizing four times the content takes well under sixteen times as long."""
+        def items(count):
+            return [{"type": "list", "items": ["a", "b"]} if i % 2 else {"type": "paragraph", "content": "words " * 20}
+                    for i in range(count)]
+
+        def best_time(content):
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                blocks = to_dicts(normalize(content, merge_chars=80))
+                timings.append(time.perf_counter() - started)
+            return min(timings), blocks
+
+        small, _ = best_time(items(20000))
+        large, blocks = best_time(items(80000))
+
+        self.assertEqual(len(blocks), 80000)
+        self.assertEqual(sum(len(block.get("items", ())) for block in blocks), 80000)
+        self.assertLess(large / small, 8)
+
+class TestDocumentServiceModel(unittest.TestCase):
+    """Tests for laying out typed blocks in DocumentService."""
+
+    def setUp(self):
+        """Create a document service writing to a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = DocumentService(self.temp_dir, "/usr/local/bin/drawj2d")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _hcl(self, structured_content):
+        hcl_path = self.service.create_hcl("https://example.com", "", {
+            "title": "T", "structured_content": structured_content})
+        with open(hcl_path, 'r', encoding='utf-8') as f:
+            hcl = re.sub(r'Generated: [^\\]*', '', f.read())
+        return hcl, DocumentService.load_page_map(hcl_path)
+
+    def test_typed_and_json_content_lay_out_alike(self):
+        """Test that typed blocks produce the same HCL and page map as their JSON form."""
+        json_hcl, json_map = self._hcl(CONTENT)
+        typed_hcl, typed_map = self._hcl(from_dicts(CONTENT))
+
+        self.assertEqual(typed_hcl, json_hcl)
+        # Block indices count a list as one content item
+        self.assertEqual(typed_map["pages"][0]["blocks"], [0, 1, 2, 3, 4, 5])
+        self.assertEqual(typed_map["pages"], json_map["pages"])
+
+if __name__ == '__main__':
+    unittest.main()
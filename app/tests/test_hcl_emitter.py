@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HCL emitter.
+"""
+
+import os
+import unittest
+import tempfile
+import shutil
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.hcl_emitter import HCLEmitter, escape_hcl, format_number
+from services.document_service import DocumentService
+
+class TestHCLEmitter(unittest.TestCase):
+    """Tests for the HCLEmitter class."""
+
+    def test_redundant_state_changes_skipped(self):
+        """Test that font and pen commands are only emitted when they change something."""
+        emitter = HCLEmitter()
+        emitter.set_font("Lines", 20)
+        emitter.set_pen("black")
+        emitter.text(10, 20, "one", ("Lines", 20))
+        emitter.set_pen("black")
+        emitter.text(10, 60, "two", ("Lines-Bold", 32))
+        emitter.text(10, 100, "three", ("Lines", 20))
+
+        self.assertEqual(emitter.getvalue().splitlines(), [
+            'puts "set_font Lines 20"',
+            'puts "pen black"',
+            'puts "text 10 20 \\"one\\""',
+            'puts "set_font Lines-Bold 32"',
+            'puts "text 10 60 \\"two\\""',
+            'puts "set_font Lines 20"',
+            'puts "text 10 100 \\"three\\""',
+        ])
+        self.assertEqual(emitter.stats(), {"commands": 7, "skipped": 2})
+        self.assertEqual(len(emitter), 7)
+
+    def test_formatting_and_escaping(self):
+        """Test compact coordinates and escaped text."""
+        self.assertEqual([format_number(v) for v in (120, 180.0, 212.25, 99.96)], ["120", "180", "212.2", "100"])
+        self.assertEqual(escape_hcl('say "hi"\\\nnow'), 'say \\"hi\\"\\\\ now')
+
+        emitter = HCLEmitter()
+        emitter.line(120, 220.0, 2040, 220.0)
+        emitter.image(10.4, 20, 99.6, 50.2, "/tmp/a.png")
+        self.assertEqual(emitter.getvalue(), 'puts "line 120 220 2040 220 width=1.0"\n'
+                                             'puts "image 10.4 20 100 50 \\"/tmp/a.png\\""\n')
+
+    def test_single_write(self):
+        """Test that the script is written whole and its size returned."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            emitter = HCLEmitter()
+            emitter.size(2160, 1620)
+            emitter.text(1, 2, "Grüße")
+            path = os.path.join(temp_dir, "doc.hcl")
+
+            size = emitter.write(path)
+
+            with open(path, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), emitter.getvalue())
+            self.assertEqual(size, os.path.getsize(path))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_document_switches_fonts_only_on_change(self):
+        """Test that create_hcl does not switch back to the body font between headings and lists."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            service = DocumentService(temp_dir, "/usr/local/bin/drawj2d")
+            content = {"title": "T", "structured_content": [
+                {"type": "h2", "content": "First"},
+                {"type": "h2", "content": "Second"},
+                {"type": "list", "list_type": "ul", "items": ["a", "b", "c"]},
+                {"type": "paragraph", "content": "Body text."},
+            ]}
+
+            with open(service.create_hcl("https://example.com", "", content), 'r', encoding='utf-8') as f:
+                fonts = [line for line in f.read().splitlines() if line.startswith('puts "set_font')]
+
+            self.assertEqual(fonts, ['puts "set_font Lines-Bold 36"', 'puts "set_font Lines 20"',
+                                     'puts "set_font Lines-Bold 28"', 'puts "set_font Lines 20"'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
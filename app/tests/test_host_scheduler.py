@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-host request scheduling.
+"""
+
+import os
+import time
+import threading
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.host_scheduler import HostScheduler, interleave_by_host, parse_retry_after
+from services.http_client import HttpClient
+from test_http_client import HttpServerTestCase, _Handler
+
+class TestHostScheduler(unittest.TestCase):
+    """Tests for the HostScheduler class."""
+
+    def _run(self, scheduler, urls, hold=0.0):
+        """Run one thread per URL through the scheduler, recording start times and peak concurrency."""
+        starts = {}
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fetch(url):
+            with scheduler.slot(url):
+                with lock:
+                    starts.setdefault(url, time.monotonic())
+                    active["now"] += 1
+                    active["peak"] = max(active["peak"], active["now"])
+                time.sleep(hold)
+                with lock:
+                    active["now"] -= 1
+
+        threads = [threading.Thread(target=fetch, args=(url,)) for url in urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return starts, active["peak"]
+
+    def test_spacing_applies_per_host(self):
+        """Test that one host's requests are spaced while another host's are not delayed."""
+        scheduler = HostScheduler(max_per_host=4, min_interval=0.2)
+        urls = [f"https://slow.example/{i}" for i in range(3)] + ["https://other.example/a"]
+
+        began = time.monotonic()
+        starts, _ = self._run(scheduler, urls)
+
+        same_host = sorted(starts[url] for url in urls[:3])
+        self.assertGreaterEqual(same_host[2] - same_host[0], 0.35)
+        self.assertLess(starts["https://other.example/a"] - began, 0.15)
+        self.assertEqual(scheduler.stats()["requests"], 4)
+
+    def test_concurrency_limit(self):
+        """Test that no more than max_per_host requests run against a host at once."""
+        scheduler = HostScheduler(max_per_host=2, min_interval=0)
+
+        _, peak = self._run(scheduler, [f"https://example.com/{i}" for i in range(6)], hold=0.1)
+
+        self.assertEqual(peak, 2)
+
+    def test_throttle_blocks_host(self):
+        """Test Retry-After and exponential back-off after 429 responses."""
+        scheduler = HostScheduler(min_interval=0, max_retry_after=30, initial_backoff=0.5)
+
+        self.assertEqual(scheduler.observe("https://a.example/x", 429, "7"), 7)
+        self.assertEqual(scheduler.observe("https://b.example/x", 429), 0.5)
+        self.assertEqual(scheduler.observe("https://b.example/y", 429), 1.0)
+        self.assertEqual(scheduler.observe("https://c.example/x", 503, "3600"), 30)
+        self.assertIsNone(scheduler.observe("https://c.example/x", 200))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def test_interleave_by_host(self):
+        """Test round-robin ordering across hosts."""
+        urls = ["https://a.example/1", "https://a.example/2", "https://a.example/3",
+                "https://b.example/1", "https://c.example/1", "https://b.example/2"]
+
+        self.assertEqual(interleave_by_host(urls), [
+            "https://a.example/1", "https://b.example/1", "https://c.example/1",
+            "https://a.example/2", "https://b.example/2", "https://a.example/3"])
+
+class TestThrottledClient(HttpServerTestCase):
+    """Tests for HttpClient with a scheduler against a local server."""
+
+    def test_retry_after_honored(self):
+        """Test that a 429 is retried once Retry-After has passed and later requests wait too."""
+        _Handler.responses["/limited"] = [
+            (429, {"Retry-After": "1"}, b"slow down"),
+            (200, {}, b"<html><title>ok</title></html>"),
+        ]
+        client = HttpClient(scheduler=HostScheduler(min_interval=0))
+        try:
+            started = time.monotonic()
+            response = client.get(self.base_url + "/limited")
+            elapsed = time.monotonic() - started
+        finally:
+            client.close()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(elapsed, 0.9)
+        self.assertEqual(_Handler.requests, ["/limited", "/limited"])
+        self.assertEqual(client.scheduler.stats()["throttled"], 1)
+
+    def test_get_many(self):
+        """Test that get_many fetches every URL and reports failures per URL."""
+        client = HttpClient(scheduler=HostScheduler(max_per_host=2, min_interval=0))
+        urls = [self.base_url + f"/{i}" for i in range(5)] + ["http://127.0.0.1:1/unreachable"]
+        try:
+            results = dict(client.get_many(urls, max_workers=4, timeout=2))
+        finally:
+            client.close()
+
+        self.assertEqual(set(results), set(urls))
+        self.assertIsInstance(results["http://127.0.0.1:1/unreachable"], Exception)
+        self.assertTrue(all(results[url].status_code == 200 for url in urls[:5]))
+
+if __name__ == '__main__':
+    unittest.main()
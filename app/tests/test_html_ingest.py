@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit tests for size-capped streaming HTML ingestion.
+"""
+
+import os
+import glob
+import unittest
+from unittest.mock import patch
+import tempfile
+import shutil
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.html_ingest import ingest_html, cap_html, fetch_html
+from services.http_client import HttpClient
+from services.http_cache import HttpCache
+from test_http_client import HttpServerTestCase, _Handler
+
+PARAGRAPH = "<p>Grüße from a paragraph of readable text.</p>"
+
+def chunked(data, size=1024):
+    """Yield data in chunks, recording how many were consumed."""
+    chunked.consumed = 0
+    for i in range(0, len(data), size):
+        chunked.consumed += 1
+        yield data[i:i + size]
+
+class TestIngestHtml(unittest.TestCase):
+    """Tests for ingest_html and cap_html."""
+
+    def test_complete_page_decoded_across_chunks(self):
+        """Test that a small page is read whole, with multi-byte characters split between chunks."""
+        page = ("<html><body>" + PARAGRAPH * 20 + "</body></html>").encode('utf-8')
+
+        ingested = ingest_html(chunked(page, size=7), 'text/html; charset=utf-8')
+
+        self.assertEqual(ingested.html, page.decode('utf-8'))
+        self.assertIsNone(ingested.truncated)
+        self.assertEqual(ingested.bytes_read, len(page))
+        self.assertFalse(ingested.report()["truncated"])
+
+    def test_byte_cap(self):
+        """Test that reading stops at max_bytes."""
+        page = ("<html><body>" + PARAGRAPH * 10000 + "</body></html>").encode('utf-8')
+
+        ingested = ingest_html(chunked(page), 'text/html', max_bytes=64 * 1024)
+
+        self.assertEqual(ingested.truncated, "bytes")
+        self.assertEqual(ingested.bytes_read, 64 * 1024)
+        self.assertLessEqual(chunked.consumed, 65)
+
+    def test_text_cap_ignores_scripts(self):
+        """Test that reading stops after enough readable text, not counting scripts and navigation."""
+        noise = "<script>" + "var x = 1;" * 5000 + "</script><nav>" + "menu " * 5000 + "</nav>"
+        page = ("<html><body>" + noise + PARAGRAPH * 10000 + "</body></html>").encode('utf-8')
+
+        ingested = ingest_html(chunked(page), 'text/html', max_text_chars=2000)
+
+        self.assertEqual(ingested.truncated, "text")
+        self.assertGreaterEqual(ingested.text_chars, 2000)
+        self.assertLess(ingested.text_chars, 3000)
+        self.assertIn("Grüße", ingested.html)
+
+    def test_cap_rendered_html(self):
+        """Test the caps on HTML that is already in memory."""
+        html = "<html><body>" + PARAGRAPH * 10000 + "</body></html>"
+
+        self.assertIsNone(cap_html(html[:2000], max_bytes=10 ** 6).truncated)
+        capped = cap_html(html, max_bytes=10000)
+        self.assertEqual((capped.truncated, len(capped.html)), ("bytes", 10000))
+
+class TestFetchHtml(HttpServerTestCase):
+    """Tests for fetch_html against a local server."""
+
+    def setUp(self):
+        """Start the server and a client with a cache."""
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.client = HttpClient(cache=HttpCache(self.cache_dir))
+
+    def tearDown(self):
+        """Close the client and remove the cache."""
+        self.client.close()
+        shutil.rmtree(self.cache_dir)
+        super().tearDown()
+
+    def test_huge_page_truncated(self):
+        """Test that a page over the cap is cut short and not cached."""
+        page = ("<html><body>" + PARAGRAPH * 100000 + "</body></html>").encode('utf-8')
+        _Handler.responses["/huge"] = (200, {"Content-Type": "text/html", "Cache-Control": "max-age=600"}, page)
+
+        ingested, final_url = fetch_html(self.client, self.base_url + "/huge", max_bytes=256 * 1024)
+
+        self.assertGreater(len(page), 4 * 1024 * 1024)
+        self.assertEqual(ingested.truncated, "bytes")
+        self.assertLessEqual(len(ingested.html.encode('utf-8')), 256 * 1024)
+        self.assertEqual(final_url, self.base_url + "/huge")
+        self.assertIsNone(self.client.cache.lookup(self.base_url + "/huge"))
+
+    def test_complete_page_cached(self):
+        """Test that a page read to its end is stored and served from the cache next time."""
+        page = ("<html><body>" + PARAGRAPH * 10 + "</body></html>").encode('utf-8')
+        _Handler.responses["/page"] = (200, {"Content-Type": "text/html; charset=utf-8",
+                                             "Cache-Control": "max-age=600"}, page)
+
+        first, _ = fetch_html(self.client, self.base_url + "/page")
+        second, _ = fetch_html(self.client, self.base_url + "/page")
+
+        self.assertEqual(first.html, page.decode('utf-8'))
+        self.assertEqual(second.html, first.html)
+        self.assertEqual(_Handler.requests, ["/page"])
+
+    def test_revalidated_page_refetched_when_body_evicted(self):
+        """Test that a 304 for an entry whose body has gone is answered by an unconditional fetch."""
+        _Handler.responses["/etag"] = (200, {"Content-Type": "text/html", "Cache-Control": "no-cache", "ETag": '"v1"'},
+                                       b"<html><body><p>Cached text</p></body></html>")
+        fetch_html(self.client, self.base_url + "/etag")
+        lookup = self.client.cache.lookup
+
+        def lookup_then_evict(url):
+            # Another thread evicts the body right after this lookup
+            entry = lookup(url)
+            for body_path in glob.glob(os.path.join(self.cache_dir, "*.body")):
+                os.remove(body_path)
+            return entry
+
+        with patch.object(self.client.cache, 'lookup', side_effect=lookup_then_evict):
+            ingested, _ = fetch_html(self.client, self.base_url + "/etag")
+
+        self.assertIn("Cached text", ingested.html)
+        self.assertEqual(len(_Handler.requests), 3)
+
+if __name__ == '__main__':
+    unittest.main()
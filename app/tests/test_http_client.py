@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared HttpClient class.
+"""
+
+import os
+import threading
+import unittest
+import tempfile
+from unittest.mock import patch
+import shutil
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the client to test
+from services.http_client import HttpClient
+from services.http_cache import HttpCache
+
+class _Handler(BaseHTTPRequestHandler):
+    """Keep-alive handler that records each new connection."""
+
+    protocol_version = "HTTP/1.1"
+    connections = []
+    responses = {}
+    requests = []
+
+    def setup(self):
+        super().setup()
+        _Handler.connections.append(self.client_address)
+
+    def do_GET(self):
+        _Handler.requests.append(self.path)
+        response = _Handler.responses.get(self.path, (200, {}, b"<html><title>ok</title></html>"))
+        if isinstance(response, list):
+            # A sequence of responses, the last one repeating
+            response = response.pop(0) if len(response) > 1 else response[0]
+        status, headers, body = response
+        if headers.get("ETag") and self.headers.get("If-None-Match") == headers["ETag"]:
+            status, body = 304, b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class HttpServerTestCase(unittest.TestCase):
+    """Base class running a local keep-alive HTTP server."""
+
+    def setUp(self):
+        """Start the local server."""
+        _Handler.connections = []
+        _Handler.responses = {}
+        _Handler.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        """Stop the local server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestHttpClient(HttpServerTestCase):
+    """Tests for the HttpClient class."""
+
+    def test_fetches_to_same_host_reuse_connection(self):
+        """Test that repeated fetches share one keep-alive connection."""
+        client = HttpClient()
+        try:
+            for path in ("/a", "/b", "/c"):
+                self.assertEqual(client.get(self.base_url + path).status_code, 200)
+        finally:
+            client.close()
+
+        self.assertEqual(len(_Handler.connections), 1)
+
+    def test_sends_configured_user_agent(self):
+        """Test that the configured User-Agent is sent with every request."""
+        client = HttpClient(user_agent="PiShareTest/1.0")
+        response = client.get(self.base_url + "/")
+        client.close()
+
+        self.assertEqual(response.request.headers["User-Agent"], "PiShareTest/1.0")
+
+class TestHttpCache(HttpServerTestCase):
+    """Tests for HttpClient with an HttpCache."""
+
+    def setUp(self):
+        """Start the server and create a cache directory."""
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.client = HttpClient(cache=HttpCache(self.cache_dir))
+
+    def tearDown(self):
+        """Close the client and remove the cache."""
+        self.client.close()
+        shutil.rmtree(self.cache_dir)
+        super().tearDown()
+
+    def test_fresh_response_served_from_disk(self):
+        """Test that a max-age response is served locally on the next fetch."""
+        _Handler.responses["/fresh"] = (200, {"Cache-Control": "max-age=600"}, b"fresh body")
+
+        first = self.client.get(self.base_url + "/fresh")
+        # A new client on the same directory sees the entry too (e.g. a scraper subprocess)
+        second = HttpClient(cache=HttpCache(self.cache_dir)).get(self.base_url + "/fresh")
+
+        self.assertEqual(second.content, b"fresh body")
+        self.assertTrue(getattr(second, "from_cache", False))
+        self.assertFalse(getattr(first, "from_cache", False))
+        self.assertEqual(_Handler.requests, ["/fresh"])
+
+    def test_stale_response_revalidated_with_etag(self):
+        """Test that a stale entry is revalidated and its body reused on 304."""
+        _Handler.responses["/etag"] = (200, {"Cache-Control": "no-cache", "ETag": '"v1"'}, b"etag body")
+
+        self.client.get(self.base_url + "/etag")
+        second = self.client.get(self.base_url + "/etag")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, b"etag body")
+        self.assertEqual(len(_Handler.requests), 2)
+        self.assertEqual(self.client.cache.stats()["revalidated"], 1)
+        self.assertAlmostEqual(self.client.cache.stats()["hit_rate"], 0.5)
+
+    def test_concurrent_stores_of_same_url(self):
+        """Test that threads storing the same URL do not share temporary files."""
+        _Handler.responses["/shared"] = (200, {"Cache-Control": "max-age=600"}, b"shared body")
+        response = self.client.get(self.base_url + "/shared", use_cache=False)
+        errors = []
+
+        def store():
+            try:
+                for _ in range(50):
+                    self.client.cache.store(self.base_url + "/shared", response, 0)
+            except OSError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=store) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.client.cache.lookup(self.base_url + "/shared")["status"], 200)
+
+    def test_revalidated_response_served_when_entry_cannot_be_written(self):
+        """Test that a 304 is still served from the cached body if updating the entry fails."""
+        _Handler.responses["/etag"] = (200, {"Cache-Control": "no-cache", "ETag": '"v1"'}, b"etag body")
+        self.client.get(self.base_url + "/etag")
+
+        with patch.object(self.client.cache, '_write_json', side_effect=OSError("disk full")):
+            second = self.client.get(self.base_url + "/etag")
+
+        self.assertEqual(second.content, b"etag body")
+        self.assertEqual(self.client.cache.stats()["revalidated"], 1)
+
+    def test_no_store_is_not_cached(self):
+        """Test that no-store responses always go to the origin."""
+        _Handler.responses["/private"] = (200, {"Cache-Control": "no-store, max-age=600"}, b"secret")
+
+        self.client.get(self.base_url + "/private")
+        self.client.get(self.base_url + "/private")
+
+        self.assertEqual(len(_Handler.requests), 2)
+
+    def test_store_is_size_bounded(self):
+        """Test that old entries are evicted once the store exceeds its bound."""
+        self.client.cache = HttpCache(self.cache_dir, max_bytes=1000)
+        for i in range(15):
+            _Handler.responses[f"/page{i}"] = (200, {"Cache-Control": "max-age=600"}, b"y" * 90)
+            self.client.get(self.base_url + f"/page{i}")
+
+        total = sum(os.path.getsize(os.path.join(self.cache_dir, name))
+                    for name in os.listdir(self.cache_dir) if name.endswith(".body"))
+        self.assertLessEqual(total, 1000)
+        self.assertGreater(self.client.cache.stats()["evictions"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
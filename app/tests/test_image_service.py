@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ImageService class and inline image layout.
+"""
+
+import io
+import os
+import unittest
+import tempfile
+import shutil
+import sys
+from PIL import Image
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.image_service import ImageService, bayer_matrix
+from services.document_service import DocumentService
+from services.http_client import HttpClient
+from test_http_client import HttpServerTestCase, _Handler
+
+def png_bytes(size=(300, 200), color=(200, 40, 40)):
+    """Encode a solid-color test image as PNG."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class TestDithering(unittest.TestCase):
+    """Tests for the dithering helpers."""
+
+    def test_bayer_matrix(self):
+        """Test the 4x4 Bayer matrix and that larger ones hold every threshold once."""
+        self.assertEqual(bayer_matrix(4), [[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]])
+        self.assertEqual(sorted(v for row in bayer_matrix(8) for v in row), list(range(64)))
+
+    def test_dither_uses_only_device_levels(self):
+        """Test that a gradient is reduced to the configured gray levels."""
+        service = ImageService(tempfile.mkdtemp(), http_client=HttpClient(), gray_levels=4)
+        gradient = Image.linear_gradient('L').resize((64, 64))
+
+        dithered = service.dither(gradient)
+
+        self.assertEqual(dithered.mode, 'L')
+        self.assertLessEqual(set(dithered.tobytes()), set(bytes([0, 85, 170, 255])))
+        shutil.rmtree(service.cache_dir)
+
+class TestImageService(HttpServerTestCase):
+    """Tests for downloading and caching images from a local server."""
+
+    def setUp(self):
+        """Start the server and create a cache directory."""
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.client = HttpClient()
+        self.service = ImageService(self.cache_dir, http_client=self.client, max_bytes=64 * 1024,
+                                    max_width=200, max_height=100)
+
+    def tearDown(self):
+        """Close the client and remove the cache."""
+        self.client.close()
+        shutil.rmtree(self.cache_dir)
+        super().tearDown()
+
+    def test_images_processed_deduplicated_and_limited(self):
+        """Test downscaling, duplicate detection by content and the size limit."""
+        picture = png_bytes()
+        _Handler.responses["/a.png"] = (200, {"Content-Type": "image/png"}, picture)
+        _Handler.responses["/copy-of-a.png"] = (200, {"Content-Type": "image/png"}, picture)
+        _Handler.responses["/huge.png"] = (200, {"Content-Type": "image/png"}, b"x" * (128 * 1024))
+        content = {"images": [
+            {"id": "img_0", "src": self.base_url + "/a.png"},
+            {"id": "img_1", "src": self.base_url + "/copy-of-a.png"},
+            {"id": "img_2", "src": self.base_url + "/huge.png"},
+        ]}
+
+        ready = self.service.process_content_images(content)
+
+        self.assertEqual([image["id"] for image in ready], ["img_0"])
+        self.assertEqual((ready[0]["width"], ready[0]["height"]), (150, 100))
+        self.assertEqual(content["images"][1]["duplicate_of"], "img_0")
+        with Image.open(ready[0]["path"]) as processed:
+            self.assertEqual(processed.mode, 'L')
+
+    def test_cached_across_documents(self):
+        """Test that an image is fetched once for several documents."""
+        _Handler.responses["/a.png"] = (200, {"Content-Type": "image/png"}, png_bytes())
+
+        for _ in range(2):
+            ready = self.service.process_content_images({"images": [{"id": "img_0", "src": self.base_url + "/a.png"}]})
+            self.assertEqual(len(ready), 1)
+
+        self.assertEqual(_Handler.requests.count("/a.png"), 1)
+
+    def test_cache_is_size_bounded(self):
+        """Test that the least recently used images are evicted once the cache exceeds its bound."""
+        for number in range(6):
+            _Handler.responses[f"/{number}.png"] = (200, {"Content-Type": "image/png"},
+                                                     png_bytes(color=(number * 40, 0, 0)))
+        first = self.service.process_content_images({"images": [{"id": "img_0", "src": self.base_url + "/0.png"}]})
+        image_size = os.path.getsize(first[0]["path"]) + os.path.getsize(first[0]["path"] + ".json")
+        self.service.cache_max_bytes = image_size * 3 + 1024
+
+        for number in range(1, 6):
+            self.service.process_content_images({"images": [{"id": "img_0", "src": self.base_url + f"/{number}.png"}]})
+            # Spread modification times so the least recently used order is unambiguous
+            for path in os.listdir(self.cache_dir):
+                if path.endswith('.png'):
+                    full_path = os.path.join(self.cache_dir, path)
+                    os.utime(full_path, (os.path.getmtime(full_path) - 1,) * 2)
+
+        pngs = [name for name in os.listdir(self.cache_dir) if name.endswith('.png')]
+        total = sum(os.path.getsize(os.path.join(self.cache_dir, name)) for name in os.listdir(self.cache_dir))
+        self.assertLess(len(pngs), 6)
+        self.assertFalse(os.path.exists(first[0]["path"]))
+        self.assertLessEqual(total, self.service.cache_max_bytes)
+
+class TestInlineImageLayout(unittest.TestCase):
+    """Tests for image placement in DocumentService.create_hcl."""
+
+    def setUp(self):
+        """Create a document service writing to a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = DocumentService(self.temp_dir, "/usr/local/bin/drawj2d")
+        self.qr_path = os.path.join(self.temp_dir, "qr.png")
+        Image.new('1', (10, 10)).save(self.qr_path)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _image_lines(self, content):
+        hcl_path = self.service.create_hcl("https://example.com", self.qr_path, content)
+        with open(hcl_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        return lines, [line for line in lines if line.startswith('puts "image') and '/cache/a.png' in line]
+
+    def test_image_placed_in_content_order(self):
+        """Test that an image block is written where it appears and scaled to the content width."""
+        content = {
+            "title": "Page",
+            "structured_content": [
+                {"type": "paragraph", "content": "Before"},
+                {"type": "image", "image_id": "img_0"},
+                {"type": "paragraph", "content": "After"},
+            ],
+            "images": [{"id": "img_0", "path": "/cache/a.png", "width": 4000, "height": 1000}]
+        }
+
+        lines, image_lines = self._image_lines(content)
+
+        content_width = self.service.page_width - 2 * self.service.margin
+        self.assertEqual(len(image_lines), 1)
+        self.assertIn(f" {content_width} {content_width // 4} ", image_lines[0])
+        position = lines.index(image_lines[0])
+        self.assertIn("Before", lines[position - 1])
+        self.assertIn("After", lines[position + 1])
+
+    def test_tall_image_moves_to_new_page(self):
+        """Test that an image that does not fit the rest of the page starts a new one."""
+        paragraphs = [{"type": "paragraph", "content": f"Line {i}"} for i in range(8)]
+        content = {
+            "title": "Page",
+            "structured_content": paragraphs + [{"type": "image", "image_id": "img_0"}],
+            "images": [{"id": "img_0", "path": "/cache/a.png", "width": 800, "height": 1200}]
+        }
+
+        lines, image_lines = self._image_lines(content)
+
+        position = lines.index(image_lines[0])
+        self.assertEqual(lines[position - 1], 'puts "newpage"')
+        self.assertTrue(image_lines[0].startswith(f'puts "image {self.service.margin} {self.service.margin} '))
+
+if __name__ == '__main__':
+    unittest.main()
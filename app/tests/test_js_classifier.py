@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the JSNecessityClassifier class.
+"""
+
+import os
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the classifier to test
+from services.js_classifier import JSNecessityClassifier
+
+ARTICLE_TEXT = "This is a sentence from a static news article about e-ink tablets. " * 20
+
+class TestJSNecessityClassifier(unittest.TestCase):
+    """Tests for the JSNecessityClassifier class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.classifier = JSNecessityClassifier()
+
+    def test_static_article_does_not_need_js(self):
+        """Test that a plain blog/news article stays on the static path."""
+        html = f"<html><body><nav>Home</nav><article><h1>Title</h1><p>{ARTICLE_TEXT}</p></article></body></html>"
+
+        verdict = self.classifier.classify(html)
+
+        self.assertFalse(verdict["needs_js"], verdict["reasons"])
+
+    def test_empty_spa_root_needs_js(self):
+        """Test that an empty framework root div escalates to a browser."""
+        html = (
+            '<html><head><script src="/static/bundle.js"></script></head>'
+            '<body><div id="root"></div>'
+            '<noscript>You need to enable JavaScript to run this app.</noscript></body></html>'
+        )
+
+        verdict = self.classifier.classify(html)
+
+        self.assertTrue(verdict["needs_js"])
+        self.assertIn("#root", verdict["signals"]["empty_spa_roots"])
+        self.assertTrue(verdict["signals"]["noscript_hint"])
+
+    def test_scraper_status_paragraphs_are_ignored(self):
+        """Test that the static scraper's own paragraphs don't count as content."""
+        content = {
+            "title": "App",
+            "structured_content": [
+                {"type": "paragraph", "content": "No content could be extracted from this page. " * 30},
+                {"type": "paragraph", "content": "Scraped at: 2025-04-01 10:00:00"}
+            ]
+        }
+
+        verdict = self.classifier.classify("<html><body><div></div></body></html>", content)
+
+        self.assertTrue(verdict["needs_js"])
+        self.assertEqual(verdict["signals"]["content_text_length"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the MainContentScorer class.
+"""
+
+import os
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the scorer to test
+from services.content_extractor import make_soup
+from services.main_content import MainContentScorer, find_main_content
+from scrape_simple import extract_content
+
+PARAGRAPH = "E-ink tablets are easy on the eyes, light, and last for weeks on a charge, which makes them good for reading. "
+
+BLOG_PAGE = (
+    "<html><body>"
+    "<div id='top-nav'><ul>" + "".join(f"<li><a href='/s{i}'>Section number {i}</a></li>" for i in range(30)) + "</ul></div>"
+    "<div class='layout'>"
+    "<div class='post-body'><h1>Reading on e-ink</h1>" + f"<p>{PARAGRAPH * 2}</p>" * 5 + "</div>"
+    "<div class='sidebar'><div>Popular: <a href='/a'>An older post with a long title</a>, "
+    "<a href='/b'>Another older post with a long title</a></div></div>"
+    "</div>"
+    "<div class='footer'><p>Copyright, all rights reserved, some company, some address, some city.</p></div>"
+    "</body></html>"
+)
+
+class TestMainContentScorer(unittest.TestCase):
+    """Tests for MainContentScorer."""
+
+    def test_finds_article_body(self):
+        """Test that the paragraph-rich container wins over navigation and footer."""
+        soup = make_soup(BLOG_PAGE, 'html.parser')
+
+        main = find_main_content(soup)
+
+        self.assertEqual(main.get('class'), ['post-body'])
+
+    def test_link_density_penalizes_candidates(self):
+        """Test that a block made of links scores below one made of text."""
+        html = (
+            "<body><div id='links'>" + f"<p><a href='#'>{PARAGRAPH}</a></p>" * 3 + "</div>"
+            "<div id='text'>" + f"<p>{PARAGRAPH}</p>" * 3 + "</div></body>"
+        )
+        soup = make_soup(html, 'html.parser')
+
+        scores = {c.node.get('id'): c.score for c in MainContentScorer().score(soup).values()}
+
+        self.assertGreater(scores['text'], scores['links'])
+        self.assertEqual(scores['links'], 0)
+
+    def test_widens_to_wrapper_with_title(self):
+        """Test that the result includes a title next to the scored paragraphs, but not a link list."""
+        html = (
+            "<body><article><h1>Reading on e-ink</h1><div class='entry'>" + f"<p>{PARAGRAPH}</p>" * 4 + "</div>"
+            "</article><div><ul>" + "".join(f"<li><a href='/{i}'>Related {i}</a></li>" for i in range(5)) + "</ul>"
+            "</div></body>"
+        )
+        soup = make_soup(html, 'html.parser')
+
+        self.assertEqual(find_main_content(soup).name, 'article')
+
+    def test_no_main_content_on_short_pages(self):
+        """Test that pages without enough text leave the choice to the caller."""
+        soup = make_soup("<body><div><p>Only a short sentence here, nothing more.</p></div></body>", 'html.parser')
+
+        self.assertIsNone(find_main_content(soup))
+
+    def test_extract_content_keeps_only_article(self):
+        """Test that scrape_simple output no longer carries navigation or footer text."""
+        content = extract_content(BLOG_PAGE, "https://example.com/post")["structured_content"]
+
+        self.assertEqual(content[0], {"type": "h1", "content": "Reading on e-ink"})
+        self.assertEqual(len(content), 6)
+        self.assertFalse(any("Section number" in str(block) or "Copyright" in str(block) for block in content))
+
+if __name__ == '__main__':
+    unittest.main()
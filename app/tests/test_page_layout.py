@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit tests for page breaking and the document page map.
+"""
+
+import os
+import re
+import unittest
+import tempfile
+import shutil
+import sys
+from PIL import Image
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.page_layout import Block, Line, Paginator
+from services.document_service import DocumentService
+
+def text_block(count, index=0, **options):
+    """A block of count 10-unit text lines."""
+    return Block([Line(10, [("text", 0, 0, f"{index}.{i}", "Lines", 20)]) for i in range(count)], index=index, **options)
+
+class TestPaginator(unittest.TestCase):
+    """Tests for the Paginator class."""
+
+    def setUp(self):
+        """Use pages with room for ten lines."""
+        self.paginator = Paginator(top=0, bottom=100, orphans=2, widows=2)
+
+    def _texts(self, page):
+        return [line.ops[0][3] for _, line in page.placed]
+
+    def test_long_block_split_at_line_boundaries(self):
+        """Test that a block taller than the page continues on the next pages."""
+        pages = self.paginator.paginate([text_block(25)])
+
+        self.assertEqual([len(page.placed) for page in pages], [10, 10, 5])
+        self.assertTrue(all(top + line.height <= 100 for page in pages for top, line in page.placed))
+        self.assertEqual(sum((self._texts(page) for page in pages), []), [f"0.{i}" for i in range(25)])
+
+    def test_orphans_and_widows(self):
+        """Test that a split leaves at least two lines on each side or moves the block."""
+        widow = self.paginator.paginate([text_block(7, 0), text_block(4, 1)])
+        orphan = self.paginator.paginate([text_block(9, 0), text_block(4, 1)])
+
+        # One line left for a 4-line block: it moves rather than leave an orphan
+        self.assertEqual(self._texts(orphan[1]), ["1.0", "1.1", "1.2", "1.3"])
+        # Three lines left: two stay so that two carry over
+        self.assertEqual(self._texts(widow[0])[-2:], ["1.0", "1.1"])
+        self.assertEqual(self._texts(widow[1]), ["1.2", "1.3"])
+
+    def test_heading_kept_with_next_block(self):
+        """Test that a heading moves to the next page with the start of its section."""
+        heading = text_block(1, 1, breakable=False, keep_with_next=True)
+
+        pages = self.paginator.paginate([text_block(8, 0), heading, text_block(5, 2)])
+
+        self.assertEqual(self._texts(pages[1])[:3], ["1.0", "2.0", "2.1"])
+        self.assertEqual(pages[1].blocks, [1, 2])
+
+    def test_framed_block_framed_on_each_page(self):
+        """Test that a split code block gets a frame around its part on every page."""
+        code = text_block(14, 1, frame=(5, 50, 10))
+
+        pages = self.paginator.paginate([text_block(2, 0), code])
+
+        self.assertEqual(pages[0].frames, [(5, 20, 50, 80)])
+        self.assertEqual(pages[1].frames, [(5, 0, 50, 80)])
+        self.assertEqual(len(pages[0].placed) + len(pages[1].placed), 16)
+
+    def test_image_shrunk_or_moved(self):
+        """Test that an image shrinks into at least half a page and moves otherwise."""
+        def image():
+            return Block([Line(80, [("image", 0, 0, 160, 80, "a.png")], shrinkable=True)], breakable=False)
+
+        shrunk = self.paginator.paginate([text_block(4), image()])
+        moved = self.paginator.paginate([text_block(6), image()])
+
+        self.assertEqual(len(shrunk), 1)
+        self.assertEqual(shrunk[0].placed[-1][1].ops[0][3:5], (120, 60))
+        self.assertEqual((len(moved), moved[1].placed[0][0]), (2, 0))
+
+class TestDocumentPagination(unittest.TestCase):
+    """Tests for pagination in DocumentService.create_hcl."""
+
+    def setUp(self):
+        """Create a document service writing to a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = DocumentService(self.temp_dir, "/usr/local/bin/drawj2d")
+        self.qr_path = os.path.join(self.temp_dir, "qr.png")
+        Image.new('1', (10, 10)).save(self.qr_path)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_long_document_pages_and_map(self):
+        """Test that no line runs past the bottom margin and the page map covers every page."""
+        long_text = "A sentence of ordinary words that fills part of a line. " * 60
+        content = {
+            "title": "Long",
+            "structured_content": [
+                {"type": "paragraph", "content": long_text},
+                {"type": "list", "list_type": "ul", "items": [f"Item {i}" for i in range(40)]},
+                {"type": "code", "content": "\n".join(f"line {i}" for i in range(50))},
+            ],
+        }
+
+        hcl_path = self.service.create_hcl("https://example.com", self.qr_path, content)
+        with open(hcl_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        page_map = DocumentService.load_page_map(hcl_path)
+
+        bottom = self.service.page_height - self.service.margin * 2
+        for line in lines:
+            match = re.match(r'puts "text (\d+) ([\d.]+) \\"(.*)\\""', line)
+            if match and not match.group(3).startswith("Generated"):
+                self.assertLessEqual(float(match.group(2)), bottom)
+
+        pages = page_map["pages"]
+        self.assertEqual(len(pages), lines.count('puts "newpage"') + 1)
+        self.assertGreater(len(pages), 3)
+        self.assertEqual(page_map["preamble"][0], 0)
+        for page, following in zip(pages, pages[1:]):
+            self.assertEqual(lines[page["hcl_lines"][1]], 'puts "newpage"')
+            self.assertEqual(following["hcl_lines"][0], page["hcl_lines"][1] + 1)
+        self.assertEqual(pages[-1]["hcl_lines"][1], len(lines))
+        self.assertIn("Generated", lines[-1])
+        self.assertEqual(sum("Generated" in line for line in lines), 1)
+        self.assertEqual(pages[0]["blocks"][0], 0)
+        self.assertEqual(pages[-1]["blocks"], [2])
+        self.assertEqual(sum(line.count("Item ") for line in lines), 40)
+
+if __name__ == '__main__':
+    unittest.main()
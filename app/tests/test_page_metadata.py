@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Unit tests for head-only page metadata extraction.
+"""
+
+import os
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.page_metadata import parse_head_metadata, fetch_page_metadata
+from services.http_client import HttpClient
+from test_http_client import HttpServerTestCase, _Handler
+
+HEAD = (
+    '<html><head><meta charset="utf-8"><title>Grüße &amp; more</title>'
+    '<meta property="og:title" content="OG title"><meta name="twitter:title" content="Tweet title">'
+    '<meta name="description" content="About the page"></head>'
+)
+BODY = '<body><h1>Heading</h1>' + '<p>Body text that the title never needs.</p>' * 50000 + '</body></html>'
+
+def chunked(data, size=1024):
+    """Yield data in chunks, recording how many were consumed."""
+    chunked.consumed = 0
+    for i in range(0, len(data), size):
+        chunked.consumed += 1
+        yield data[i:i + size]
+
+class TestParseHeadMetadata(unittest.TestCase):
+    """Tests for parse_head_metadata."""
+
+    def test_stops_at_end_of_head(self):
+        """Test that metadata is complete after the head and the body is not read."""
+        page = (HEAD + BODY).encode('utf-8')
+
+        metadata = parse_head_metadata(chunked(page), 'text/html')
+
+        self.assertEqual(metadata['title'], 'Grüße & more')
+        self.assertEqual(metadata['og_title'], 'OG title')
+        self.assertEqual(metadata['twitter_title'], 'Tweet title')
+        self.assertEqual(metadata['description'], 'About the page')
+        self.assertTrue(metadata['complete'])
+        self.assertNotIn('h1', metadata)
+        self.assertLessEqual(metadata['bytes_read'], 8192)
+        self.assertLessEqual(chunked.consumed, 8)
+
+    def test_reads_to_first_h1_without_title(self):
+        """Test that a page without a head title is read up to its first h1 only."""
+        page = ('<html><head></head><body><div>' + 'x' * 20000 + '</div><h1>Late <b>heading</b></h1>'
+                + BODY).encode('utf-8')
+
+        metadata = parse_head_metadata(chunked(page), 'text/html')
+
+        self.assertEqual(metadata['h1'], 'Late heading')
+        self.assertTrue(metadata['complete'])
+        self.assertLess(metadata['bytes_read'], 30000)
+
+    def test_byte_limit(self):
+        """Test that reading stops at max_bytes when no title turns up."""
+        page = ('<html><body>' + '<p>no title here</p>' * 10000 + '</body></html>').encode('utf-8')
+
+        metadata = parse_head_metadata(chunked(page), 'text/html', max_bytes=16384)
+
+        self.assertFalse(metadata['complete'])
+        self.assertLessEqual(metadata['bytes_read'], 16384)
+
+class TestFetchPageMetadata(HttpServerTestCase):
+    """Tests for fetch_page_metadata against a local server."""
+
+    def test_large_page_costs_kilobytes(self):
+        """Test that the title of a multi-megabyte page is fetched without downloading it."""
+        page = (HEAD + BODY).encode('utf-8')
+        _Handler.responses["/big"] = (200, {"Content-Type": "text/html"}, page)
+        client = HttpClient()
+        try:
+            metadata = fetch_page_metadata(client, self.base_url + "/big")
+            # The client keeps working after the partly read response was closed
+            small = fetch_page_metadata(client, self.base_url + "/")
+        finally:
+            client.close()
+
+        self.assertGreater(len(page), 2 * 1024 * 1024)
+        self.assertEqual(metadata['title'], 'Grüße & more')
+        self.assertLess(metadata['bytes_read'], 64 * 1024)
+        self.assertEqual(small['title'], 'ok')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Unit tests for multi-page article detection and merging.
+"""
+
+import os
+import json
+import unittest
+import tempfile
+import shutil
+import sys
+from unittest.mock import patch
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.pagination import PageScheme, find_next_link, continuation_pages, merge_pages
+from services.content_extractor import make_soup
+from services.http_client import HttpClient
+from test_http_client import HttpServerTestCase, _Handler
+import scrape_simple
+
+def article_page(number, last=3, query=True):
+    """Build one page of a paginated article with a shared header and footer."""
+    def href(n):
+        return f"/story?page={n}" if query else f"/story/{n}/"
+    pager = ''.join(f'<a href="{href(n)}">{n}</a>' for n in range(1, last + 1))
+    next_link = f'<a rel="next" href="{href(number + 1)}">Next</a>' if number < last else ''
+    return (f"<html><head><title>Story</title></head><body><article>"
+            f"<h1>The whole story</h1>"
+            f"<p>Share this story with your friends and family today.</p>"
+            f"<p>Part {number} of the story is told here in a long enough paragraph.</p>"
+            f"<p>Part {number} continues with a second paragraph of readable text.</p>"
+            f'<img src="/images/part{number}.png" alt="Part {number}">'
+            f'<img src="/images/logo.png" alt="Logo">'
+            f"<p>Copyright Example News, all rights reserved.</p>"
+            f'<nav class="pagination">{pager}{next_link}</nav>'
+            f"</article></body></html>")
+
+class TestPageDetection(unittest.TestCase):
+    """Tests for next-link detection and page URL schemes."""
+
+    def test_query_scheme(self):
+        """Test a page number in the query string, with the first page unnumbered."""
+        scheme = PageScheme.from_urls("https://example.com/story?id=7", "https://example.com/story?id=7&page=2")
+
+        self.assertEqual(scheme.url_for(2), "https://example.com/story?id=7&page=3")
+        self.assertEqual(scheme.index_of("https://example.com/story?page=4&id=7"), 3)
+        self.assertIsNone(scheme.index_of("https://example.com/story?id=8&page=4"))
+
+    def test_offset_and_path_schemes(self):
+        """Test offsets and page numbers in the path."""
+        offset = PageScheme.from_urls("https://example.com/list", "https://example.com/list?start=20")
+        path = PageScheme.from_urls("https://example.com/news/story", "https://example.com/news/story/page/2")
+        numbered = PageScheme.from_urls("https://example.com/story/2/", "https://example.com/story/3/", in_pagination=True)
+
+        self.assertEqual(offset.url_for(2), "https://example.com/list?start=40")
+        self.assertEqual(path.url_for(3), "https://example.com/news/story/page/4")
+        self.assertEqual(numbered.url_for(1), "https://example.com/story/3/")
+        self.assertEqual(numbered.index_of("https://example.com/story/5/"), 3)
+
+    def test_unrelated_next_link_ignored(self):
+        """Test that a "next article" link is not taken for a continuation page."""
+        soup = make_soup('<html><body><p>Text</p><a rel="next" href="/another-story">Next story</a></body></html>')
+
+        self.assertEqual(find_next_link(soup, "https://example.com/story"), "https://example.com/another-story")
+        self.assertEqual(continuation_pages(soup, "https://example.com/story", 10), (None, [], True))
+
+    def test_numbered_urls_need_page_evidence(self):
+        """Test that two numbered URLs only form a scheme when the number is shown to be a page."""
+        self.assertIsNone(PageScheme.from_urls("https://example.com/posts/123", "https://example.com/posts/124"))
+        self.assertIsNone(PageScheme.from_urls("https://example.com/story?id=7", "https://example.com/story?id=8"))
+        self.assertIsNotNone(PageScheme.from_urls("https://example.com/story/page/2", "https://example.com/story/page/3"))
+        self.assertIsNotNone(PageScheme.from_urls("https://example.com/story?page=2", "https://example.com/story?page=3"))
+        self.assertIsNotNone(PageScheme.from_urls("https://example.com/story/1/", "https://example.com/story/2/"))
+
+    def test_next_post_link_not_taken_for_pages(self):
+        """Test that a rel=next link to the next post does not pull in neighbouring posts."""
+        soup = make_soup('<html><head><link rel="next" href="/posts/124"></head><body>'
+                         '<article><p>Post 123</p></article>'
+                         '<aside><a href="/posts/130">Popular post</a></aside></body></html>')
+
+        self.assertEqual(continuation_pages(soup, "https://blog.example/posts/123", 10), (None, [], True))
+
+    def test_next_link_in_pager_continues_numbered_page(self):
+        """Test that a middle page numbered in the path continues through its pagination bar."""
+        soup = make_soup(article_page(2, last=4, query=False))
+
+        _, urls, complete = continuation_pages(soup, "https://example.com/story/2/", 10)
+
+        self.assertTrue(complete)
+        self.assertEqual(urls, ["https://example.com/story/3/", "https://example.com/story/4/"])
+
+    def test_pager_gives_all_pages_up_to_cap(self):
+        """Test that the numbered pager yields every continuation page, capped."""
+        soup = make_soup(article_page(1, last=8))
+
+        _, urls, complete = continuation_pages(soup, "https://example.com/story", 5)
+
+        self.assertTrue(complete)
+        self.assertEqual(urls, [f"https://example.com/story?page={n}" for n in range(2, 6)])
+
+class TestMergePages(unittest.TestCase):
+    """Tests for merge_pages."""
+
+    def _page(self, number):
+        return {
+            "title": "Story",
+            "structured_content": [
+                {"type": "heading", "level": 1, "content": "The whole story"},
+                {"type": "paragraph", "content": f"Part {number} of the story."},
+                {"type": "image", "image_id": "img_0"},
+                {"type": "image", "image_id": "img_1"},
+                {"type": "paragraph", "content": "Copyright Example News"},
+            ],
+            "images": [{"id": "img_0", "src": f"https://example.com/part{number}.png", "alt": ""},
+                       {"id": "img_1", "src": "https://example.com/logo.png", "alt": ""}],
+        }
+
+    def test_repeated_blocks_dropped_and_images_renumbered(self):
+        """Test that the header appears once, the footer and repeated logo not at all, and image ids stay unique."""
+        merged = merge_pages([self._page(1), self._page(2), self._page(3)])
+
+        contents = [block.get("content") or block["image_id"] for block in merged["structured_content"]]
+        self.assertEqual(contents, ["The whole story", "Part 1 of the story.", "img_0",
+                                    "Part 2 of the story.", "img_1", "Part 3 of the story.", "img_2"])
+        self.assertEqual([image["src"] for image in merged["images"]], [
+            "https://example.com/part1.png", "https://example.com/part2.png", "https://example.com/part3.png"])
+        self.assertEqual([image["id"] for image in merged["images"]], ["img_0", "img_1", "img_2"])
+
+class TestPaginatedScrape(HttpServerTestCase):
+    """Tests for scrape_simple on a paginated article served locally."""
+
+    def setUp(self):
+        """Start the server and use a client without cache."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = HttpClient()
+        self.patcher = patch.object(scrape_simple, "get_default_client", return_value=self.client)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Stop the patch, close the client and remove the output."""
+        self.patcher.stop()
+        self.client.close()
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def _scrape(self, path):
+        output_path = os.path.join(self.temp_dir, "content.json")
+        self.assertEqual(scrape_simple.scrape_simple(self.base_url + path, output_path), 0)
+        with open(output_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_query_pages_merged(self):
+        """Test that ?page=2 and ?page=3 are fetched and merged in order."""
+        for number in (1, 2, 3):
+            _Handler.responses[f"/story?page={number}"] = (200, {"Content-Type": "text/html"},
+                                                           article_page(number).encode('utf-8'))
+        _Handler.responses["/story"] = _Handler.responses["/story?page=1"]
+
+        result = self._scrape("/story")
+
+        texts = [block.get("content", "") for block in result["structured_content"]]
+        parts = [text for text in texts if text.startswith("Part")]
+        self.assertEqual(parts, [f"Part {n} {rest}" for n in (1, 2, 3) for rest in (
+            "of the story is told here in a long enough paragraph.",
+            "continues with a second paragraph of readable text.")])
+        self.assertEqual(sum("Share this story" in text for text in texts), 1)
+        self.assertEqual(sum("Copyright" in text for text in texts), 0)
+        self.assertEqual(len(result["pages"]), 3)
+        self.assertEqual(len({image["id"] for image in result["images"]}), len(result["images"]))
+
+    def test_path_pages_followed(self):
+        """Test following rel=next through path-numbered pages when the pager has no last page."""
+        for number in (1, 2, 3):
+            page = article_page(number, last=3, query=False).replace('class="pagination"', '')
+            # Only the next link, no numbered pager
+            page = page.split('<nav')[0] + (f'<a rel="next" href="/story/{number + 1}/">Next</a>' if number < 3 else '') + '</article></body></html>'
+            _Handler.responses[f"/story/{number}/"] = (200, {"Content-Type": "text/html"}, page.encode('utf-8'))
+
+        result = self._scrape("/story/1/")
+
+        self.assertEqual(result["pages"], [self.base_url + f"/story/{n}/" for n in (1, 2, 3)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Unit tests for .rmdoc merging and chunked drawj2d conversion.
+"""
+
+import os
+import json
+import stat
+import zipfile
+import unittest
+import tempfile
+import shutil
+import textwrap
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.rmdoc import RmdocError, index_values, merge_rmdocs, read_rmdoc
+from services.document_service import DocumentService
+
+# Fake drawj2d: writes an .rmdoc with one page per HCL page, each holding that page's
+# text commands, and logs its start and end time
+FAKE_DRAWJ2D = textwrap.dedent('''\
+    #!{python}
+    import sys, json, time, uuid, zipfile
+    started = time.time()
+    args = sys.argv[1:]
+    out, hcl = args[args.index("-o") + 1], args[-1]
+    if "-Trmdoc" not in args:
+        sys.exit(2)
+    with open(hcl) as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith('puts "size'), lines[0]
+    pages = [[]]
+    for line in lines:
+        if line == 'puts "newpage"':
+            pages.append([])
+        elif line.startswith('puts "text'):
+            pages[-1].append(line)
+    time.sleep({sleep})
+    doc, ids = str(uuid.uuid4()), [str(uuid.uuid4()) for _ in pages]
+    content = {{"fileType": "notebook", "formatVersion": 2, "pageCount": len(ids),
+               "cPages": {{"pages": [{{"id": i, "idx": {{"value": "b" + chr(97 + n)}}}} for n, i in enumerate(ids)]}}}}
+    with zipfile.ZipFile(out, "w") as z:
+        z.writestr(doc + ".content", json.dumps(content))
+        z.writestr(doc + ".metadata", "{{}}")
+        for page_id, page in zip(ids, pages):
+            z.writestr(doc + "/" + page_id + ".rm", "\\n".join(page))
+    with open({log!r}, "a") as f:
+        f.write(f"{{started}} {{time.time()}}\\n")
+''')
+
+def write_rmdoc(path, pages, content_extra=None):
+    """Write an .rmdoc whose pages hold the given texts, listed in the plain pages list."""
+    ids = [f"page-{i}" for i in range(len(pages))]
+    content = {"fileType": "notebook", "pageCount": len(ids), "pages": ids}
+    content.update(content_extra or {})
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr("doc.content", json.dumps(content))
+        archive.writestr("doc.metadata", "{}")
+        for page_id, text in zip(ids, pages):
+            archive.writestr(f"doc/{page_id}.rm", text)
+
+class TestRmdoc(unittest.TestCase):
+    """Tests for reading and merging .rmdoc archives."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_merge_keeps_page_order(self):
+        """Test that merged pages follow the archives' order with fresh ids and metadata."""
+        paths = [os.path.join(self.temp_dir, f"{i}.rmdoc") for i in range(3)]
+        write_rmdoc(paths[0], ["a", "b"])
+        write_rmdoc(paths[1], ["c"])
+        write_rmdoc(paths[2], ["d", "e"])
+        out = os.path.join(self.temp_dir, "merged.rmdoc")
+
+        count = merge_rmdocs(paths, out, "Article")
+        content, pages = read_rmdoc(out)
+
+        self.assertEqual(count, 5)
+        self.assertEqual([data for data, _ in pages], [b"a", b"b", b"c", b"d", b"e"])
+        self.assertEqual((content["pageCount"], len(set(content["pages"]))), (5, 5))
+        with zipfile.ZipFile(out) as archive:
+            metadata_name = next(name for name in archive.namelist() if name.endswith('.metadata'))
+            self.assertEqual(json.loads(archive.read(metadata_name))["visibleName"], "Article")
+
+    def test_index_values_sort_in_order(self):
+        """Test that rebuilt cPages indices sort like the page numbers."""
+        values = index_values(700)
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), 700)
+
+    def test_missing_page_raises(self):
+        """Test that an archive listing a page it does not contain is rejected."""
+        path = os.path.join(self.temp_dir, "broken.rmdoc")
+        write_rmdoc(path, ["a"], {"pages": ["page-0", "page-9"]})
+
+        with self.assertRaises(RmdocError):
+            read_rmdoc(path)
+
+class TestChunkedConversion(unittest.TestCase):
+    """Tests for converting long documents in concurrent page chunks."""
+
+    def setUp(self):
+        """Create a document service with a fake drawj2d."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "drawj2d.log")
+        drawj2d = os.path.join(self.temp_dir, "drawj2d")
+        with open(drawj2d, 'w') as f:
+            f.write(FAKE_DRAWJ2D.format(python=sys.executable, sleep=0.5, log=self.log_path))
+        os.chmod(drawj2d, os.stat(drawj2d).st_mode | stat.S_IEXEC)
+        self.service = DocumentService(os.path.join(self.temp_dir, "docs"), drawj2d)
+        self.service.convert_workers = 3
+        self.service.chunk_pages = 2
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _document(self, sections):
+        content = {"title": "Long article", "structured_content": []}
+        for i in range(sections):
+            content["structured_content"] += [
+                {"type": "h2", "content": f"Section {i}"},
+                {"type": "paragraph", "content": f"Paragraph of section {i}. " * 80},
+            ]
+        return self.service.create_hcl("https://example.com/long", "", content)
+
+    def test_chunks_reproduce_pages(self):
+        """Test that chunks hold every page once, each starting with the preamble and its font."""
+        hcl_path = self._document(12)
+        page_map = DocumentService.load_page_map(hcl_path)
+        with open(hcl_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        preamble = lines[:page_map["preamble"][1]]
+
+        chunk_paths = self.service._write_chunks(hcl_path, page_map, 3)
+        body = []
+        for chunk_path in chunk_paths:
+            with open(chunk_path, 'r', encoding='utf-8') as f:
+                chunk = f.read().splitlines()
+            self.assertEqual(chunk[:len(preamble)], preamble)
+            rest = chunk[len(preamble):]
+            if rest[0].startswith('puts "set_font'):
+                rest = rest[1:]
+            body.extend(rest if not body else ['puts "newpage"'] + rest)
+
+        self.assertEqual(len(chunk_paths), 3)
+        self.assertEqual(body, lines[len(preamble):])
+
+    def test_long_document_converted_concurrently_and_merged(self):
+        """Test that chunks convert in parallel and merge into one .rmdoc with pages in order."""
+        hcl_path = self._document(12)
+        page_map = DocumentService.load_page_map(hcl_path)
+        with open(hcl_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        rmdoc_path = self.service.create_rmdoc(hcl_path, "https://example.com/long")
+
+        self.assertTrue(rmdoc_path.endswith('.rmdoc'))
+        _, pages = read_rmdoc(rmdoc_path)
+        self.assertEqual(len(pages), len(page_map["pages"]))
+        for (data, _), entry in zip(pages, page_map["pages"]):
+            first, end = entry["hcl_lines"]
+            expected = [line for line in lines[first:end] if line.startswith('puts "text')]
+            self.assertEqual(data.decode('utf-8').split('\n'), expected)
+
+        with open(self.log_path) as f:
+            runs = [tuple(map(float, line.split())) for line in f]
+        self.assertEqual(len(runs), 3)
+        self.assertLess(max(start for start, _ in runs), min(end for _, end in runs))
+        self.assertEqual([name for name in os.listdir(self.service.temp_dir) if '.part' in name], [])
+
+    def test_short_document_not_chunked(self):
+        """Test that a document under two chunks of pages is converted in one run."""
+        hcl_path = self._document(1)
+
+        self.assertEqual(self.service._chunk_count(DocumentService.load_page_map(hcl_path)), 1)
+        self.assertEqual(self.service._chunk_count(None), 1)
+
+if __name__ == '__main__':
+    unittest.main()
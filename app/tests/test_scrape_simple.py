@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the extraction in scrape_simple.py and its DedupIndex.
+"""
+
+import os
+import time
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from scrape_simple import extract_content
+from services.dedup import DedupIndex
+
+SENTENCE = "Text in block {} with enough words to count as significant content."
+
+class TestDedupIndex(unittest.TestCase):
+    """Tests for the DedupIndex class."""
+
+    def test_exact_and_contained_text(self):
+        """Test that exact copies and fragments of indexed text are found."""
+        index = DedupIndex()
+        index.add("The quick brown  fox jumps over the lazy dog")
+
+        self.assertTrue(index.contains("The quick brown fox jumps over the lazy dog"))
+        self.assertTrue(index.contains("brown fox jumps over"))
+        self.assertFalse(index.contains("the lazy cat"))
+        self.assertFalse(index.contains("fox"))
+        self.assertEqual(len(index), 1)
+
+class TestExtractContent(unittest.TestCase):
+    """Tests for extract_content."""
+
+    def test_div_text_already_in_paragraph_is_skipped(self):
+        """Test that a wrapper div does not repeat its paragraph."""
+        html = (
+            f"<html><body><h1>Title</h1><div><p>{SENTENCE.format(1)}</p></div>"
+            f"<div>{SENTENCE.format(2)}</div></body></html>"
+        )
+
+        content = extract_content(html, "https://example.com/")["structured_content"]
+
+        self.assertEqual([block["content"] for block in content], ["Title", SENTENCE.format(1), SENTENCE.format(2)])
+
+    def test_pathological_nested_page_is_linear(self):
+        """Test that thousands of nested and sibling divs are deduplicated quickly."""
+        depth = 1500
+        nested = "".join(f"<div>{SENTENCE.format(i)} " for i in range(depth)) + "</div>" * depth
+        siblings = "".join(f"<div>{SENTENCE.format(depth + i)}</div>" for i in range(3000))
+        html = f"<html><body>{nested}{siblings}</body></html>"
+
+        start = time.perf_counter()
+        content = extract_content(html, "https://example.com/")["structured_content"]
+        elapsed = time.perf_counter() - start
+
+        # The quadratic scans took about six seconds for this page
+        self.assertLess(elapsed, 5.0)
+        self.assertEqual(content[0]["content"], (" ".join(SENTENCE.format(i) for i in range(10)))[:500])
+        self.assertEqual(content[-1]["content"], SENTENCE.format(depth + 2999))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ScraperRoutingTable class.
+"""
+
+import os
+import time
+import threading
+import unittest
+import tempfile
+import shutil
+from unittest.mock import patch
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the table to test
+from services.scraper_routing import ScraperRoutingTable
+from services.web_scraper_service import WebScraperService
+
+class TestScraperRoutingTable(unittest.TestCase):
+    """Tests for the ScraperRoutingTable class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "routes.json")
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_best_strategy_moves_to_front_and_persists(self):
+        """Test that the best scraper for a domain is remembered across instances."""
+        table = ScraperRoutingTable(self.path)
+        table.record("https://www.example.com/a", "simple", 0.0, 2.0)
+        table.record("https://www.example.com/a", "playwright", 0.9, 12.0)
+
+        reloaded = ScraperRoutingTable(self.path)
+
+        self.assertEqual(reloaded.best_strategy("https://example.com/b"), "playwright")
+        self.assertEqual(
+            reloaded.order("https://example.com/b", ["simple", "playwright", "browser"]),
+            ["playwright", "simple", "browser"]
+        )
+        self.assertIsNone(reloaded.best_strategy("https://other.org/"))
+
+    def test_faster_strategy_wins_at_similar_quality(self):
+        """Test that near-equal quality prefers the quicker scraper."""
+        table = ScraperRoutingTable(self.path)
+        table.record("https://example.com/", "playwright", 0.95, 15.0)
+        table.record("https://example.com/", "simple", 0.9, 1.0)
+
+        self.assertEqual(table.best_strategy("https://example.com/"), "simple")
+
+    def test_old_observations_decay_away(self):
+        """Test that stale records stop routing so site changes are re-learned."""
+        table = ScraperRoutingTable(self.path, half_life_days=1)
+        table.record("https://example.com/", "playwright", 0.9, 10.0)
+
+        with patch('services.scraper_routing.time.time', return_value=time.time() + 3 * 86400):
+            self.assertIsNone(table.best_strategy("https://example.com/"))
+
+    def test_shared_table_keeps_concurrent_records(self):
+        """Test that services sharing one table record every share's outcome."""
+        table = ScraperRoutingTable(self.path)
+        services = [WebScraperService(self.temp_dir, routing=table) for _ in range(4)]
+
+        def record(number, service):
+            for i in range(10):
+                service.routing.record(f"https://site{number}-{i}.example/", "simple", 0.8, 1.0)
+
+        threads = [threading.Thread(target=record, args=(n, s)) for n, s in enumerate(services)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reloaded = ScraperRoutingTable(self.path)
+        self.assertEqual(sum(bool(reloaded.stats(f"https://site{n}-{i}.example/"))
+                             for n in range(4) for i in range(10)), 40)
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.endswith('.tmp')], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for font-metric text layout.
+"""
+
+import os
+import json
+import unittest
+import tempfile
+import shutil
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services import text_layout
+from services.text_layout import TextLayout, builtin_width, HELVETICA_ASCII
+
+SENTENCE = ("The quick brown fox jumps over the lazy dog while Wide WWW MMM capitals "
+            "and illicit little lines of narrow letters share the paragraph. ")
+
+class TestTextLayout(unittest.TestCase):
+    """Tests for the TextLayout class."""
+
+    def setUp(self):
+        """Create a cache directory and a layout engine using it."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.layout = TextLayout(cache_dir=self.cache_dir, scale=1.0)
+
+    def tearDown(self):
+        """Remove the cache directory."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_measure_uses_advance_widths(self):
+        """Test that widths follow the font metrics and scale with size."""
+        self.assertAlmostEqual(self.layout.measure("W", "Lines", 1000), 944)
+        self.assertAlmostEqual(self.layout.measure("iii", "Lines", 20), 3 * 222 * 20 / 1000)
+        self.assertGreater(self.layout.measure("Bold", "Lines-Bold", 20), self.layout.measure("Bold", "Lines", 20))
+        self.assertEqual(self.layout.measure("code", "DejaVu Sans Mono", 10), 4 * 6)
+        self.assertEqual(builtin_width(ord("é"), HELVETICA_ASCII), builtin_width(ord("e"), HELVETICA_ASCII))
+        self.assertEqual(builtin_width(ord("漢"), HELVETICA_ASCII), 1000)
+
+    def test_wrap_fills_lines_without_overflow(self):
+        """Test that every line fits, the next word would not, and no text is lost."""
+        text = SENTENCE * 20
+        width = 600
+
+        lines = self.layout.wrap(text, "Lines", 20, width)
+
+        self.assertEqual(' '.join(lines), ' '.join(text.split()))
+        for line, next_line in zip(lines, lines[1:]):
+            self.assertLessEqual(self.layout.measure(line, "Lines", 20), width)
+            next_word = next_line.split()[0]
+            self.assertGreater(self.layout.measure(line + " " + next_word, "Lines", 20), width)
+
+    def test_overlong_word_split(self):
+        """Test that a word wider than the line is broken between characters."""
+        lines = self.layout.wrap("short " + "x" * 200 + " end", "Lines", 20, 200)
+
+        self.assertEqual(lines[0], "short")
+        self.assertEqual(''.join(lines[1:]).replace(' ', ''), "x" * 200 + "end")
+        self.assertTrue(all(self.layout.measure(line, "Lines", 20) <= 200 for line in lines))
+        self.assertEqual(self.layout.wrap("   ", "Lines", 20, 200), [])
+
+    def test_width_table_cached_on_disk(self):
+        """Test that a font's width table is written once and loaded by later engines."""
+        self.layout.measure("text", "Lines", 20)
+        self.layout.measure("text", "Lines", 32)
+        cache_path = os.path.join(self.cache_dir, "Lines.json")
+
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        second = TextLayout(cache_dir=self.cache_dir, scale=1.0)
+
+        self.assertEqual(cached["source"], "afm:Helvetica")
+        self.assertEqual(self.layout.stats()["tables_built"], 1)
+        self.assertEqual(second.measure("text", "Lines", 20), self.layout.measure("text", "Lines", 20))
+        self.assertEqual(second.stats()["tables_loaded"], 1)
+        self.assertEqual(second.stats()["tables_built"], 0)
+
+    def test_python_and_numpy_paths_agree(self):
+        """Test that the pure-Python running totals match the array ones when numpy is installed."""
+        text = ' '.join((SENTENCE * 5).split()) + " – “quoted” € →"
+        table = self.layout.table("Lines", 20)
+        python_totals = table.cumulative(text[:64])
+        self.assertEqual(len(python_totals), 65)
+
+        if text_layout.np is None:
+            self.skipTest("numpy is not installed")
+        array_totals = table.cumulative(text)
+        saved, table.array = table.array, None
+        try:
+            self.assertEqual(list(array_totals), table.cumulative(text))
+        finally:
+            table.array = saved
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the WebScraperService class.
+"""
+
+import os
+import time
+import unittest
+import tempfile
+import shutil
+import textwrap
+from unittest.mock import patch
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the service to test
+from services.web_scraper_service import WebScraperService
+
+# Fake scraper script: sleeps, then writes a JSON result with the given paragraphs
+FAKE_SCRAPER = textwrap.dedent('''
+    import sys, json, time
+    time.sleep({sleep})
+    content = {{"title": "{name}", "structured_content": [
+        {{"type": "paragraph", "content": "{name} paragraph " * 20}} for _ in range({blocks})
+    ]}}
+    with open(sys.argv[2], "w") as f:
+        json.dump(content, f)
+    with open(sys.argv[2] + ".html", "w") as f:
+        f.write("<html><body><article>" + "text " * 200 + "</article></body></html>")
+''')
+
+class TestWebScraperService(unittest.TestCase):
+    """Tests for the WebScraperService class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        shutil.rmtree(self.temp_dir)
+
+    def _fake_script(self, name, sleep, blocks):
+        """Write a fake scraper script and return its path."""
+        path = os.path.join(self.temp_dir, f"fake_{name}.py")
+        with open(path, 'w') as f:
+            f.write(FAKE_SCRAPER.format(name=name, sleep=sleep, blocks=blocks))
+        return path
+
+    def test_hedged_scrape_keeps_first_good_result(self):
+        """Test that a fast good static result wins and the slow browser scraper is cancelled."""
+        service = WebScraperService(self.temp_dir, scrape_mode="hedged", hedge_delay=0)
+        service.scraper_scripts = {
+            "simple": self._fake_script("simple", 0, 12),
+            "playwright": self._fake_script("playwright", 30, 12)
+        }
+
+        with patch.object(service, '_extract_title_directly', return_value=""):
+            start = time.time()
+            content = service.scrape("https://example.com/article")
+            elapsed = time.time() - start
+
+        self.assertEqual(content["title"], "simple")
+        self.assertLess(elapsed, 15)
+
+    def test_browser_scraper_without_output_does_not_reuse_static_result(self):
+        """Test that a scraper exiting cleanly without output fails instead of returning the static file."""
+        service = WebScraperService(self.temp_dir)
+        static = os.path.join(self.temp_dir, "fake_static.py")
+        with open(static, 'w') as f:
+            f.write(textwrap.dedent('''
+                import sys, json
+                with open(sys.argv[2], "w") as f:
+                    json.dump({"title": "static", "structured_content": [{"type": "paragraph", "content": "Loading"}]}, f)
+                with open(sys.argv[2] + ".html", "w") as f:
+                    f.write('<html><body><div id="root"></div></body></html>')
+            '''))
+        silent = os.path.join(self.temp_dir, "fake_silent.py")
+        with open(silent, 'w') as f:
+            f.write("import sys\n")
+        service.scraper_scripts = {"simple": static, "playwright": silent}
+
+        with patch.object(service, '_extract_title_directly', return_value=""), \
+                patch('services.web_scraper_service.retry_operation', lambda op, *args, **kwargs: op(*args)):
+            content = service.scrape("https://example.com/app")
+
+        self.assertEqual(content["title"], "static")
+        self.assertEqual(service.routing.stats("https://example.com/app")["playwright"]["score"], 0.0)
+
+    def test_scraper_order_follows_routing_table(self):
+        """Test that a domain's best scraper from the routing table is tried first."""
+        service = WebScraperService(self.temp_dir)
+        default = [name for name, _ in service._scraper_order("https://example.com/a")]
+        service.routing.record("https://example.com/a", default[-1], 0.9, 5.0)
+
+        order = [name for name, _ in service._scraper_order("https://example.com/b")]
+
+        self.assertEqual(order, [default[-1]] + default[:-1])
+        self.assertEqual([name for name, _ in service._scraper_order("https://other.org/")], default)
+
+    def test_score_content_ignores_scraper_status_paragraphs(self):
+        """Test that quality scoring only counts real content blocks."""
+        service = WebScraperService(self.temp_dir)
+        content = {"structured_content": [
+            {"type": "paragraph", "content": "Scraped at: 2025-04-01 10:00:00"}
+        ]}
+
+        self.assertEqual(service._score_content(content), 0)
+
+    def test_validate_and_fix_content_normalizes_blocks(self):
+        """Test that validation trims, merges short paragraphs and keeps list items once."""
+        service = WebScraperService(self.temp_dir, merge_paragraph_chars=20)
+        content = {"title": "Article", "structured_content": [
+            {"type": "paragraph", "content": " Share "},
+            {"type": "paragraph", "content": "Tweet"},
+            {"type": "list", "list_type": "ul", "items": ["a", " ", "b"]},
+            {"type": "paragraph", "content": "   "},
+        ]}
+        empty = {"title": "Article", "structured_content": [{"type": "paragraph", "content": " "}]}
+
+        fixed = service._validate_and_fix_content(content, "https://example.com/a")
+
+        self.assertEqual(fixed["structured_content"], [
+            {"type": "paragraph", "content": "Share Tweet"},
+            {"type": "list", "list_type": "ul", "items": ["a", "b"]},
+        ])
+        self.assertEqual(fixed["images"], [])
+        self.assertIn("could not be properly extracted",
+                      service._validate_and_fix_content(empty, "https://example.com/a")["structured_content"][0]["content"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the WebDriverPool class.
+"""
+
+import os
+import unittest
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.webdriver_pool import WebDriverPool
+
+class FakeDriver:
+    """Records the WebDriver commands the pool sends."""
+
+    def __init__(self):
+        self.commands = []
+        self.cookies = {"session": "abc"}
+        self.current_url = "about:blank"
+        self.window_handles = ["main"]
+        self.responsive = True
+        self.quit_called = False
+        self.switch_to = self
+
+    def execute_script(self, script):
+        if not self.responsive:
+            raise RuntimeError("browser is gone")
+        self.commands.append("script")
+        return 1
+
+    def delete_all_cookies(self):
+        self.commands.append("delete_cookies")
+        self.cookies.clear()
+
+    def get(self, url):
+        self.commands.append(f"get {url}")
+        self.current_url = url
+
+    def window(self, handle):
+        self.commands.append(f"switch {handle}")
+
+    def close(self):
+        self.window_handles.pop()
+
+    def quit(self):
+        self.quit_called = True
+
+class TestWebDriverPool(unittest.TestCase):
+    """Tests for session reuse, reset and retirement."""
+
+    def setUp(self):
+        """Create a pool whose factory records the drivers it creates."""
+        self.created = []
+        self.pool = WebDriverPool(self._create, max_uses=3)
+
+    def _create(self):
+        driver = FakeDriver()
+        self.created.append(driver)
+        return driver
+
+    def test_session_reused_after_reset(self):
+        """Test that the second scrape gets the same browser, reset to a blank page."""
+        with self.pool.session() as driver:
+            driver.get("https://example.com/a")
+            driver.cookies["tracking"] = "1"
+            driver.window_handles.append("popup")
+        with self.pool.session() as again:
+            pass
+
+        self.assertIs(again, driver)
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(driver.current_url, "about:blank")
+        self.assertEqual(driver.cookies, {})
+        self.assertEqual(driver.window_handles, ["main"])
+        self.assertLess(driver.commands.index("delete_cookies"), driver.commands.index("get about:blank"))
+        self.assertEqual(self.pool.stats()["reused"], 1)
+
+    def test_unresponsive_session_replaced(self):
+        """Test that a session failing the health check is quit and replaced."""
+        with self.pool.session() as driver:
+            pass
+        driver.responsive = False
+
+        with self.pool.session() as replacement:
+            pass
+
+        self.assertIsNot(replacement, driver)
+        self.assertTrue(driver.quit_called)
+        self.assertEqual(self.pool.stats()["unhealthy"], 1)
+
+    def test_session_retired_after_max_uses(self):
+        """Test the lifetime cap, also when a scrape raised."""
+        for _ in range(2):
+            with self.pool.session():
+                pass
+        with self.assertRaises(ValueError):
+            with self.pool.session():
+                raise ValueError("page failed")
+
+        with self.pool.session() as fresh:
+            pass
+
+        self.assertEqual(len(self.created), 2)
+        self.assertTrue(self.created[0].quit_called)
+        self.assertIs(fresh, self.created[1])
+
+    def test_close_quits_idle_sessions(self):
+        """Test that close quits the browsers kept open."""
+        with self.pool.session() as driver:
+            pass
+
+        self.pool.close()
+
+        self.assertTrue(driver.quit_called)
+        self.assertEqual(self.pool.stats()["idle"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pre-forked scraper worker pool.
+"""
+
+import os
+import json
+import unittest
+import tempfile
+import shutil
+import threading
+import sys
+
+# Add parent directory to path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import the code to test
+from services.worker_pool import ScraperWorkerPool, WorkerError
+from test_http_client import HttpServerTestCase, _Handler
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Scraper whose behavior is chosen by the URL
+FAKE_SCRAPER = '''
+import os, sys, json, time
+
+def scrape(url, output_path):
+    if "crash" in url:
+        os._exit(3)
+    if "hang" in url:
+        time.sleep(60)
+    print("scraper chatter on stdout")
+    os.write(1, b"raw write to fd 1\\n")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"title": url, "structured_content": [{"type": "paragraph", "content": str(os.getpid())}]}, f)
+    return 0
+'''
+
+FAKE_WORKER = '''
+import sys
+sys.path.insert(0, {app_dir!r})
+import scraper_worker
+scraper_worker.SCRAPERS["fake"] = ("fake_scraper", "scrape")
+scraper_worker.main()
+'''
+
+class TestScraperWorkerPool(unittest.TestCase):
+    """Tests for supervision and recycling with a scripted scraper."""
+
+    def setUp(self):
+        """Write the fake scraper and worker scripts."""
+        self.temp_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.temp_dir, "fake_scraper.py"), 'w') as f:
+            f.write(FAKE_SCRAPER)
+        worker_script = os.path.join(self.temp_dir, "fake_worker.py")
+        with open(worker_script, 'w') as f:
+            f.write(FAKE_WORKER.format(app_dir=APP_DIR))
+        self.pool = ScraperWorkerPool(size=1, max_jobs=3, job_timeout=20,
+                                      scrapers=["fake"], worker_script=worker_script)
+
+    def tearDown(self):
+        """Stop the workers and remove the scripts."""
+        self.pool.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _scrape(self, url, **kwargs):
+        reply = self.pool.run("fake", url, os.path.join(self.temp_dir, "out.json"), **kwargs)
+        return reply, int(reply["content"]["structured_content"][0]["content"])
+
+    def test_worker_reused_and_stdout_isolated(self):
+        """Test that jobs share one process and scraper output does not corrupt replies."""
+        self.pool.start()
+        first, first_pid = self._scrape("https://example.com/a")
+        second, second_pid = self._scrape("https://example.com/b")
+
+        self.assertEqual(first["exit_code"], 0)
+        self.assertEqual(second["content"]["title"], "https://example.com/b")
+        self.assertEqual(first_pid, second_pid)
+
+    def test_crashed_worker_replaced(self):
+        """Test that a crash fails only its job and the next job gets a new worker."""
+        _, before = self._scrape("https://example.com/a")
+
+        with self.assertRaises(WorkerError):
+            self._scrape("https://example.com/crash")
+        _, after = self._scrape("https://example.com/b")
+
+        self.assertNotEqual(before, after)
+        self.assertEqual(self.pool.stats()["failures"], 1)
+        self.assertEqual(self.pool.stats()["workers"], 1)
+
+    def test_timeout_and_cancel_kill_worker(self):
+        """Test that hung and cancelled jobs give up without waiting for the scraper."""
+        with self.assertRaises(WorkerError):
+            self._scrape("https://example.com/hang", timeout=0.5)
+
+        cancelled = threading.Event()
+        threading.Timer(0.3, cancelled.set).start()
+        with self.assertRaises(WorkerError):
+            self._scrape("https://example.com/hang", cancelled=cancelled)
+
+        self.assertEqual(self._scrape("https://example.com/a")[0]["exit_code"], 0)
+
+    def test_worker_recycled_after_max_jobs(self):
+        """Test that a worker is replaced after max_jobs jobs."""
+        pids = [self._scrape(f"https://example.com/{i}")[1] for i in range(4)]
+
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[3], pids[0])
+        self.assertEqual(self.pool.stats()["recycled"], 1)
+
+class TestScraperWorkerIntegration(HttpServerTestCase):
+    """Runs the real static scraper on a pooled worker."""
+
+    def test_simple_scraper_on_worker(self):
+        """Test that the worker returns the structured content of the simple scraper."""
+        _Handler.responses["/article"] = (200, {"Content-Type": "text/html; charset=utf-8"}, (
+            "<html><head><title>Pooled</title></head><body><article><h1>Pooled</h1>"
+            + "<p>A paragraph long enough to count as content, scraped by a pooled worker.</p>" * 5
+            + "</article></body></html>").encode('utf-8'))
+        temp_dir = tempfile.mkdtemp()
+        pool = ScraperWorkerPool(size=1, scrapers=["simple"], job_timeout=60)
+        try:
+            output_path = os.path.join(temp_dir, "content.json")
+            reply = pool.run("simple", self.base_url + "/article", output_path)
+            with open(output_path, 'r', encoding='utf-8') as f:
+                written = json.load(f)
+        finally:
+            pool.close()
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(reply["exit_code"], 0)
+        self.assertEqual(reply["content"], written)
+        self.assertIn("pooled worker", json.dumps(reply["content"]["structured_content"]))
+
+if __name__ == '__main__':
+    unittest.main()
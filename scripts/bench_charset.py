@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML decoding: requests' response.text against charset.decode_html.
+
+A response without a declared charset makes requests run charset detection
+over the whole body. decode_html uses the <meta> declaration when there is
+one and otherwise detects on a bounded prefix.
+
+Usage: python scripts/bench_charset.py [--size-mb N] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'app'))
+
+from services.charset import decode_html
+
+def make_page(size, encoding, meta):
+    """Build an HTML page of about size bytes in the given encoding."""
+    head = f'<html><head><meta charset="{encoding}"><title>Bench</title></head><body>' if meta else '<html><body>'
+    paragraph = "<p>Grüße aus Köln, café au lait, naïve façade, smörgåsbord and plain ASCII words.</p>\n"
+    count = size // len(paragraph.encode(encoding)) + 1
+    return (head + paragraph * count + "</body></html>").encode(encoding)
+
+def make_response(body, content_type):
+    """Build a requests.Response as the HTTP client would return it."""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = body
+    return response
+
+def median_time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=2.0, help='page size in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (median reported)')
+    args = parser.parse_args()
+    size = int(args.size_mb * 1024 * 1024)
+
+    cases = [
+        ("utf-8, <meta charset>, no HTTP charset", make_page(size, 'utf-8', True), 'application/xhtml+xml'),
+        ("utf-8, nothing declared", make_page(size, 'utf-8', False), 'application/octet-stream'),
+        ("latin-1, nothing declared", make_page(size, 'latin-1', False), 'application/octet-stream'),
+    ]
+
+    print(f"{'case':40} {'response.text':>14} {'decode_html':>12} {'source':>9} {'speedup':>8}")
+    for name, body, content_type in cases:
+        baseline = median_time(lambda: make_response(body, content_type).text, args.repeat)
+        decoded = decode_html(body, content_type)
+        elapsed = median_time(lambda: decode_html(body, content_type), args.repeat)
+        print(f"{name:40} {baseline * 1000:>12.1f}ms {elapsed * 1000:>10.1f}ms {decoded.source:>9} {baseline / elapsed:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
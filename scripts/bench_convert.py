@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark drawj2d conversion wall time: one run over the whole document
+against concurrent page chunks merged into one .rmdoc.
+
+Documents are synthetic articles of about 10, 50 and 200 pages (see
+--pages). Requires drawj2d; nothing is measured without it.
+
+Usage: python scripts/bench_convert.py [--pages 10 50 200] [--workers N] [--chunk-pages N] [--drawj2d PATH]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'app'))
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+
+from services.document_service import DocumentService
+from bench_hcl import synthetic_content
+
+def document_of(service, pages):
+    """Create an HCL document of at least the given number of pages; return (path, page count)."""
+    sections = max(1, pages)
+    while True:
+        hcl_path = service.create_hcl("https://example.com/bench", "", synthetic_content(sections))
+        count = len(DocumentService.load_page_map(hcl_path)["pages"])
+        if count >= pages:
+            return hcl_path, count
+        sections = int(sections * pages / count) + 1
+
+def timed(convert):
+    """Run a conversion; return (seconds, output path or None)."""
+    started = time.perf_counter()
+    output = convert()
+    return time.perf_counter() - started, output
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 50, 200], help='document lengths in pages')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent drawj2d processes')
+    parser.add_argument('--chunk-pages', type=int, default=10, help='minimum pages per chunk')
+    parser.add_argument('--drawj2d', default='/usr/local/bin/drawj2d', help='drawj2d executable')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.drawj2d):
+        print(f"drawj2d not found at {args.drawj2d}; nothing to measure")
+        return 1
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        service = DocumentService(temp_dir, args.drawj2d)
+        service.convert_workers = args.workers
+        service.chunk_pages = args.chunk_pages
+        print(f"{os.cpu_count()} CPUs, {args.workers} workers, chunks of at least {args.chunk_pages} pages")
+        print(f"{'pages':>6} {'chunks':>7} {'single':>10} {'chunked':>10} {'speedup':>8}")
+
+        for pages in args.pages:
+            hcl_path, count = document_of(service, pages)
+            page_map = DocumentService.load_page_map(hcl_path)
+            chunks = service._chunk_count(page_map)
+
+            single, single_output = timed(lambda: service._convert_to_remarkable(
+                hcl_path, os.path.join(temp_dir, f"single_{pages}.rm")))
+            chunked, chunked_output = timed(lambda: service._convert_chunked(
+                hcl_path, page_map, os.path.join(temp_dir, f"chunked_{pages}.rmdoc")))
+
+            if not single_output or not chunked_output:
+                print(f"{count:>6} {chunks:>7} conversion failed (single: {single_output}, chunked: {chunked_output})")
+                continue
+            print(f"{count:>6} {chunks:>7} {single:>9.2f}s {chunked:>9.2f}s {single / chunked:>7.2f}x")
+    finally:
+        shutil.rmtree(temp_dir)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Offline extraction benchmark over a versioned corpus of captured pages.
+
+The corpus in corpus/ holds the HTML the scrapers saved next to their JSON
+(temp/content_*.json.html), one copy per distinct page, with a manifest
+and the golden output of every extraction strategy. The benchmark runs each
+strategy with each installed parser backend and reports parse and extract
+time, peak traced memory, block counts and how far the blocks drift from
+the golden output. Sockets are refused while it runs, so nothing reaches
+the network.
+
+Usage:
+    python scripts/bench_corpus.py build [--source DIR]   # add captured pages, write golden outputs
+    python scripts/bench_corpus.py bless                  # accept the current output as golden
+    python scripts/bench_corpus.py run [--repeat N] [--min-similarity R] [--strategy S ...]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import socket
+import difflib
+import hashlib
+import argparse
+import statistics
+import tracemalloc
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'app'))
+
+from services.content_extractor import make_soup, extract_blocks, available_parsers, normalize_text, CHROME_TAGS
+from services.main_content import find_main_content
+from scrape_simple import extract_content
+from bench_extractors import legacy_extract
+
+CORPUS_DIR = os.path.join(BASE_DIR, 'corpus')
+MANIFEST_PATH = os.path.join(CORPUS_DIR, 'manifest.json')
+
+# Golden outputs are produced with the parser every installation has
+GOLDEN_PARSER = 'html.parser'
+
+# Base URL of pages whose original URL is not recorded
+UNKNOWN_BASE_URL = 'https://corpus.invalid/'
+
+def simple_strategy(html, soup, base_url):
+    """scrape_simple.py: main content, single-pass blocks, div and full-text fallbacks."""
+    return extract_content(html, base_url, soup=soup)["structured_content"]
+
+def rendered_strategy(html, soup, base_url):
+    """scrape_js.py on the rendered DOM: main content or body, substantial blocks only."""
+    root = find_main_content(soup) or soup.body or soup
+    blocks, _ = extract_blocks(root, base_url=base_url, min_paragraph_length=11, skip_tags=CHROME_TAGS)
+    return blocks
+
+def legacy_strategy(html, soup, base_url):
+    """Multi-pass find_all extraction, as the scrapers did before the single-pass extractor."""
+    return legacy_extract(soup)
+
+STRATEGIES = {
+    "simple": simple_strategy,
+    "rendered": rendered_strategy,
+    "legacy": legacy_strategy,
+}
+
+def load_manifest():
+    """Load the corpus manifest, or an empty version 0 corpus."""
+    if not os.path.exists(MANIFEST_PATH):
+        return {"version": 0, "golden_parser": GOLDEN_PARSER, "pages": []}
+    with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+
+def read_page(page):
+    """Return a page's text after checking its bytes against the manifest."""
+    with open(os.path.join(CORPUS_DIR, page["file"]), 'rb') as f:
+        body = f.read()
+    if hashlib.sha256(body).hexdigest() != page["sha256"]:
+        raise ValueError(f"{page['file']} does not match its manifest checksum")
+    return body.decode('utf-8', errors='replace')
+
+def golden_path(strategy, page):
+    return os.path.join(CORPUS_DIR, 'golden', strategy, f"{page['id']}.json")
+
+def block_key(block):
+    """Comparable form of a block: its type and normalized text."""
+    text = block.get("content") or ' | '.join(block.get("items", [])) or block.get("image_id", "")
+    return f"{block.get('type')}: {normalize_text(text)}"
+
+def base_url_of(html):
+    """The page's own URL from its canonical link or og:url, if it declares one."""
+    soup = make_soup(html, GOLDEN_PARSER)
+    canonical = soup.find('link', rel='canonical', href=True)
+    if canonical:
+        return canonical['href']
+    og_url = soup.find('meta', property='og:url', content=True)
+    return og_url['content'] if og_url else None
+
+def write_golden(manifest, pages=None):
+    """Write the golden output of every strategy for the given (default: all) pages."""
+    for page in pages or manifest["pages"]:
+        html = read_page(page)
+        base_url = page.get("base_url") or UNKNOWN_BASE_URL
+        for name, strategy in STRATEGIES.items():
+            blocks = strategy(html, make_soup(html, GOLDEN_PARSER), base_url)
+            path = golden_path(name, page)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(blocks, f, indent=1, ensure_ascii=False)
+                f.write('\n')
+
+def build(args):
+    """Add the distinct captured pages from the source directory to the corpus."""
+    manifest = load_manifest()
+    known = {page["sha256"] for page in manifest["pages"]}
+    added = []
+    for path in sorted(glob.glob(os.path.join(args.source, 'content_*.json.html'))):
+        with open(path, 'rb') as f:
+            body = f.read()
+        digest = hashlib.sha256(body).hexdigest()
+        if digest in known:
+            continue
+        known.add(digest)
+
+        html = body.decode('utf-8', errors='replace')
+        captured_path = path[:-len('.html')]
+        captured = {}
+        if os.path.exists(captured_path):
+            with open(captured_path, 'r', encoding='utf-8') as f:
+                captured = json.load(f)
+        page = {
+            "id": digest[:12],
+            "file": f"pages/{digest[:12]}.html",
+            "sha256": digest,
+            "bytes": len(body),
+            "title": captured.get("title"),
+            "base_url": base_url_of(html),
+            "captured_from": os.path.basename(path),
+            "captured_blocks": len(captured.get("structured_content", [])),
+        }
+        os.makedirs(os.path.join(CORPUS_DIR, 'pages'), exist_ok=True)
+        with open(os.path.join(CORPUS_DIR, page["file"]), 'wb') as f:
+            f.write(body)
+        manifest["pages"].append(page)
+        added.append(page)
+
+    if not added:
+        print("No new pages")
+        return 0
+    manifest["version"] += 1
+    manifest["golden_parser"] = GOLDEN_PARSER
+    save_manifest(manifest)
+    write_golden(manifest, added)
+    print(f"Added {len(added)} pages, corpus version {manifest['version']} has {len(manifest['pages'])}")
+    return 0
+
+def bless(args):
+    """Accept the current extractor output as golden."""
+    manifest = load_manifest()
+    write_golden(manifest)
+    print(f"Wrote golden outputs for {len(manifest['pages'])} pages and {len(STRATEGIES)} strategies")
+    return 0
+
+@contextmanager
+def no_network():
+    """Refuse every socket connection made inside the block."""
+    def refuse(*args, **kwargs):
+        raise OSError("network access is disabled during the corpus benchmark")
+    original = socket.socket.connect, socket.create_connection
+    socket.socket.connect, socket.create_connection = refuse, refuse
+    try:
+        yield
+    finally:
+        socket.socket.connect, socket.create_connection = original
+
+def measure(html, strategy, backend, base_url, repeat):
+    """Median parse and extract seconds, peak traced bytes and the blocks produced."""
+    parse_times, extract_times = [], []
+    blocks = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        soup = make_soup(html, backend)
+        parsed = time.perf_counter()
+        blocks = strategy(html, soup, base_url)
+        parse_times.append(parsed - started)
+        extract_times.append(time.perf_counter() - parsed)
+
+    # Traced separately: tracemalloc slows allocation down several times
+    tracemalloc.start()
+    try:
+        strategy(html, make_soup(html, backend), base_url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(parse_times), statistics.median(extract_times), peak, blocks
+
+def compare(blocks, golden):
+    """Similarity of two block sequences and the blocks missing from and added to the first."""
+    ours, theirs = [block_key(b) for b in blocks], [block_key(b) for b in golden]
+    matcher = difflib.SequenceMatcher(None, theirs, ours, autojunk=False)
+    matched = sum(size for _, _, size in matcher.get_matching_blocks())
+    missing = len(theirs) - matched
+    added = len(ours) - matched
+    return matcher.ratio() if theirs or ours else 1.0, missing, added
+
+def run(args):
+    """Benchmark every strategy and backend over the corpus; fail on quality regressions."""
+    manifest = load_manifest()
+    if not manifest["pages"]:
+        print("The corpus is empty; run the build command first")
+        return 1
+    strategies = args.strategy or list(STRATEGIES)
+    backends = available_parsers()
+    print(f"Corpus version {manifest['version']}, {len(manifest['pages'])} pages, "
+          f"parser backends: {', '.join(backends)}")
+    print(f"{'page':14} {'bytes':>8} {'strategy':9} {'parser':12} {'parse':>9} {'extract':>9} "
+          f"{'peak':>8} {'blocks':>6} {'golden':>6} {'similar':>7} {'-/+':>7}")
+
+    totals = {}
+    regressions = []
+    with no_network():
+        for page in manifest["pages"]:
+            html = read_page(page)
+            base_url = page.get("base_url") or UNKNOWN_BASE_URL
+            for name in strategies:
+                with open(golden_path(name, page), 'r', encoding='utf-8') as f:
+                    golden = json.load(f)
+                for backend in backends:
+                    parse, extract, peak, blocks = measure(html, STRATEGIES[name], backend, base_url, args.repeat)
+                    similarity, missing, added = compare(blocks, golden)
+                    total = totals.setdefault((name, backend), [0.0, 0.0, 0, 0])
+                    total[0] += parse
+                    total[1] += extract
+                    total[2] = max(total[2], peak)
+                    total[3] += len(blocks)
+                    print(f"{page['id']:14} {page['bytes']:>8} {name:9} {backend:12} {parse * 1000:>7.1f}ms "
+                          f"{extract * 1000:>7.1f}ms {peak / 1024 / 1024:>6.1f}MB {len(blocks):>6} "
+                          f"{len(golden):>6} {similarity:>7.3f} {f'-{missing}/+{added}':>7}")
+                    if similarity < args.min_similarity:
+                        regressions.append((page["id"], name, backend, similarity))
+
+    print()
+    print(f"{'strategy':9} {'parser':12} {'parse':>9} {'extract':>9} {'max peak':>8} {'blocks':>6}")
+    for (name, backend), (parse, extract, peak, blocks) in totals.items():
+        print(f"{name:9} {backend:12} {parse * 1000:>7.1f}ms {extract * 1000:>7.1f}ms "
+              f"{peak / 1024 / 1024:>6.1f}MB {blocks:>6}")
+
+    if regressions:
+        print()
+        for page_id, name, backend, similarity in regressions:
+            print(f"REGRESSION {page_id} {name}/{backend}: similarity {similarity:.3f} < {args.min_similarity}")
+        return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help='add captured pages to the corpus')
+    build_parser.add_argument('--source', default=os.path.join(BASE_DIR, 'temp'),
+                              help='directory with content_*.json.html captures')
+    commands.add_parser('bless', help='accept the current output as golden')
+    run_parser = commands.add_parser('run', help='benchmark the strategies over the corpus')
+    run_parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (median reported)')
+    run_parser.add_argument('--min-similarity', type=float, default=0.98,
+                            help='golden similarity below which a page counts as a regression')
+    run_parser.add_argument('--strategy', action='append', choices=sorted(STRATEGIES),
+                            help='strategy to run (default: all)')
+    args = parser.parse_args()
+    return {'build': build, 'bless': bless, 'run': run}[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass content extractor against the old multi-pass extraction.
+
+The legacy extractor below reproduces what scrape_simple.py and scrape_js.py
+did before: html.parser, then one find_all per heading level, paragraphs,
+lists, blockquotes and code. The single-pass extractor is timed with every
+installed parser backend.
+
+Usage: python scripts/bench_extractors.py [--sections N] [--repeat N] [pages.html ...]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import statistics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'app'))
+
+from bs4 import BeautifulSoup
+from services.content_extractor import make_soup, extract_blocks, available_parsers
+
+def legacy_extract(soup):
+    """Multi-pass extraction as done by the scrapers before the single-pass extractor."""
+    structured_content = []
+    for i in range(1, 7):
+        for heading in soup.find_all(f'h{i}'):
+            text = heading.get_text(strip=True)
+            if text:
+                structured_content.append({"type": f"h{i}", "content": text})
+    for p in soup.find_all('p'):
+        text = p.get_text(strip=True)
+        if text:
+            structured_content.append({"type": "paragraph", "content": text})
+    for list_elem in soup.find_all(['ul', 'ol']):
+        items = [li.get_text(strip=True) for li in list_elem.find_all('li') if li.get_text(strip=True)]
+        if items:
+            structured_content.append({"type": "list", "list_type": list_elem.name, "items": items})
+    for quote in soup.find_all('blockquote'):
+        text = quote.get_text(strip=True)
+        if text:
+            structured_content.append({"type": "blockquote", "content": text})
+    for code in soup.find_all(['pre', 'code']):
+        if code.find_parent('pre') or code.find_parent('code'):
+            continue
+        text = code.get_text(strip=True)
+        if text:
+            structured_content.append({"type": "code", "content": text})
+    return structured_content
+
+def synthetic_page(sections):
+    """Build a large article-like page with nested markup."""
+    parts = ["<html><head><title>Synthetic</title><script>var x = 1;</script></head><body>",
+             "<nav><ul><li><a href='/'>Home</a></li><li><a href='/about'>About</a></li></ul></nav><article>"]
+    for i in range(sections):
+        parts.append(f"<h2>Section {i}</h2>")
+        for j in range(5):
+            parts.append(
+                f"<div class='wrap'><p>Paragraph {j} of section {i} with <a href='#'>a link</a>, "
+                f"<em>emphasis</em> and enough words to look like a real sentence in an article.</p></div>"
+            )
+        parts.append("<ul>" + "".join(f"<li>Item {k} <b>bold</b></li>" for k in range(4)) + "</ul>")
+        parts.append("<blockquote><p>A quotation inside the section.</p></blockquote>")
+        parts.append("<pre><code>def f(x):\n    return x * 2\n</code></pre>")
+    parts.append("</article><footer><p>Footer</p></footer></body></html>")
+    return "".join(parts)
+
+def time_call(fn, repeat):
+    """Median wall time of fn() over repeat runs, and its last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', type=int, default=2000, help='sections in the synthetic page')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (median reported)')
+    parser.add_argument('pages', nargs='*', help='HTML files to benchmark (default: captured pages in temp/)')
+    args = parser.parse_args()
+
+    pages = [(f"synthetic ({args.sections} sections)", synthetic_page(args.sections))]
+    paths = args.pages or sorted(glob.glob(os.path.join(BASE_DIR, 'temp', '*.html')))
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        if len(html) > 10000:
+            pages.append((os.path.basename(path), html))
+
+    backends = available_parsers()
+    print(f"Parser backends available: {', '.join(backends)}")
+    print(f"{'page':40} {'size':>9} {'extractor':28} {'parse':>9} {'walk':>9} {'total':>9} {'blocks':>7}")
+
+    for name, html in pages:
+        legacy_parse, soup = time_call(lambda: BeautifulSoup(html, 'html.parser'), args.repeat)
+        legacy_walk, legacy_blocks = time_call(lambda: legacy_extract(soup), args.repeat)
+        legacy_total = legacy_parse + legacy_walk
+        print(f"{name[:40]:40} {len(html):>9} {'legacy multi-pass':28} {legacy_parse * 1000:>7.1f}ms "
+              f"{legacy_walk * 1000:>7.1f}ms {legacy_total * 1000:>7.1f}ms {len(legacy_blocks):>7}")
+        for backend in backends:
+            parse, soup = time_call(lambda: make_soup(html, backend), args.repeat)
+            walk, (blocks, _) = time_call(lambda: extract_blocks(soup), args.repeat)
+            speedup = legacy_total / (parse + walk) if parse + walk else float('inf')
+            print(f"{'':40} {'':>9} {'single-pass / ' + backend:28} {parse * 1000:>7.1f}ms "
+                  f"{walk * 1000:>7.1f}ms {(parse + walk) * 1000:>7.1f}ms {len(blocks):>7}  x{speedup:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark HCL generation: script size, command counts, generation time and
+(when drawj2d is installed) conversion time.
+
+"generate" times all of create_hcl, layout and pagination included. "emit"
+times only writing the already paginated pages, so changes to the HCL writer
+can be compared without the layout cost. It is n/a for checkouts that predate
+pagination.
+
+Documents are the golden simple-scraper outputs of the offline corpus plus a
+synthetic long article. Point --app-dir at another checkout's app/ directory
+to measure an older DocumentService for a before/after comparison.
+
+Usage: python scripts/bench_hcl.py [--sections N] [--repeat N] [--app-dir DIR] [--drawj2d PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def synthetic_content(sections):
+    """A long article with headings, paragraphs, lists and code."""
+    blocks = []
+    for i in range(sections):
+        blocks.append({"type": "h2", "content": f"Section {i}: a heading of a few words"})
+        for j in range(3):
+            blocks.append({"type": "paragraph", "content": (
+                f"Paragraph {j} of section {i}. " + "An ordinary sentence that fills out the paragraph. " * 6)})
+        blocks.append({"type": "list", "list_type": "ul", "items": [f"List item {k} with some text" for k in range(4)]})
+        blocks.append({"type": "code", "content": "def f(x):\n    return x * 2\n\nprint(f(21))"})
+    return {"title": "Synthetic article", "structured_content": blocks}
+
+def corpus_documents():
+    """Golden simple-scraper outputs of the offline corpus, as scraped content."""
+    manifest_path = os.path.join(BASE_DIR, 'corpus', 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    documents = []
+    for page in manifest["pages"]:
+        with open(os.path.join(BASE_DIR, 'corpus', 'golden', 'simple', f"{page['id']}.json"), 'r', encoding='utf-8') as f:
+            blocks = json.load(f)
+        documents.append((page["id"], {"title": page.get("title") or page["id"], "structured_content": blocks}))
+    return documents
+
+def emit_time(service, qr_path, content, repeat):
+    """Median time to write the script for already paginated pages, or None."""
+    try:
+        from services.page_layout import Paginator
+    except ImportError:
+        return None
+    blocks = service._layout_blocks("https://example.com/article", qr_path, content)
+    pages = Paginator(top=service.margin, bottom=service.page_height - service.margin * 2).paginate(blocks)
+    hcl_path = os.path.join(service.temp_dir, 'emit.hcl')
+
+    if hasattr(service, '_emit_pages'):
+        from services.hcl_emitter import HCLEmitter
+        def emit():
+            emitter = HCLEmitter()
+            service._emit_pages(emitter, pages)
+            emitter.write(hcl_path)
+    else:
+        def emit():
+            with open(hcl_path, 'w', encoding='utf-8') as f:
+                service._write_pages(f, pages)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        emit()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', type=int, default=200, help='sections in the synthetic article')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (median reported)')
+    parser.add_argument('--app-dir', default=os.path.join(BASE_DIR, 'app'), help='app/ directory to import from')
+    parser.add_argument('--drawj2d', default='/usr/local/bin/drawj2d', help='drawj2d executable for conversion timing')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    from services.document_service import DocumentService
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        service = DocumentService(temp_dir, args.drawj2d)
+        qr_path = os.path.join(temp_dir, 'qr.png')
+        try:
+            from PIL import Image
+            Image.new('1', (10, 10)).save(qr_path)
+        except ImportError:
+            qr_path = ''
+
+        documents = corpus_documents() + [(f"synthetic ({args.sections} sections)", synthetic_content(args.sections))]
+        convert = os.path.exists(args.drawj2d)
+        print(f"DocumentService from {os.path.abspath(args.app_dir)}")
+        print(f"{'document':30} {'bytes':>9} {'commands':>9} {'set_font':>9} {'pages':>6} {'generate':>10} {'emit':>10} {'convert':>10}")
+
+        totals = [0, 0, 0, 0.0, 0.0, 0.0]
+        for name, content in documents:
+            timings = []
+            hcl_path = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                hcl_path = service.create_hcl("https://example.com/article", qr_path, content)
+                timings.append(time.perf_counter() - started)
+            with open(hcl_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            size = os.path.getsize(hcl_path)
+            commands = sum(line.startswith('puts ') for line in lines)
+            set_fonts = sum(line.startswith('puts "set_font') for line in lines)
+            pages = lines.count('puts "newpage"') + 1
+            generate = statistics.median(timings)
+            emit = emit_time(service, qr_path, content, args.repeat)
+
+            conversion = None
+            if convert:
+                started = time.perf_counter()
+                subprocess.run([args.drawj2d, "-Trm", "-rmv6", "-o", os.path.join(temp_dir, 'out.rm'), hcl_path],
+                               capture_output=True)
+                conversion = time.perf_counter() - started
+                totals[4] += conversion
+
+            totals[0] += size
+            totals[1] += commands
+            totals[2] += set_fonts
+            totals[3] += generate
+            totals[5] += emit or 0.0
+            emitted = f"{emit * 1000:>8.1f}ms" if emit is not None else f"{'n/a':>10}"
+            converted = f"{conversion * 1000:>8.0f}ms" if conversion is not None else f"{'n/a':>10}"
+            print(f"{name[:30]:30} {size:>9} {commands:>9} {set_fonts:>9} {pages:>6} {generate * 1000:>8.1f}ms {emitted} {converted}")
+
+        emitted = f"{totals[5] * 1000:>8.1f}ms" if emit is not None else f"{'n/a':>10}"
+        converted = f"{totals[4] * 1000:>8.0f}ms" if convert else f"{'n/a':>10}"
+        print(f"{'total':30} {totals[0]:>9} {totals[1]:>9} {totals[2]:>9} {'':>6} {totals[3] * 1000:>8.1f}ms {emitted} {converted}")
+        if not convert:
+            print(f"drawj2d not found at {args.drawj2d}; conversion not timed")
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main()